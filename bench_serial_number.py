@@ -0,0 +1,203 @@
+"""
+Микробенчмарки горячих путей luhn_algorithm и serial_number.
+
+    python bench_serial_number.py                                   # замер
+    python bench_serial_number.py --save bench_baseline.json        # сохранить базовую линию
+    python bench_serial_number.py --compare bench_baseline.json --threshold 1.3
+
+Каждый бенчмарк выполняет операцию над n элементами: n=1 - одиночный вызов,
+n>1 - пачка. Время измеряется timeit: число вызовов подбирается так, чтобы
+замер длился не меньше 0.2 с, из --repeat замеров берется минимум (наименее
+зашумленный) и пересчитывается в наносекунды на элемент. С --compare
+бенчмарки, ставшие медленнее базовой линии больше чем в --threshold раз,
+помечаются, и команда завершается с кодом 1. Базовая линия зависит от
+машины: сохраняйте и сравнивайте ее на одном и том же компьютере.
+"""
+import argparse
+import json
+import platform
+import sys
+import timeit
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from luhn_algorithm import (
+    add_valid_luhn_checksum, calculate_luhn_check_digits_batch, calculate_luhn_checksum, check_luhn_batch,
+    validate_luhn_checksum,
+)
+from serial_number import (
+    SerialNumber, format_serial_number, generate_serial_number, generate_serial_numbers, get_quarter_date_string,
+    get_quarter_number_since_q1_2026, get_quarter_start_timestamp, get_seconds_since_quarter_start,
+    parse_serial_number, split_timestamp, split_timestamps,
+)
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен
+    np = None
+
+# Размер пачки для пакетных бенчмарков
+BATCH_SIZE = 10_000
+# Во сколько раз бенчмарк может замедлиться относительно базовой линии
+DEFAULT_THRESHOLD = 1.25
+
+# Момент генерации для всех бенчмарков: середина II квартала 2026 года
+_TIMESTAMP = 1_780_000_000
+
+# Бенчмарк: (число элементов за вызов, функция без аргументов)
+Benchmark = Tuple[int, Callable[[], object]]
+
+
+def build_benchmarks(batch_size: int = BATCH_SIZE) -> Dict[str, Benchmark]:
+    """
+    Набор бенчмарков по имени. Входные данные готовятся заранее и в замер не входят.
+    """
+    serials = [serial for serial, _ in generate_serial_numbers(_TIMESTAMP, range(1, 100))]
+    serials = (serials * (batch_size // len(serials) + 1))[:batch_size]
+    formatted = [format_serial_number(serial) for serial in serials]
+    prefixes = [serial[:-1] for serial in serials]
+    # Пакетные функции Луна принимают номера одним буфером ASCII-цифр подряд
+    packed_serials = "".join(serials).encode("ascii")
+    packed_prefixes = "".join(prefixes).encode("ascii")
+    timestamps = list(range(_TIMESTAMP, _TIMESTAMP + batch_size))
+    serial, prefix, formatted_serial = serials[0], prefixes[0], formatted[0]
+    return {
+        "luhn.calculate_checksum": (1, lambda: calculate_luhn_checksum(serial)),
+        "luhn.validate": (1, lambda: validate_luhn_checksum(serial)),
+        "luhn.add_valid_checksum": (1, lambda: add_valid_luhn_checksum(prefix)),
+        "luhn.calculate_checksum[batch]": (batch_size, lambda: [calculate_luhn_checksum(s) for s in serials]),
+        "luhn.add_valid_checksum[batch]": (batch_size, lambda: [add_valid_luhn_checksum(p) for p in prefixes]),
+        "luhn.check_batch": (batch_size, lambda: check_luhn_batch(packed_serials, width=12)),
+        "luhn.check_batch[python]": (batch_size, lambda: check_luhn_batch(packed_serials, width=12, use_numpy=False)),
+        "luhn.check_digits_batch": (batch_size, lambda: calculate_luhn_check_digits_batch(packed_prefixes, width=11)),
+        "serial.generate": (1, lambda: generate_serial_number(_TIMESTAMP, 42)),
+        "serial.generate[99]": (99, lambda: list(generate_serial_numbers(_TIMESTAMP, range(1, 100)))),
+        "serial.parse": (1, lambda: parse_serial_number(formatted_serial)),
+        "serial.parse[batch]": (batch_size, lambda: [parse_serial_number(s) for s in formatted]),
+        "serial.SerialNumber.parse": (1, lambda: SerialNumber.parse(formatted_serial)),
+        "serial.format": (1, lambda: format_serial_number(serial)),
+        "serial.format[batch]": (batch_size, lambda: [format_serial_number(s) for s in serials]),
+        "quarter.split_timestamp": (1, lambda: split_timestamp(_TIMESTAMP)),
+        "quarter.split_timestamps": (batch_size, lambda: split_timestamps(timestamps)),
+        "quarter.number": (1, lambda: get_quarter_number_since_q1_2026(_TIMESTAMP)),
+        "quarter.seconds_since_start": (1, lambda: get_seconds_since_quarter_start(_TIMESTAMP)),
+        "quarter.start_timestamp": (1, lambda: get_quarter_start_timestamp(2)),
+        "quarter.date_string": (1, lambda: get_quarter_date_string(2)),
+    }
+
+
+def measure(function: Callable[[], object], items: int, repeat: int = 5) -> float:
+    """
+    Наносекунды на элемент: лучший из repeat замеров.
+    """
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat, number)) / number
+    return best / items * 1e9
+
+
+def run_benchmarks(benchmarks: Dict[str, Benchmark], repeat: int = 5,
+                   progress: Optional[Callable[[str, float], None]] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Выполняет бенчмарки. Возвращает {имя: {"n": элементов за вызов, "ns": наносекунд на элемент}}.
+    """
+    results = {}
+    for name, (items, function) in benchmarks.items():
+        results[name] = {"n": items, "ns": measure(function, items, repeat)}
+        if progress is not None:
+            progress(name, results[name]["ns"])
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float = DEFAULT_THRESHOLD) -> List[Tuple[str, float]]:
+    """
+    Бенчмарки, ставшие медленнее базовой линии больше чем в threshold раз: пары (имя, во сколько раз).
+    Бенчмарки, которых нет в базовой линии, не сравниваются.
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference and reference["ns"] > 0:
+            ratio = result["ns"] / reference["ns"]
+            if ratio > threshold:
+                regressions.append((name, ratio))
+    return regressions
+
+
+def environment() -> Dict[str, object]:
+    """
+    Описание окружения для файла базовой линии.
+    """
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "numpy": np.__version__ if np is not None else None,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def render(results: Dict[str, Dict[str, float]], baseline: Optional[Dict[str, Dict[str, float]]] = None,
+           threshold: float = DEFAULT_THRESHOLD) -> str:
+    """
+    Таблица результатов; с базовой линией - со столбцом отношения и пометкой замедлений.
+    """
+    width = max(len(name) for name in results)
+    header = f"{'бенчмарк':<{width}} {'n':>6} {'нс/элемент':>12}"
+    if baseline is not None:
+        header += f" {'база':>12} {'отношение':>10}"
+    lines = [header]
+    for name, result in results.items():
+        line = f"{name:<{width}} {result['n']:>6} {result['ns']:>12.1f}"
+        reference = (baseline or {}).get(name)
+        if reference:
+            ratio = result["ns"] / reference["ns"]
+            line += f" {reference['ns']:>12.1f} {ratio:>10.2f}" + ("  ЗАМЕДЛЕНИЕ" if ratio > threshold else "")
+        elif baseline is not None:
+            line += f" {'-':>12} {'-':>10}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Запуск бенчмарков."""
+    parser = argparse.ArgumentParser(description="Микробенчмарки алгоритма Луна и серийных номеров")
+    parser.add_argument("--filter", default="", help="запускать только бенчмарки, в имени которых есть подстрока")
+    parser.add_argument("--repeat", type=int, default=5, help="число замеров каждого бенчмарка")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="размер пачки для пакетных бенчмарков")
+    parser.add_argument("--save", metavar="PATH", help="сохранить результаты как базовую линию (JSON)")
+    parser.add_argument("--compare", metavar="PATH", help="сравнить с базовой линией из файла")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="допустимое замедление относительно базовой линии, раз")
+    args = parser.parse_args(argv)
+    if args.repeat < 1 or args.batch_size < 1:
+        parser.error("--repeat и --batch-size должны быть положительными")
+
+    benchmarks = {name: benchmark for name, benchmark in build_benchmarks(args.batch_size).items()
+                  if args.filter in name}
+    if not benchmarks:
+        parser.error("нет бенчмарков, подходящих под --filter")
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+
+    results = run_benchmarks(benchmarks, args.repeat,
+                             progress=lambda name, ns: print(f"{name}: {ns:.1f} нс", file=sys.stderr))
+    print(render(results, baseline, args.threshold))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump({"environment": environment(), "results": results}, file, ensure_ascii=False, indent=2)
+            file.write("\n")
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"Замедление больше чем в {args.threshold} раз: "
+                  + ", ".join(f"{name} (x{ratio:.2f})" for name, ratio in regressions), file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
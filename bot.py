@@ -1,12 +1,36 @@
 """
 Телеграм бот для генерации и проверки серийных номеров.
 """
+import asyncio
+import io
 import os
-import random
+import tempfile
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Tuple
 from dotenv import load_dotenv
-from telegram import Update
-from telegram.ext import Application, CommandHandler, ContextTypes
-from serial_number import generate_serial_number, parse_serial_number, format_serial_number, parse_serial_number
+from telegram import Chat, Update
+from telegram.ext import (
+    Application, ChosenInlineResultHandler, CommandHandler, ContextTypes, InlineQueryHandler, MessageHandler, filters,
+)
+from bot_metrics import (
+    SERIALS_ISSUED, InstrumentedRequest, instrument_handler, record_bulk_check, record_validation, watch_send_queue,
+)
+from bulk_check import BulkCheckSummary, check_lines, split_serials
+from bulk_reply import pack_lines, serials_csv
+from http_api import DEFAULT_MAX_COUNT, create_api_server
+from http_server import HttpServer
+from inline_results import GENERATE, check_results, chosen_serials, parse_inline_query, preview_serials, serial_results
+from metrics import create_metrics_server
+from result_cache import LRUCache
+from send_queue import SendQueue
+from serial_allocator import Allocator, default_allocator, issue_serial_numbers
+from serial_lease import LeasedSerialAllocator, LeaseStore
+from serial_number import SerialNumber, parse_serial_number, format_serial_number, extract_digits
+from serial_bitmap import SerialBitmap
+from serial_bloom import BloomSnapshot
+from serial_registry import IssuedSerial, SerialRegistry
+from serial_typos import TypoSuggestion, suggest_corrections
+from webhook import create_webhook_server, run_webhook
 
 # версия бота
 VERSION = "0.0.4"
@@ -20,7 +44,115 @@ BOT_TOKEN = os.getenv("BOT_TOKEN")
 if not BOT_TOKEN:
     raise ValueError("BOT_TOKEN не установлен в переменных окружения!")
 
+# Адрес Bot API (пустая строка - api.telegram.org), например локальный telegram-bot-api
+# или поддельный сервер для нагрузочного теста (fake_bot_api.py); токен дописывается в конец
+BOT_API_URL = os.getenv("BOT_API_URL", "")
 
+# Режим получения обновлений: polling (по умолчанию) или webhook
+BOT_MODE = os.getenv("BOT_MODE", "polling")
+if BOT_MODE not in ("polling", "webhook"):
+    raise ValueError(f"BOT_MODE должен быть polling или webhook, а не {BOT_MODE!r}")
+# Адрес и порт встроенного HTTP-сервера вебхука и путь, на который Telegram присылает обновления
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram")
+# Публичный URL вебхука для регистрации в Telegram (пустая строка - не регистрировать)
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+# Секрет, который Telegram передает в заголовке каждого запроса. Обязателен в режиме webhook:
+# без него обновления мог бы подделать любой, кому доступен порт
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+if BOT_MODE == "webhook" and not WEBHOOK_SECRET:
+    raise ValueError("WEBHOOK_SECRET не установлен: в режиме webhook он обязателен")
+
+# HTTP API для станков и принтеров этикеток: адрес, порт (пустая строка - не запускать) и токен доступа
+API_LISTEN = os.getenv("API_LISTEN", "127.0.0.1")
+API_PORT = os.getenv("API_PORT", "")
+API_TOKEN = os.getenv("API_TOKEN", "")
+# Сколько номеров можно сгенерировать одним запросом к API
+API_MAX_COUNT = int(os.getenv("API_MAX_COUNT", str(DEFAULT_MAX_COUNT)))
+
+# Метрики в формате Prometheus на GET /metrics: адрес и порт (пустая строка - не запускать)
+METRICS_LISTEN = os.getenv("METRICS_LISTEN", "127.0.0.1")
+METRICS_PORT = os.getenv("METRICS_PORT", "")
+
+# Сколько обновлений обрабатывать одновременно (1 - по одному, как раньше)
+CONCURRENT_UPDATES = int(os.getenv("CONCURRENT_UPDATES", "64"))
+# Ограничения исходящих сообщений: всего в секунду и в один чат в секунду (SEND_GLOBAL_RATE=0 - без очереди)
+SEND_GLOBAL_RATE = float(os.getenv("SEND_GLOBAL_RATE", "30"))
+SEND_CHAT_RATE = float(os.getenv("SEND_CHAT_RATE", "1"))
+# Сколько сообщений можно отправить в чат подряд, прежде чем включится ограничение
+SEND_CHAT_BURST = float(os.getenv("SEND_CHAT_BURST", "3"))
+
+# Кеш результатов проверки: нормализованный номер -> (результат разбора, текст ответа)
+CHECK_CACHE_SIZE = int(os.getenv("CHECK_CACHE_SIZE", "1024"))
+check_cache = LRUCache(CHECK_CACHE_SIZE)
+
+# Сколько секунд Telegram может отдавать результаты инлайн-проверки номера из своего кеша
+INLINE_CHECK_CACHE_TIME = int(os.getenv("INLINE_CHECK_CACHE_TIME", "300"))
+# Кеш готовых инлайн-результатов по запросу и секунде: повторные нажатия клавиш не пересчитываются
+INLINE_CACHE_SIZE = int(os.getenv("INLINE_CACHE_SIZE", "1024"))
+inline_cache = LRUCache(INLINE_CACHE_SIZE)
+
+# Режим ответа на /g: bulk - все номера в минимуме сообщений, per_message - каждый номер отдельно
+GENERATE_REPLY_MODE = os.getenv("GENERATE_REPLY_MODE", "bulk")
+if GENERATE_REPLY_MODE not in ("bulk", "per_message"):
+    raise ValueError(f"GENERATE_REPLY_MODE должен быть bulk или per_message, а не {GENERATE_REPLY_MODE!r}")
+# Начиная с какого количества номеров в режиме bulk отправлять CSV-файл вместо сообщений (0 - никогда)
+GENERATE_DOCUMENT_THRESHOLD = int(os.getenv("GENERATE_DOCUMENT_THRESHOLD", "50"))
+
+# Сколько вариантов исправления опечатки показывать в ответе на /c (0 - не показывать)
+TYPO_SUGGESTIONS = int(os.getenv("TYPO_SUGGESTIONS", "3"))
+
+# Путь к реестру выпущенных номеров (пустая строка - не вести реестр)
+SERIAL_REGISTRY_PATH = os.getenv("SERIAL_REGISTRY_PATH", "issued_serials.sqlite3")
+# Каталог битовых карт выпущенных номеров (пустая строка - не вести карты)
+SERIAL_BITMAP_DIR = os.getenv("SERIAL_BITMAP_DIR", "")
+# Файл фильтра Блума по выпущенным номерам, общий для реплик (пустая строка - не использовать)
+SERIAL_BLOOM_PATH = os.getenv("SERIAL_BLOOM_PATH", "")
+# Как часто проверять, не обновился ли файл фильтра
+SERIAL_BLOOM_RELOAD_SECONDS = float(os.getenv("SERIAL_BLOOM_RELOAD_SECONDS", "60"))
+# Общий для реплик файл аренды блоков номеров (пустая строка - одна реплика, аллокатор в памяти)
+SERIAL_LEASE_PATH = os.getenv("SERIAL_LEASE_PATH", "")
+# Аллокатор номеров; при SERIAL_LEASE_PATH заменяется в main() на аренду блоков
+allocator: Allocator = default_allocator
+# Реестр, карты и фильтр открываются при запуске бота в main()
+registry: Optional[SerialRegistry] = None
+bitmap: Optional[SerialBitmap] = None
+bloom: Optional[BloomSnapshot] = None
+# Очередь исходящих сообщений, сервер API и сервер метрик создаются в main()
+send_queue: Optional[SendQueue] = None
+api_server: Optional[HttpServer] = None
+metrics_server: Optional[HttpServer] = None
+
+
+async def reply_text(update: Update, text: str, coalesce: bool = True, **kwargs) -> None:
+    """
+    Отвечает в чат обновления через очередь исходящих сообщений, а без нее - напрямую.
+    Как и Message.reply_text, в группах ответ цитирует команду; в теме форума ответ
+    остается в теме. В очереди склеиваются только ответы на одну команду,
+    а с coalesce=False сообщение отправляется отдельно.
+    """
+    message = update.message
+    if send_queue is not None and update.effective_chat is not None:
+        if message.chat.type != Chat.PRIVATE:
+            kwargs.setdefault("reply_to_message_id", message.message_id)
+        if message.is_topic_message:
+            kwargs.setdefault("message_thread_id", message.message_thread_id)
+        send_queue.send(update.effective_chat.id, text, group=message.message_id, coalesce=coalesce, **kwargs)
+    else:
+        await message.reply_text(text, **kwargs)
+
+
+async def reply_document(update: Update, **kwargs) -> None:
+    """
+    Отправляет файл в ответ, дождавшись отправки стоящих в очереди сообщений этого чата.
+    """
+    if send_queue is not None and update.effective_chat is not None:
+        await send_queue.wait_chat(update.effective_chat.id)
+    await update.message.reply_document(**kwargs)
+
+
+@instrument_handler("generate")
 async def generate_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     Обработчик команды /g или /generate.
@@ -31,14 +163,16 @@ async def generate_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -
     if context.args:
         try:
             count = int(context.args[0])
-            if count > 100:
-                await update.message.reply_text(
+            if count > 99:
+                await reply_text(
+                    update,
                     "Максимальное количество серийных номеров - 99. "
                     "Будет сгенерировано 99 номеров."
                 )
                 count = 99
             elif count < 1:
-                await update.message.reply_text(
+                await reply_text(
+                    update,
                     "Количество должно быть положительным числом. "
                     "Будет сгенерирован 1 номер."
                 )
@@ -47,28 +181,78 @@ async def generate_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -
             count = 1
     
     # Получаем текущее время один раз
-    from datetime import datetime, timezone
-    
     now = datetime.now(timezone.utc)
     
-    # Генерируем серийные номера
-    # Сначала сгенерируем список из count разных случайных чисел от 1 до 100
-    adds_list = random.sample(range(1, 100), count)
-    for adds in adds_list:
-        serial = generate_serial_number(now, adds)
-        formatted_serial = format_serial_number(serial)
-        
+    # Генерируем серийные номера: аллокатор гарантирует, что номера не повторятся
+    # даже при одновременных запросах в одну секунду. Аллокатор может обращаться
+    # к общему файлу аренды - не держим цикл событий
+    serials = await asyncio.to_thread(issue_serial_numbers, count, now, allocator)
+    
+    # Отмечаем выпущенные номера в битовой карте и реестре
+    record_issued(
+        serials,
+        now,
+        "command",
+        chat_id=update.effective_chat.id if update.effective_chat else None,
+        user_id=update.effective_user.id if update.effective_user else None,
+    )
+    
+    if GENERATE_REPLY_MODE == "per_message":
         # Отправляем каждый номер в отдельном сообщении
-        await update.message.reply_text(f"`{formatted_serial}`", parse_mode="Markdown")
+        for _, formatted_serial in serials:
+            await reply_text(update, f"`{formatted_serial}`", coalesce=False, parse_mode="Markdown")
+    elif 0 < GENERATE_DOCUMENT_THRESHOLD <= count:
+        # Много номеров - одним CSV-файлом
+        await reply_document(
+            update,
+            document=serials_csv(serials),
+            filename=f"serials_{now:%Y%m%d_%H%M%S}.csv",
+            caption=f"Сгенерировано номеров: {count}",
+        )
+    else:
+        # Все номера в минимальном количестве сообщений, каждый на своей строке
+        lines = [f"`{formatted_serial}`" for _, formatted_serial in serials]
+        for text in pack_lines(lines):
+            await reply_text(update, text, parse_mode="Markdown")
+
 
+def record_issued(serials: List[Tuple[str, str]], now: datetime, source: str, chat_id: Optional[int],
+                  user_id: Optional[int]) -> None:
+    """
+    Отмечает выпущенные номера в битовой карте и реестре (запись в реестр идет в фоне)
+    и учитывает их в метриках по источнику: command, inline или api.
+    """
+    SERIALS_ISSUED.inc(source, amount=len(serials))
+    if bitmap is not None:
+        bitmap.add_many(serial for serial, _ in serials)
+    if registry is not None:
+        registry.record(
+            (serial for serial, _ in serials),
+            issued_at=int(now.timestamp()),
+            chat_id=chat_id,
+            user_id=user_id,
+        )
 
+
+def issue_api_serials(count: int) -> List[Tuple[str, str]]:
+    """
+    Выдает номера для HTTP API через общий аллокатор и отмечает их выпущенными.
+    """
+    now = datetime.now(timezone.utc)
+    serials = issue_serial_numbers(count, now, allocator)
+    record_issued(serials, now, "api", chat_id=None, user_id=None)
+    return serials
+
+
+@instrument_handler("check")
 async def check_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     Обработчик команды /c или /check.
     Проверяет серийный номер.
     """
     if not context.args:
-        await update.message.reply_text(
+        await reply_text(
+            update,
             "Использование: /c XXXX-XXXX-XXXX или /check XXXX-XXXX-XXXX"
         )
         return
@@ -76,19 +260,218 @@ async def check_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     # Объединяем аргументы (на случай если номер введен с пробелами)
     serial = " ".join(context.args)
     
-    # Проверяем серийный номер
-    is_valid, serial, message = parse_serial_number(serial)
+    # Несколько номеров в одном сообщении проверяем разом и отвечаем сводкой. Номер,
+    # набранный группами через пробел, может разбиться на обрывки - это не повод
+    # для массовой проверки, поэтому нужны хотя бы два полных номера
+    complete = [candidate for candidate in split_serials(serial) if len(extract_digits(candidate)) == 12]
+    if len(complete) > 1:
+        output = io.StringIO()
+        # Проверка выпуска может обращаться к реестру SQLite - не держим цикл событий
+        summary = await asyncio.to_thread(check_lines, [serial], output, is_issued=issued_checker())
+        await reply_bulk_check(update, summary, output.getvalue().encode("utf-8"))
+        return
+    
+    (is_valid, serial, _), response = check_serial(serial)
+    record_validation(is_valid, serial)
     
+    # Для валидного номера сообщаем, выпускал ли его бот
+    if is_valid:
+        issuance = await describe_issuance(serial)
+        if issuance is not None:
+            response = f"{response}\n{issuance}"
+    elif len(serial) == 12 and TYPO_SUGGESTIONS > 0:
+        # Контрольная сумма не сошлась - предлагаем исправления опечатки
+        suggestions = await asyncio.to_thread(suggest_corrections, serial, is_issued=issued_checker())
+        suggestions = [suggestion for suggestion in suggestions if suggestion.plausible][:TYPO_SUGGESTIONS]
+        if suggestions:
+            response = f"{response}\n{render_suggestions(suggestions)}"
+    
+    await reply_text(update, response, parse_mode="Markdown")
+
+
+@instrument_handler("check_document")
+async def check_document(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Обработчик загруженного текстового или CSV-файла.
+    Проверяет все номера из файла и отвечает сводкой и CSV-файлом с результатами.
+    """
+    document = update.message.document
+    with tempfile.TemporaryDirectory() as directory:
+        input_path = os.path.join(directory, "input.txt")
+        output_path = os.path.join(directory, "result.csv")
+        telegram_file = await document.get_file()
+        await telegram_file.download_to_drive(input_path)
+        # Файл обрабатывается построчно в отдельном потоке, чтобы не блокировать другие обработчики
+        summary = await asyncio.to_thread(check_file, input_path, output_path)
+        with open(output_path, "rb") as result:
+            await reply_bulk_check(update, summary, result)
+
+
+def check_file(input_path: str, output_path: str) -> BulkCheckSummary:
+    """
+    Проверяет номера из файла input_path и пишет результаты в output_path.
+    """
+    with open(input_path, encoding="utf-8", errors="replace", newline="") as lines, \
+            open(output_path, "w", encoding="utf-8", newline="") as output:
+        return check_lines(lines, output, is_issued=issued_checker())
+
+
+async def reply_bulk_check(update: Update, summary: BulkCheckSummary, document) -> None:
+    """
+    Отправляет сводку массовой проверки и CSV-файл с результатом по каждому номеру.
+    """
+    record_bulk_check(summary)
+    if not summary.total:
+        await reply_text(update, "Серийные номера не найдены")
+        return
+    await reply_text(update, summary.render())
+    await reply_document(
+        update,
+        document=document,
+        filename=f"check_{datetime.now(timezone.utc):%Y%m%d_%H%M%S}.csv",
+    )
+
+
+async def describe_issuance(serial: str) -> Optional[str]:
+    """
+    Проверяет по битовой карте, фильтру Блума и реестру, выпускал ли бот номер.
+    Возвращает строку для ответа или None, если ни один источник не настроен.
+    """
+    # Битовая карта и фильтр отвечают мгновенно и без обращения к базе
+    if bitmap is not None and serial not in bitmap:
+        return render_issuance(None)
+    if bloom is not None and serial not in bloom:
+        return render_issuance(None)
+    if registry is not None:
+        issued = await registry.lookup_async(serial)
+        # Номер может быть в карте, но еще не записан в реестр
+        if issued is not None or bitmap is None:
+            return render_issuance(issued)
+    if bitmap is not None:
+        return "Выпущен ботом"
+    if bloom is not None:
+        return "Возможно, выпущен ботом"
+    return None
+
+
+def issued_checker() -> Optional[Callable[[SerialNumber], bool]]:
+    """
+    Синхронная проверка выпуска номера по самому быстрому из настроенных источников.
+    """
+    if bitmap is not None:
+        return bitmap.contains
+    if registry is not None:
+        return lambda serial: registry.lookup(serial) is not None
+    if bloom is not None:
+        return bloom.__contains__
+    return None
+
+
+def render_suggestions(suggestions: List[TypoSuggestion]) -> str:
+    """
+    Формирует список вариантов исправления опечатки для ответа.
+    """
+    lines = ["Возможно, имелся в виду:"]
+    # Фильтр Блума дает только "возможно выпущен"
+    issued_note = " (выпущен ботом)" if bitmap is not None or registry is not None else " (возможно, выпущен ботом)"
+    for suggestion in suggestions:
+        note = issued_note if suggestion.issued else ""
+        lines.append(f"`{suggestion.serial.formatted}`{note}")
+    return "\n".join(lines)
+
+
+def render_issuance(issued: Optional[IssuedSerial]) -> str:
+    """
+    Формирует строку ответа о выпуске номера по записи из реестра.
+    """
+    if issued is None:
+        return "Не найден в реестре выпущенных номеров"
+    issued_at = datetime.fromtimestamp(issued.issued_at, timezone.utc)
+    return f"Выпущен ботом: {issued_at:%Y-%m-%d %H:%M:%S} UTC"
+
+
+def render_check_response(is_valid: bool, serial: str, message: str) -> str:
+    """
+    Формирует текст ответа на проверку серийного номера.
+    """
     if is_valid:
         # Если валидный, message содержит информацию о дате генерации
         formatted_serial = format_serial_number(serial)
-        response = f"`{formatted_serial}`\nВалидный номер. Дата генерации: {message}"
-    else:
-        # Если невалидный, message содержит сообщение об ошибке
-        response = f"`{serial}`\nНевалидный номер ({message})"
+        return f"`{formatted_serial}`\nВалидный номер. Дата генерации: {message}"
+    # Если невалидный, message содержит сообщение об ошибке
+    return f"`{serial}`\nНевалидный номер ({message})"
+
+
+def _check_digits(digits: str) -> Tuple[Tuple[bool, str, str], str]:
+    """
+    Разбирает нормализованный номер и формирует ответ.
+    """
+    result = parse_serial_number(digits)
+    return result, render_check_response(*result)
+
+
+def check_serial(user_input: str) -> Tuple[Tuple[bool, str, str], str]:
+    """
+    Проверяет серийный номер и формирует ответ.
+    Результаты для номеров из 12 цифр кешируются по нормализованному номеру.
+    """
+    digits = extract_digits(user_input)
+    if len(digits) != 12:
+        return _check_digits(digits)
+    return check_cache.get_or_compute(digits, lambda: _check_digits(digits))
+
+
+@instrument_handler("inline")
+async def inline_query(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Обработчик инлайн-запроса @bot.
+    Генерирует номера (@bot 5) или проверяет номер (@bot XXXX-XXXX-XXXX).
+    """
+    query = update.inline_query
+    now = datetime.now(timezone.utc)
+    second = int(now.timestamp())
+    action, count = parse_inline_query(query.query)
+    if action == GENERATE:
+        # Номера у каждого пользователя свои, поэтому ключ включает пользователя,
+        # а кеш Telegram отключен: новый запрос - новые номера.
+        # Это только предложения: выпущенным отмечается выбранный номер (chosen_inline_result)
+        key = (GENERATE, query.from_user.id, count, second)
+        results = inline_cache.get(key)
+        if results is None:
+            results = serial_results(preview_serials(count, now))
+            inline_cache.put(key, results)
+        await query.answer(results, cache_time=0, is_personal=True)
+        return
     
-    await update.message.reply_text(response, parse_mode="Markdown")
+    digits = extract_digits(query.query)
+    key = (action, digits, second)
+    results = inline_cache.get(key)
+    if results is None:
+        (is_valid, serial, message), response = check_serial(digits)
+        record_validation(is_valid, serial)
+        if is_valid:
+            issuance = await describe_issuance(serial)
+            if issuance is not None:
+                response = f"{response}\n{issuance}"
+        results = check_results(digits, is_valid, message, response)
+        inline_cache.put(key, results)
+    await query.answer(results, cache_time=INLINE_CHECK_CACHE_TIME)
+
+
+@instrument_handler("inline_chosen")
+async def chosen_inline_result(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Обработчик выбора инлайн-результата: отмечает выпущенными номера,
+    которые пользователь отправил в чат. Telegram присылает такие обновления,
+    только если у @BotFather включен /setinlinefeedback.
+    """
+    chosen = update.chosen_inline_result
+    serials = chosen_serials(chosen.result_id)
+    if serials:
+        record_issued(serials, datetime.now(timezone.utc), "inline", chat_id=None, user_id=chosen.from_user.id)
+
 
+@instrument_handler("start")
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     Обработчик команды /start.
@@ -99,8 +482,10 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         "Этот бот позволяет генерировать и проверять серийные номера изделий в формате `XXSS-SSSS-SAAC`.\n\n"
         "*Доступные команды:*\n"
         "• `/g` или `/generate` — генерирует 1 серийный номер\n"
-        "• `/g NN` или `/generate NN` — генерирует NN серийных номеров (максимум 100)\n"
-        "• `/c XXXX-XXXX-XXXX` или `/check XXXX-XXXX-XXXX` — проверяет серийный номер\n\n"
+        "• `/g NN` или `/generate NN` — генерирует NN серийных номеров (максимум 99)\n"
+        "• `/c XXXX-XXXX-XXXX` или `/check XXXX-XXXX-XXXX` — проверяет серийный номер\n"
+        "• `/c` с несколькими номерами или текстовый/CSV-файл — массовая проверка\n"
+        "• `@бот NN` в любом чате — генерирует NN номеров, `@бот XXXX-XXXX-XXXX` — проверяет номер\n\n"
         "*Примеры:*\n"
         "`/g`\n"
         "`/g 5`\n"
@@ -108,21 +493,111 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         "`/check 012345678912`\n\n"
         f"Версия: {VERSION}\n"
     )
-    await update.message.reply_text(help_text, parse_mode="Markdown")
+    await reply_text(update, help_text, parse_mode="Markdown")
 
-def main() -> None:
-    """Запуск бота."""
-    # Создаем приложение
-    application = Application.builder().token(BOT_TOKEN).build()
+async def post_init(application: Application) -> None:
+    """
+    Запускает планировщик исходящих сообщений, сервер API и сервер метрик в цикле событий приложения.
+    """
+    if send_queue is not None:
+        send_queue.start()
+    if api_server is not None:
+        await api_server.start()
+        print(f"HTTP API слушает {api_server.host}:{api_server.port}")
+    if metrics_server is not None:
+        await metrics_server.start()
+        print(f"Метрики: http://{metrics_server.host}:{metrics_server.port}/metrics")
+
+
+async def post_stop(application: Application) -> None:
+    """
+    Останавливает серверы API и метрик и дожидается отправки сообщений из очереди, пока соединение с Telegram еще открыто.
+    """
+    if api_server is not None:
+        await api_server.stop()
+    if metrics_server is not None:
+        await metrics_server.stop()
+    if send_queue is not None:
+        await send_queue.stop()
+
+
+async def post_shutdown(application: Application) -> None:
+    """
+    Дописывает очередь реестра, сбрасывает битовые карты и закрывает фильтр при остановке бота.
+    """
+    if registry is not None:
+        registry.close()
+    if bitmap is not None:
+        bitmap.close()
+    if bloom is not None:
+        bloom.close()
+
+
+def build_application(token: str, base_url: Optional[str] = None) -> Application:
+    """
+    Создает приложение с обработчиками и очередью исходящих сообщений.
+    base_url заменяет адрес Bot API (к нему дописывается токен).
+    """
+    global send_queue
+    # Обновления обрабатываются параллельно, ответы идут через очередь; вызовы Bot API
+    # замеряются (размеры пулов соединений - как по умолчанию в python-telegram-bot)
+    builder = (
+        Application.builder()
+        .token(token)
+        .request(InstrumentedRequest(connection_pool_size=256))
+        .get_updates_request(InstrumentedRequest(connection_pool_size=1))
+        .concurrent_updates(CONCURRENT_UPDATES if CONCURRENT_UPDATES > 1 else False)
+        .post_init(post_init)
+        .post_stop(post_stop)
+        .post_shutdown(post_shutdown)
+    )
+    if base_url:
+        builder = builder.base_url(base_url)
+    application = builder.build()
+    if SEND_GLOBAL_RATE > 0:
+        send_queue = SendQueue(application.bot.send_message, SEND_GLOBAL_RATE, SEND_CHAT_RATE, SEND_CHAT_BURST)
+    watch_send_queue(send_queue)
     
     # Регистрируем обработчики команд
     application.add_handler(CommandHandler(["start"], start_command))
     application.add_handler(CommandHandler(["g", "generate"], generate_command))
     application.add_handler(CommandHandler(["c", "check"], check_command))
+    application.add_handler(InlineQueryHandler(inline_query))
+    application.add_handler(ChosenInlineResultHandler(chosen_inline_result))
+    application.add_handler(MessageHandler(
+        filters.Document.TXT | filters.Document.MimeType("text/csv") | filters.Document.FileExtension("csv"),
+        check_document,
+    ))
+    return application
+
+
+def main() -> None:
+    """Запуск бота."""
+    global allocator, registry, bitmap, bloom, api_server, metrics_server
+    if SERIAL_LEASE_PATH:
+        allocator = LeasedSerialAllocator(LeaseStore(SERIAL_LEASE_PATH))
+    if SERIAL_REGISTRY_PATH:
+        registry = SerialRegistry(SERIAL_REGISTRY_PATH)
+    if SERIAL_BITMAP_DIR:
+        bitmap = SerialBitmap(SERIAL_BITMAP_DIR)
+    if SERIAL_BLOOM_PATH:
+        bloom = BloomSnapshot(SERIAL_BLOOM_PATH, SERIAL_BLOOM_RELOAD_SECONDS)
+    
+    application = build_application(BOT_TOKEN, BOT_API_URL or None)
+    if API_PORT:
+        # Сервер API работает в цикле событий бота и запускается в post_init
+        api_server = create_api_server(issue_api_serials, issued_checker(), API_TOKEN or None, API_LISTEN,
+                                       int(API_PORT), API_MAX_COUNT)
+    if METRICS_PORT:
+        metrics_server = create_metrics_server(host=METRICS_LISTEN, port=int(METRICS_PORT))
     
     # Запускаем бота
     print("Бот запущен...")
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    if BOT_MODE == "webhook":
+        server = create_webhook_server(application, WEBHOOK_PATH, WEBHOOK_SECRET, WEBHOOK_LISTEN, WEBHOOK_PORT)
+        asyncio.run(run_webhook(application, server, WEBHOOK_URL or None, WEBHOOK_SECRET))
+    else:
+        application.run_polling(allowed_updates=Update.ALL_TYPES)
 
 
 if __name__ == "__main__":
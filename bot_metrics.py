@@ -0,0 +1,128 @@
+"""
+Модуль с метриками бота: обработчики, выпуск и проверка номеров, вызовы Bot API
+и очередь исходящих сообщений. Метрики регистрируются в metrics.REGISTRY и
+отдаются в формате Prometheus сервером metrics.create_metrics_server.
+"""
+import functools
+import time
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from telegram.request import HTTPXRequest
+
+from bulk_check import BulkCheckSummary
+from metrics import CallbackMetric, Counter, Histogram
+from send_queue import SendQueue
+
+HANDLER_REQUESTS = Counter(
+    "serial_bot_handler_requests_total", "Обновления, переданные обработчику", ("handler",))
+HANDLER_ERRORS = Counter(
+    "serial_bot_handler_errors_total", "Исключения в обработчиках по классу", ("handler", "exception"))
+HANDLER_DURATION = Histogram(
+    "serial_bot_handler_duration_seconds", "Время работы обработчика", ("handler",))
+SERIALS_ISSUED = Counter(
+    "serial_bot_serials_issued_total", "Выданные серийные номера по источнику (command, inline, api)", ("source",))
+VALIDATIONS = Counter(
+    "serial_bot_validations_total", "Проверенные номера по результату (valid, bad_length, bad_checksum)", ("outcome",))
+BOT_API_DURATION = Histogram(
+    "serial_bot_telegram_api_duration_seconds", "Время вызова метода Bot API", ("method",))
+BOT_API_ERRORS = Counter(
+    "serial_bot_telegram_api_errors_total", "Неудачные вызовы Bot API по исключению или HTTP-статусу",
+    ("method", "error"))
+
+VALID = "valid"
+BAD_LENGTH = "bad_length"
+BAD_CHECKSUM = "bad_checksum"
+
+# Очередь, статистику которой отдают метрики очереди
+_send_queue: Optional[SendQueue] = None
+
+
+def _send_queue_gauges():
+    if _send_queue is not None:
+        stats = _send_queue.stats()
+        yield ("depth",), stats["depth"]
+        yield ("max_depth",), stats["max_depth"]
+        yield ("chats",), stats["chats"]
+        yield ("wait_avg_seconds",), stats["wait_avg"]
+        yield ("wait_max_seconds",), stats["wait_max"]
+
+
+def _send_queue_messages():
+    if _send_queue is not None:
+        stats = _send_queue.stats()
+        for result in ("sent", "coalesced", "failed"):
+            yield (result,), stats[result]
+
+
+CallbackMetric("serial_bot_send_queue", "Состояние очереди исходящих сообщений", _send_queue_gauges, ("stat",))
+CallbackMetric("serial_bot_send_queue_messages_total", "Сообщения очереди: отправлено запросов, склеено, с ошибкой",
+               _send_queue_messages, ("result",), metric_type="counter")
+
+
+def watch_send_queue(queue: Optional[SendQueue]) -> None:
+    """
+    Отдавать в метриках статистику очереди исходящих сообщений.
+    """
+    global _send_queue
+    _send_queue = queue
+
+
+def record_validation(is_valid: bool, digits: str) -> None:
+    """
+    Учитывает проверку одного номера. Как и в SerialNumber.parse, номер не из 12 цифр -
+    ошибка длины, иначе невалидный номер - ошибка контрольной суммы.
+    """
+    VALIDATIONS.inc(VALID if is_valid else BAD_LENGTH if len(digits) != 12 else BAD_CHECKSUM)
+
+
+def record_bulk_check(summary: BulkCheckSummary) -> None:
+    """
+    Учитывает результаты массовой проверки.
+    """
+    for outcome, count in ((VALID, summary.valid), (BAD_LENGTH, summary.bad_length),
+                           (BAD_CHECKSUM, summary.bad_checksum)):
+        if count:
+            VALIDATIONS.inc(outcome, amount=count)
+
+
+Handler = TypeVar("Handler", bound=Callable[..., Awaitable[Any]])
+
+
+def instrument_handler(name: str) -> Callable[[Handler], Handler]:
+    """
+    Декоратор обработчика: число вызовов, время работы и исключения по классу.
+    """
+    def decorator(handler: Handler) -> Handler:
+        @functools.wraps(handler)
+        async def wrapper(*args, **kwargs):
+            HANDLER_REQUESTS.inc(name)
+            started = time.perf_counter()
+            try:
+                return await handler(*args, **kwargs)
+            except Exception as error:
+                HANDLER_ERRORS.inc(name, type(error).__name__)
+                raise
+            finally:
+                HANDLER_DURATION.observe(time.perf_counter() - started, name)
+        return wrapper
+    return decorator
+
+
+class InstrumentedRequest(HTTPXRequest):
+    """
+    HTTPXRequest, который замеряет время каждого вызова Bot API и считает ошибки.
+    """
+
+    async def do_request(self, url: str, method: str, request_data=None, **kwargs):
+        api_method = url.rsplit("/", 1)[-1]
+        started = time.perf_counter()
+        try:
+            status, payload = await super().do_request(url, method, request_data, **kwargs)
+        except Exception as error:
+            BOT_API_ERRORS.inc(api_method, type(error).__name__)
+            raise
+        finally:
+            BOT_API_DURATION.observe(time.perf_counter() - started, api_method)
+        if status >= 400:
+            BOT_API_ERRORS.inc(api_method, f"http_{status}")
+        return status, payload
@@ -0,0 +1,136 @@
+"""
+Модуль для массовой проверки серийных номеров.
+
+Номера ищутся в произвольном тексте: в сообщении бота или в загруженном
+текстовом/CSV-файле. Файл обрабатывается построчно, результаты сразу пишутся
+в выходной CSV, а в памяти держатся только счетчики, поэтому расход памяти не
+зависит от размера файла.
+"""
+import csv
+import re
+from collections import Counter
+from typing import Callable, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from serial_number import SerialNumber, SerialNumberChecksumError, SerialNumberError, extract_digits, get_quarter_date_string
+
+# Разделители ячеек: номер не может продолжаться через них
+_CELL_SEPARATORS = re.compile(r"[,;\t|]")
+
+SERIAL_DIGITS = 12
+
+
+def _cell_candidates(cell: str) -> List[Tuple[str, bool]]:
+    """
+    Собирает номера из ячейки: соседние группы цифр, разделенные пробелами,
+    склеиваются, пока не наберется 12 цифр. Возвращает пары (кандидат, ровно ли в нем 12 цифр).
+    """
+    candidates: List[Tuple[str, bool]] = []
+    pending: List[str] = []
+    pending_digits = 0
+    for token in cell.split():
+        digits = len(extract_digits(token))
+        if not digits:
+            continue
+        if pending and pending_digits + digits > SERIAL_DIGITS:
+            candidates.append((" ".join(pending), False))
+            pending, pending_digits = [], 0
+        pending.append(token)
+        pending_digits += digits
+        if pending_digits >= SERIAL_DIGITS:
+            candidates.append((" ".join(pending), pending_digits == SERIAL_DIGITS))
+            pending, pending_digits = [], 0
+    if pending:
+        candidates.append((" ".join(pending), False))
+    return candidates
+
+
+def split_serials(line: str) -> List[str]:
+    """
+    Находит в строке текста кандидатов в серийные номера.
+    Если строка разбита на ячейки (CSV) и в одних ячейках есть полные номера,
+    ячейки только с обрывками цифр (даты, количества) не считаются номерами.
+    """
+    cells = _CELL_SEPARATORS.split(line)
+    found = [_cell_candidates(cell) for cell in cells]
+    has_complete = any(complete for candidates in found for _, complete in candidates)
+    result: List[str] = []
+    for candidates in found:
+        if len(cells) > 1 and has_complete and not any(complete for _, complete in candidates):
+            continue
+        result.extend(candidate for candidate, _ in candidates)
+    return result
+
+
+def iter_serials(lines: Iterable[str]) -> Iterator[Tuple[int, str]]:
+    """
+    Перебирает кандидатов в номера построчно. Возвращает пары (номер строки, кандидат).
+    """
+    for line_number, line in enumerate(lines, start=1):
+        for candidate in split_serials(line):
+            yield line_number, candidate
+
+
+class BulkCheckSummary:
+    """
+    Итоги массовой проверки.
+    """
+
+    def __init__(self) -> None:
+        self.total = 0
+        self.valid = 0
+        self.bad_length = 0
+        self.bad_checksum = 0
+        self.issued = 0
+        self.by_quarter: Counter = Counter()
+
+    def render(self) -> str:
+        """
+        Текст сводки для ответа бота.
+        """
+        lines = [
+            f"Проверено номеров: {self.total}",
+            f"Валидных: {self.valid}",
+            f"Неверная длина: {self.bad_length}",
+            f"Ошибка контрольной суммы: {self.bad_checksum}",
+        ]
+        if self.issued:
+            lines.append(f"Выпущены ботом: {self.issued}")
+        if self.by_quarter:
+            lines.append("По кварталам:")
+            for quarter, count in sorted(self.by_quarter.items()):
+                lines.append(f"• {get_quarter_date_string(quarter)}: {count}")
+        return "\n".join(lines)
+
+
+def check_lines(lines: Iterable[str], output: Optional[TextIO] = None,
+                is_issued: Optional[Callable[[SerialNumber], bool]] = None) -> BulkCheckSummary:
+    """
+    Проверяет все номера из строк и пишет построчные результаты в output в формате CSV.
+    is_issued - необязательная проверка, выпускал ли бот номер.
+    """
+    summary = BulkCheckSummary()
+    writer = csv.writer(output, lineterminator="\n") if output is not None else None
+    if writer is not None:
+        header = ["line", "input", "serial", "valid", "message"]
+        writer.writerow(header + ["issued"] if is_issued else header)
+    for line_number, candidate in iter_serials(lines):
+        summary.total += 1
+        issued = ""
+        try:
+            serial = SerialNumber.parse(candidate)
+        except SerialNumberError as error:
+            if isinstance(error, SerialNumberChecksumError):
+                summary.bad_checksum += 1
+            else:
+                summary.bad_length += 1
+            row = [line_number, candidate, error.digits, "false", error.message]
+        else:
+            summary.valid += 1
+            summary.by_quarter[serial.quarter] += 1
+            if is_issued is not None:
+                issued = "true" if is_issued(serial) else "false"
+                summary.issued += issued == "true"
+            row = [line_number, candidate, serial.digits, "true", serial.date_string]
+        if writer is not None:
+            writer.writerow(row + [issued] if is_issued else row)
+    return summary
@@ -0,0 +1,44 @@
+"""
+Модуль для упаковки массовых ответов бота.
+Вместо отдельного сообщения на каждую строку строки собираются в минимальное
+число сообщений в пределах лимита Telegram, либо в один CSV-файл.
+"""
+import csv
+import io
+from typing import Iterable, List, Tuple
+
+# Максимальная длина текста сообщения в Telegram
+MESSAGE_LIMIT = 4096
+
+
+def pack_lines(lines: Iterable[str], limit: int = MESSAGE_LIMIT, separator: str = "\n") -> List[str]:
+    """
+    Склеивает строки в сообщения длиной не более limit символов.
+    Строки не разрываются; строка длиннее limit отправляется отдельным сообщением как есть.
+    """
+    messages: List[str] = []
+    current: List[str] = []
+    current_length = 0
+    for line in lines:
+        added_length = len(line) + (len(separator) if current else 0)
+        if current and current_length + added_length > limit:
+            messages.append(separator.join(current))
+            current = []
+            current_length = 0
+            added_length = len(line)
+        current.append(line)
+        current_length += added_length
+    if current:
+        messages.append(separator.join(current))
+    return messages
+
+
+def serials_csv(serials: Iterable[Tuple[str, str]]) -> bytes:
+    """
+    Формирует CSV-файл из пар (номер, отформатированный номер).
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(["serial", "formatted"])
+    writer.writerows(serials)
+    return buffer.getvalue().encode("utf-8")
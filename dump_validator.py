@@ -0,0 +1,231 @@
+"""
+Модуль для проверки больших выгрузок серийных номеров (по номеру в строке).
+
+Файл отображается в память через mmap и делится на куски по границам строк.
+Куски проверяются в пуле процессов: каждый процесс сам отображает файл и
+работает со своим диапазоном байт без копирования в строки Python. С NumPy
+строки вида XXXXXXXXXXXX и XXXX-XXXX-XXXX проверяются векторно, остальные
+(пробелы, лишние символы) разбираются по одной через SerialNumber.parse.
+Результаты кусков сливаются в счетчики по кварталам и список смещений
+невалидных строк.
+
+    python dump_validator.py serials.log --workers 8
+    python dump_validator.py serials.log --list-invalid > invalid.txt
+"""
+import argparse
+import mmap
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+from bulk_check import BulkCheckSummary
+from luhn_algorithm import check_luhn_batch
+from serial_number import SerialNumber, SerialNumberChecksumError, SerialNumberError
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен
+    np = None
+
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
+
+# Позиции цифр в строке XXXXXXXXXXXX и XXXX-XXXX-XXXX
+_PLAIN_COLUMNS = tuple(range(12))
+_FORMATTED_COLUMNS = (0, 1, 2, 3, 5, 6, 7, 8, 10, 11, 12, 13)
+
+
+class DumpReport(BulkCheckSummary):
+    """
+    Итоги проверки выгрузки: счетчики и смещения (в байтах от начала файла) невалидных строк.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.invalid_offsets: List[int] = []
+
+    def merge(self, other: "DumpReport") -> None:
+        """
+        Добавляет итоги другого куска.
+        """
+        self.total += other.total
+        self.valid += other.valid
+        self.bad_length += other.bad_length
+        self.bad_checksum += other.bad_checksum
+        self.by_quarter.update(other.by_quarter)
+        self.invalid_offsets.extend(other.invalid_offsets)
+
+    def _add_parsed(self, offset: int, line: bytes) -> None:
+        """
+        Проверяет одну строку через SerialNumber.parse.
+        """
+        self.total += 1
+        try:
+            serial = SerialNumber.parse(line.decode("utf-8", errors="replace"))
+        except SerialNumberError as error:
+            if isinstance(error, SerialNumberChecksumError):
+                self.bad_checksum += 1
+            else:
+                self.bad_length += 1
+            self.invalid_offsets.append(offset)
+        else:
+            self.valid += 1
+            self.by_quarter[serial.quarter] += 1
+
+
+def split_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[Tuple[int, int]]:
+    """
+    Делит файл на диапазоны байт [start, end) примерно по chunk_size, заканчивающиеся на границе строки.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    chunks: List[Tuple[int, int]] = []
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        start = 0
+        while start < size:
+            newline = mapped.find(b"\n", min(start + chunk_size, size) - 1)
+            end = size if newline == -1 else newline + 1
+            chunks.append((start, end))
+            start = end
+    return chunks
+
+
+def _iter_lines(mapped: mmap.mmap, start: int, end: int) -> Iterator[Tuple[int, bytes]]:
+    """
+    Строки диапазона без перевода строки: пары (смещение, строка). Пустые строки пропускаются.
+    """
+    position = start
+    while position < end:
+        newline = mapped.find(b"\n", position, end)
+        line_end = end if newline == -1 else newline
+        line = mapped[position:line_end].rstrip(b"\r")
+        if line:
+            yield position, line
+        position = line_end + 1
+
+
+def _scan_python(mapped: mmap.mmap, start: int, end: int) -> DumpReport:
+    """
+    Проверка диапазона по одной строке (без NumPy).
+    """
+    report = DumpReport()
+    for offset, line in _iter_lines(mapped, start, end):
+        report._add_parsed(offset, line)
+    return report
+
+
+def _scan_numpy(mapped: mmap.mmap, start: int, end: int) -> DumpReport:
+    """
+    Векторная проверка диапазона: строки из 12 цифр и формата XXXX-XXXX-XXXX
+    проверяются матрицей, остальные - по одной.
+    """
+    report = DumpReport()
+    view = np.frombuffer(mapped, dtype=np.uint8, count=end - start, offset=start)
+    newlines = np.flatnonzero(view == ord("\n"))
+    starts = np.concatenate(([0], newlines + 1))
+    ends = np.concatenate((newlines, [len(view)]))
+    # Отбрасываем \r в конце строк и пустые строки
+    has_cr = ends > starts
+    has_cr[has_cr] = view[ends[has_cr] - 1] == ord("\r")
+    ends = ends - has_cr
+    lengths = ends - starts
+    starts, lengths = starts[lengths > 0], lengths[lengths > 0]
+
+    plain = lengths == 12
+    formatted = lengths == 14
+    formatted[formatted] = (view[starts[formatted] + 4] == ord("-")) & (view[starts[formatted] + 9] == ord("-"))
+    matrix_rows = plain | formatted
+    rows = starts[matrix_rows]
+    columns = np.where(formatted[matrix_rows][:, None], _FORMATTED_COLUMNS, _PLAIN_COLUMNS)
+    digits = view[rows[:, None] + columns] - np.uint8(ord("0"))
+    only_digits = (digits <= 9).all(axis=1)
+
+    digits, rows = digits[only_digits], rows[only_digits]
+    mask = np.asarray(check_luhn_batch(digits, width=12)[0], dtype=bool)
+    quarters = digits[mask, 0].astype(np.int64) * 10 + digits[mask, 1]
+    report.total += len(rows)
+    report.valid += int(mask.sum())
+    report.bad_checksum += int((~mask).sum())
+    report.by_quarter.update({int(quarter): int(count) for quarter, count in
+                              enumerate(np.bincount(quarters, minlength=0)) if count})
+    report.invalid_offsets.extend((rows[~mask] + start).tolist())
+
+    # Строки другого вида и с посторонними символами разбираем так же, как бот
+    irregular = np.concatenate((np.flatnonzero(~matrix_rows), np.flatnonzero(matrix_rows)[~only_digits]))
+    for line_start, length in zip(starts[irregular].tolist(), lengths[irregular].tolist()):
+        report._add_parsed(start + line_start, view[line_start:line_start + length].tobytes())
+    del view
+    report.invalid_offsets.sort()
+    return report
+
+
+def scan_chunk(path: str, start: int, end: int, use_numpy: bool = True) -> DumpReport:
+    """
+    Проверяет диапазон байт [start, end) файла. Файл отображается в память в этом же процессе.
+    """
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        if np is not None and use_numpy:
+            return _scan_numpy(mapped, start, end)
+        return _scan_python(mapped, start, end)
+
+
+def validate_dump(path: str, workers: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  use_numpy: bool = True) -> DumpReport:
+    """
+    Проверяет файл с номерами по одному в строке, распределяя куски по workers процессам.
+    """
+    chunks = split_chunks(path, chunk_size)
+    report = DumpReport()
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(workers) as executor:
+            futures = [executor.submit(scan_chunk, path, start, end, use_numpy) for start, end in chunks]
+            for future in futures:
+                report.merge(future.result())
+    else:
+        for start, end in chunks:
+            report.merge(scan_chunk(path, start, end, use_numpy))
+    return report
+
+
+def read_line(path: str, offset: int) -> str:
+    """
+    Строка файла, начинающаяся со смещения offset.
+    """
+    with open(path, "rb") as file:
+        file.seek(offset)
+        return file.readline().rstrip(b"\r\n").decode("utf-8", errors="replace")
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Проверка выгрузки серийных номеров."""
+    parser = argparse.ArgumentParser(description="Проверка большой выгрузки серийных номеров (номер в строке)")
+    parser.add_argument("path", help="файл выгрузки")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="число процессов")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="размер куска в байтах")
+    parser.add_argument("--list-invalid", action="store_true", help="вывести смещения и содержимое невалидных строк")
+    parser.add_argument("--no-numpy", action="store_true", help="не использовать NumPy")
+    args = parser.parse_args(argv)
+    if args.chunk_size <= 0:
+        parser.error("--chunk-size должен быть положительным")
+
+    started = time.perf_counter()
+    report = validate_dump(args.path, args.workers, args.chunk_size, use_numpy=not args.no_numpy)
+    elapsed = time.perf_counter() - started
+
+    if args.list_invalid:
+        for offset in report.invalid_offsets:
+            print(f"{offset}\t{read_line(args.path, offset)}")
+    else:
+        print(report.render())
+        print(f"Невалидных строк: {len(report.invalid_offsets)}")
+    size = os.path.getsize(args.path)
+    rate = report.total / elapsed if elapsed > 0 else 0.0
+    print(f"Время: {elapsed:.3f} с, {rate:.0f} номеров/с, {size / elapsed / 1024 / 1024 if elapsed > 0 else 0:.1f} МБ/с",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,446 @@
+"""
+Модуль с поддельным сервером Bot API для нагрузочного тестирования бота.
+
+Сервер работает на встроенном HTTP-сервере (http_server.py) и отвечает на те
+методы Bot API, которые вызывает бот: getMe, deleteWebhook, getUpdates
+(long polling), sendMessage, sendDocument, answerInlineQuery. Обновления не
+приходят от пользователей, а генерируются с заданной скоростью и смесью
+команд (/g N, /c номер, /start). Для каждой команды запоминается момент ее
+появления, а первый ответ в тот же чат закрывает самую старую команду чата
+без ответа - так получается задержка "команда -> ответ". Если чатов меньше,
+чем команд (--chats), ответ из нескольких сообщений может закрыть следующую
+команду того же чата, поэтому точные задержки дает режим "новый чат на
+каждую команду" (--chats 0, по умолчанию).
+
+Сервер можно запустить отдельно и направить на него бота через BOT_API_URL:
+
+    python fake_bot_api.py --port 8081 --rate 200 --duration 30
+    BOT_TOKEN=123456:LOAD-TEST BOT_API_URL=http://127.0.0.1:8081/bot python bot.py
+
+или запустить бота и сервер в одном процессе через load_test.py.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import signal
+import sys
+import time
+from collections import Counter, deque
+from typing import Deque, Dict, List, Optional, Sequence
+from urllib.parse import parse_qsl
+
+from http_server import HttpServer, Request, Response
+from serial_number import generate_serial_numbers
+
+FAKE_TOKEN = "123456:LOAD-TEST"
+FAKE_BOT = {"id": 123456, "is_bot": True, "first_name": "Load test", "username": "load_test_bot"}
+
+# Смесь команд по умолчанию: вес каждой команды
+DEFAULT_MIX = {"g": 5.0, "c": 4.0, "start": 1.0}
+
+# Сколько максимум держать запрос getUpdates без новых обновлений
+MAX_POLL_SECONDS = 1.0
+
+_MULTIPART_FIELD = re.compile(rb'name="([^"]+)"\r\n\r\n([^\r]*)\r\n')
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """
+    Разбирает смесь команд вида "g=5,c=4,start=1".
+    """
+    mix: Dict[str, float] = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip().lstrip("/")
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Неизвестная команда: {name}")
+        mix[name] = float(weight) if weight else 1.0
+        if mix[name] < 0:
+            raise ValueError("Вес команды не может быть отрицательным")
+    if not sum(mix.values()):
+        raise ValueError("Нужна хотя бы одна команда с положительным весом")
+    return mix
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """
+    Перцентиль отсортированной последовательности (ближайший ранг).
+    """
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, math.ceil(fraction * len(values)) - 1))
+    return values[index]
+
+
+class LoadProfile:
+    """
+    Параметры нагрузки: скорость (команд в секунду), длительность, смесь команд,
+    число чатов (0 - новый чат на каждую команду), количество номеров в /g
+    и доля номеров с опечаткой в /c.
+    """
+
+    def __init__(self, rate: float = 50.0, duration: float = 10.0, mix: Optional[Dict[str, float]] = None,
+                 chats: int = 0, generate_count: int = 5, invalid_share: float = 0.3,
+                 seed: Optional[int] = None) -> None:
+        if rate <= 0 or duration <= 0:
+            raise ValueError("Скорость и длительность должны быть положительными")
+        self.rate = rate
+        self.duration = duration
+        self.mix = mix or dict(DEFAULT_MIX)
+        self.chats = chats
+        self.generate_count = generate_count
+        self.invalid_share = invalid_share
+        self.seed = seed
+
+
+class LoadReport:
+    """
+    Итоги нагрузки: число команд и ответов, задержки (секунды, по возрастанию) и длительность.
+    """
+
+    def __init__(self, commands: int, answered: int, messages: int, documents: int, latencies: List[float],
+                 elapsed: float, by_command: Dict[str, int]) -> None:
+        self.commands = commands
+        self.answered = answered
+        self.messages = messages
+        self.documents = documents
+        self.latencies = sorted(latencies)
+        self.elapsed = elapsed
+        self.by_command = by_command
+
+    @property
+    def unanswered(self) -> int:
+        return self.commands - self.answered
+
+    @property
+    def error_rate(self) -> float:
+        """
+        Доля команд, оставшихся без ответа.
+        """
+        return self.unanswered / self.commands if self.commands else 0.0
+
+    @property
+    def throughput(self) -> float:
+        """
+        Ответов (на команды) в секунду.
+        """
+        return self.answered / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        """
+        Итоги в виде словаря (задержки в миллисекундах).
+        """
+        return {
+            "commands": self.commands,
+            "answered": self.answered,
+            "unanswered": self.unanswered,
+            "error_rate": self.error_rate,
+            "messages": self.messages,
+            "documents": self.documents,
+            "elapsed": self.elapsed,
+            "throughput": self.throughput,
+            "p50_ms": percentile(self.latencies, 0.50) * 1000,
+            "p95_ms": percentile(self.latencies, 0.95) * 1000,
+            "p99_ms": percentile(self.latencies, 0.99) * 1000,
+            "max_ms": (self.latencies[-1] if self.latencies else 0.0) * 1000,
+        }
+
+    def render(self) -> str:
+        """
+        Текстовый отчет.
+        """
+        data = self.to_dict()
+        mix = ", ".join(f"/{name}: {count}" for name, count in sorted(self.by_command.items()))
+        return "\n".join([
+            f"Команд: {self.commands} ({mix})",
+            f"С ответом: {self.answered}, без ответа: {self.unanswered} ({data['error_rate']:.2%})",
+            f"Сообщений: {self.messages}, файлов: {self.documents}",
+            f"Пропускная способность: {data['throughput']:.1f} ответов/с за {self.elapsed:.2f} с",
+            f"Задержка команда -> ответ, мс: p50 {data['p50_ms']:.1f}, p95 {data['p95_ms']:.1f}, "
+            f"p99 {data['p99_ms']:.1f}, max {data['max_ms']:.1f}",
+        ])
+
+
+class FakeBotApi:
+    """
+    Поддельный сервер Bot API с генератором обновлений.
+    """
+
+    def __init__(self, profile: LoadProfile, token: str = FAKE_TOKEN, host: str = "127.0.0.1",
+                 port: int = 0) -> None:
+        self.profile = profile
+        self.token = token
+        self.server = HttpServer(host, port, max_body=64 * 1024 * 1024)
+        self._random = random.Random(profile.seed)
+        self._serials = [serial for _, serial in generate_serial_numbers(1_780_000_000, range(1, 100))]
+        # Обновления, выданные боту, но еще не подтвержденные смещением в getUpdates
+        self._updates: Deque[dict] = deque()
+        self._new_updates = asyncio.Event()
+        self._next_update_id = 1
+        self._next_message_id = 1
+        # Команды без ответа по чатам: моменты их появления
+        self._pending: Dict[int, Deque[float]] = {}
+        self._latencies: List[float] = []
+        self._commands = 0
+        self._by_command: Counter = Counter()
+        self._messages = 0
+        self._documents = 0
+        self._started_at = 0.0
+        self._last_reply_at = 0.0
+        self._closing = False
+        # Бот впервые запросил обновления - можно давать нагрузку
+        self.polled = asyncio.Event()
+        self._routes()
+
+    @property
+    def base_url(self) -> str:
+        """
+        Адрес для Application.builder().base_url(): токен дописывается к нему.
+        """
+        return f"http://{self.server.host}:{self.server.port}/bot"
+
+    @property
+    def answered(self) -> int:
+        return len(self._latencies)
+
+    def _routes(self) -> None:
+        handlers = {
+            "getMe": self._get_me,
+            "deleteWebhook": self._true,
+            "setWebhook": self._true,
+            "answerInlineQuery": self._true,
+            "getUpdates": self._get_updates,
+            "sendMessage": self._send_message,
+            "sendDocument": self._send_document,
+        }
+        for method, handler in handlers.items():
+            self.server.route("POST", f"/bot{self.token}/{method}", handler)
+
+    async def start(self) -> None:
+        await self.server.start()
+
+    async def stop(self) -> None:
+        self._closing = True
+        self._new_updates.set()
+        await self.server.stop()
+
+    def add_command(self, text: str, chat_id: int) -> None:
+        """
+        Ставит в очередь обновление с командой от пользователя chat_id.
+        """
+        command = text.split(" ", 1)[0]
+        update_id = self._next_update_id
+        self._next_update_id += 1
+        self._updates.append({
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "from": {"id": chat_id, "is_bot": False, "first_name": "Load"},
+                "text": text,
+                "entities": [{"type": "bot_command", "offset": 0, "length": len(command)}],
+            },
+        })
+        self._pending.setdefault(chat_id, deque()).append(time.perf_counter())
+        self._commands += 1
+        self._by_command[command.lstrip("/")] += 1
+        self._new_updates.set()
+
+    def _next_command(self) -> str:
+        """
+        Случайная команда по смеси профиля.
+        """
+        names = list(self.profile.mix)
+        name = self._random.choices(names, [self.profile.mix[name] for name in names])[0]
+        if name == "g":
+            return f"/g {self.profile.generate_count}"
+        if name == "c":
+            serial = self._random.choice(self._serials)
+            if self._random.random() < self.profile.invalid_share:
+                # Опечатка в последней цифре - контрольная сумма не сойдется
+                serial = serial[:-1] + str((int(serial[-1]) + 1) % 10)
+            return f"/c {serial}"
+        return "/start"
+
+    async def run_load(self) -> None:
+        """
+        Генерирует команды со скоростью профиля в течение его длительности.
+        """
+        self._started_at = time.perf_counter()
+        total = int(self.profile.rate * self.profile.duration)
+        produced = 0
+        while produced < total:
+            due = min(total, int((time.perf_counter() - self._started_at) * self.profile.rate) + 1)
+            while produced < due:
+                chat_id = produced % self.profile.chats + 1 if self.profile.chats else produced + 1
+                self.add_command(self._next_command(), chat_id)
+                produced += 1
+            await asyncio.sleep(min(0.01, 1 / self.profile.rate))
+
+    async def wait_replies(self, timeout: float) -> None:
+        """
+        Ждет ответов на все команды, но не дольше timeout секунд.
+        """
+        deadline = time.perf_counter() + timeout
+        while self.answered < self._commands and time.perf_counter() < deadline:
+            await asyncio.sleep(0.01)
+
+    def report(self) -> LoadReport:
+        """
+        Итоги на текущий момент. Длительность - от первой команды до последнего ответа.
+        """
+        elapsed = self._last_reply_at - self._started_at if self._last_reply_at else 0.0
+        return LoadReport(self._commands, self.answered, self._messages, self._documents, self._latencies,
+                          elapsed, dict(self._by_command))
+
+    def _reply_to(self, chat_id: int) -> None:
+        """
+        Отмечает ответ в чат: закрывает самую старую команду чата без ответа.
+        """
+        now = time.perf_counter()
+        pending = self._pending.get(chat_id)
+        if pending:
+            self._latencies.append(now - pending.popleft())
+            if not pending:
+                del self._pending[chat_id]
+        self._last_reply_at = now
+
+    def _message(self, chat_id: int, **fields) -> dict:
+        message_id = self._next_message_id
+        self._next_message_id += 1
+        return {"message_id": message_id, "date": int(time.time()), "chat": {"id": chat_id, "type": "private"},
+                "from": FAKE_BOT, **fields}
+
+    @staticmethod
+    def _params(request: Request) -> Dict[str, str]:
+        """
+        Параметры метода: Bot API принимает форму, multipart (с файлами) и JSON.
+        """
+        content_type = request.headers.get("content-type", "")
+        if content_type.startswith("multipart/form-data"):
+            return {name.decode(): value.decode("utf-8", errors="replace")
+                    for name, value in _MULTIPART_FIELD.findall(request.body)}
+        if content_type.startswith("application/json"):
+            return {name: value if isinstance(value, str) else json.dumps(value)
+                    for name, value in request.json().items()}
+        return dict(parse_qsl(request.body.decode("utf-8")))
+
+    @staticmethod
+    def _ok(result) -> Response:
+        return Response.json({"ok": True, "result": result})
+
+    async def _true(self, request: Request) -> Response:
+        return self._ok(True)
+
+    async def _get_me(self, request: Request) -> Response:
+        return self._ok(FAKE_BOT)
+
+    async def _get_updates(self, request: Request) -> Response:
+        self.polled.set()
+        params = self._params(request)
+        offset = int(params.get("offset", 0))
+        limit = int(params.get("limit", 100))
+        timeout = min(float(params.get("timeout", 0)), MAX_POLL_SECONDS)
+        # Обновления с номером меньше offset бот подтвердил
+        while self._updates and self._updates[0]["update_id"] < offset:
+            self._updates.popleft()
+        if not self._updates and timeout > 0 and not self._closing:
+            self._new_updates.clear()
+            waiter = asyncio.ensure_future(self._new_updates.wait())
+            try:
+                await asyncio.wait([waiter], timeout=timeout)
+            finally:
+                waiter.cancel()
+        return self._ok([update for _, update in zip(range(limit), self._updates)])
+
+    async def _send_message(self, request: Request) -> Response:
+        params = self._params(request)
+        chat_id = int(params["chat_id"])
+        self._messages += 1
+        self._reply_to(chat_id)
+        return self._ok(self._message(chat_id, text=params.get("text", "")))
+
+    async def _send_document(self, request: Request) -> Response:
+        params = self._params(request)
+        chat_id = int(params["chat_id"])
+        self._documents += 1
+        self._reply_to(chat_id)
+        file_id = f"file{self._next_message_id}"
+        return self._ok(self._message(chat_id, document={"file_id": file_id, "file_unique_id": file_id}))
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Параметры нагрузки для командной строки (общие с load_test.py).
+    """
+    parser.add_argument("--rate", type=float, default=50.0, help="команд в секунду")
+    parser.add_argument("--duration", type=float, default=10.0, help="длительность нагрузки, с")
+    parser.add_argument("--mix", default="g=5,c=4,start=1", help="смесь команд с весами, например g=5,c=4,start=1")
+    parser.add_argument("--chats", type=int, default=0, help="число чатов (0 - новый чат на каждую команду)")
+    parser.add_argument("--generate-count", type=int, default=5, help="сколько номеров запрашивать в /g")
+    parser.add_argument("--invalid-share", type=float, default=0.3, help="доля номеров с опечаткой в /c")
+    parser.add_argument("--seed", type=int, help="зерно генератора случайных чисел")
+    parser.add_argument("--reply-timeout", type=float, default=10.0,
+                        help="сколько ждать ответов после окончания нагрузки, с")
+    parser.add_argument("--json", action="store_true", help="вывести отчет в JSON")
+
+
+def profile_from_args(parser: argparse.ArgumentParser, args: argparse.Namespace) -> LoadProfile:
+    """
+    Создает профиль нагрузки из аргументов командной строки.
+    """
+    try:
+        return LoadProfile(args.rate, args.duration, parse_mix(args.mix), args.chats, args.generate_count,
+                           args.invalid_share, args.seed)
+    except ValueError as error:
+        parser.error(str(error))
+
+
+def print_report(report: LoadReport, as_json: bool) -> None:
+    print(json.dumps(report.to_dict(), ensure_ascii=False) if as_json else report.render())
+
+
+async def _serve(api: FakeBotApi, reply_timeout: float) -> LoadReport:
+    """
+    Запускает сервер и нагрузку, дожидается ответов (или SIGINT/SIGTERM) и возвращает отчет.
+    """
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    await api.start()
+    print(f"Поддельный Bot API: BOT_API_URL={api.base_url} BOT_TOKEN={api.token}", file=sys.stderr)
+    stopped = asyncio.ensure_future(stop.wait())
+    try:
+        # Нагрузка начинается, когда бот впервые запросит обновления
+        for step in (api.polled.wait(), api.run_load(), api.wait_replies(reply_timeout)):
+            task = asyncio.ensure_future(step)
+            await asyncio.wait([task, stopped], return_when=asyncio.FIRST_COMPLETED)
+            if stop.is_set():
+                task.cancel()
+                break
+        return api.report()
+    finally:
+        stopped.cancel()
+        await api.stop()
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Запуск поддельного Bot API."""
+    parser = argparse.ArgumentParser(description="Поддельный сервер Bot API с генератором нагрузки")
+    parser.add_argument("--host", default="127.0.0.1", help="адрес сервера")
+    parser.add_argument("--port", type=int, default=8081, help="порт сервера")
+    parser.add_argument("--token", default=FAKE_TOKEN, help="токен бота")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+    api = FakeBotApi(profile_from_args(parser, args), args.token, args.host, args.port)
+    print_report(asyncio.run(_serve(api, args.reply_timeout)), args.json)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+Модуль с HTTP API для машинных клиентов (принтеры этикеток, MES).
+
+API работает на встроенном HTTP-сервере (http_server.py) в том же цикле
+событий, что и бот, и выдает номера через тот же аллокатор, поэтому номера
+из API и из /g не пересекаются. Эндпоинты:
+
+    POST /v1/generate  {"count": 100} или ?count=100  -> сгенерированные номера
+    POST /v1/validate  JSON-массив или NDJSON номеров   -> разбор каждого номера
+    GET  /healthz
+
+Ответ - JSON-массив, а с Accept: application/x-ndjson или ?format=ndjson -
+NDJSON (объект в строке). Ответы больше STREAM_CHUNK строк отправляются
+потоком: каждая пачка считается в отдельном потоке и уходит клиенту сразу,
+поэтому ни цикл событий бота, ни память не страдают от больших запросов.
+
+    curl -X POST -d '{"count": 5}' http://127.0.0.1:8081/v1/generate
+    curl -X POST -H "Content-Type: application/x-ndjson" --data-binary @serials.txt \\
+        "http://127.0.0.1:8081/v1/validate?format=ndjson"
+"""
+import asyncio
+import hmac
+import json
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+
+from http_server import HttpServer, Request, Response
+from serial_cli import GENERATE_FIELDS, VALIDATE_FIELDS, validate_row
+
+NDJSON = "application/x-ndjson"
+
+# Сколько строк ответа считать и отправлять за раз
+STREAM_CHUNK = 1000
+# Ограничения на размер одного запроса
+DEFAULT_MAX_COUNT = 10_000
+DEFAULT_MAX_BODY = 16 * 1024 * 1024
+
+# Выдача count уникальных номеров: пары (номер, отформатированный номер)
+IssueFunction = Callable[[int], List[Tuple[str, str]]]
+
+
+def parse_serials_body(request: Request) -> List[str]:
+    """
+    Номера из тела запроса: JSON-массив или NDJSON/текст (по номеру в строке;
+    строка может быть JSON-строкой или просто номером). Бросает ValueError.
+    """
+    content_type = request.headers.get("content-type", "")
+    if NDJSON in content_type or content_type.startswith("text/plain"):
+        values: List[str] = []
+        for line in request.body.decode("utf-8", errors="replace").splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                value = json.loads(line)
+            except ValueError:
+                value = line
+            values.append(str(value))
+        return values
+    data = request.json()
+    if not isinstance(data, list):
+        raise ValueError("Ожидается массив номеров")
+    return [str(value) for value in data]
+
+
+def validate_item(user_input: str, is_issued: Optional[Callable[[str], bool]] = None) -> Dict[str, Any]:
+    """
+    Результат проверки одного номера для ответа API. Поля - как в serial_cli validate,
+    плюс issued, если известен источник выпущенных номеров.
+    """
+    item = dict(zip(VALIDATE_FIELDS, validate_row(user_input)))
+    if is_issued is not None:
+        item["issued"] = bool(item["valid"] and is_issued(item["serial"]))
+    return item
+
+
+def _encode_chunk(values: Sequence, convert: Callable[[Any], Dict[str, Any]], ndjson: bool, first: bool) -> bytes:
+    """
+    Кодирует пачку строк ответа. Для JSON-массива первая пачка открывает массив,
+    следующие начинаются с запятой; закрывающая скобка добавляется отдельно.
+    """
+    items = [json.dumps(convert(value), ensure_ascii=False) for value in values]
+    if ndjson:
+        return "".join(f"{item}\n" for item in items).encode("utf-8")
+    prefix = "[" if first else ("," if items else "")
+    return (prefix + ",".join(items)).encode("utf-8")
+
+
+async def render_items(values: Sequence, convert: Callable[[Any], Dict[str, Any]], ndjson: bool,
+                       blocking: bool = False) -> Response:
+    """
+    Ответ со списком строк: небольшой - целиком, большой - потоком по STREAM_CHUNK строк.
+    Большой ответ всегда кодируется в отдельном потоке, небольшой - если convert
+    может блокироваться (blocking=True, например запросы к реестру).
+    """
+    content_type = NDJSON if ndjson else "application/json"
+    tail = b"" if ndjson else b"]"
+    if len(values) <= STREAM_CHUNK:
+        if blocking:
+            body = await asyncio.to_thread(_encode_chunk, values, convert, ndjson, True)
+        else:
+            body = _encode_chunk(values, convert, ndjson, True)
+        return Response(200, body + tail, content_type)
+
+    async def chunks() -> AsyncIterator[bytes]:
+        for start in range(0, len(values), STREAM_CHUNK):
+            chunk = values[start:start + STREAM_CHUNK]
+            yield await asyncio.to_thread(_encode_chunk, chunk, convert, ndjson, start == 0)
+        yield tail
+
+    return Response.stream(chunks(), content_type)
+
+
+def _error(message: str, status: int = 400) -> Response:
+    """
+    Ответ с ошибкой в формате JSON.
+    """
+    return Response.json({"error": message}, status)
+
+
+def create_api_server(issue: IssueFunction, is_issued: Optional[Callable[[str], bool]] = None,
+                      token: Optional[str] = None, host: str = "127.0.0.1", port: int = 8081,
+                      max_count: int = DEFAULT_MAX_COUNT) -> HttpServer:
+    """
+    Создает HTTP-сервер API. issue выдает уникальные номера (и отмечает их выпущенными),
+    is_issued проверяет выпуск номера. С token запросы к /v1 требуют Authorization: Bearer <token>.
+    """
+    server = HttpServer(host, port, max_body=DEFAULT_MAX_BODY)
+
+    def authorized(request: Request) -> bool:
+        return not token or hmac.compare_digest(request.headers.get("authorization", ""), f"Bearer {token}")
+
+    def wants_ndjson(request: Request) -> bool:
+        return request.query.get("format") == "ndjson" or NDJSON in request.headers.get("accept", "")
+
+    async def generate(request: Request) -> Response:
+        if not authorized(request):
+            return _error("Неверный токен", 401)
+        try:
+            count = request.query.get("count")
+            if count is None:
+                count = request.json().get("count", 1) if request.body else 1
+            count = int(count)
+        except (AttributeError, TypeError, ValueError):
+            return _error("Ожидается {\"count\": N}")
+        if not 1 <= count <= max_count:
+            return _error(f"Количество должно быть от 1 до {max_count}")
+        # Аллокатор может обращаться к общему файлу аренды - не держим цикл событий
+        serials = await asyncio.to_thread(issue, count)
+        return await render_items(serials, lambda pair: dict(zip(GENERATE_FIELDS, pair)), wants_ndjson(request))
+
+    async def validate(request: Request) -> Response:
+        if not authorized(request):
+            return _error("Неверный токен", 401)
+        try:
+            values = parse_serials_body(request)
+        except ValueError as error:
+            return _error(str(error))
+        # Проверка выпуска может обращаться к реестру SQLite - не держим цикл событий
+        return await render_items(values, lambda value: validate_item(value, is_issued), wants_ndjson(request),
+                                  blocking=is_issued is not None)
+
+    async def health(request: Request) -> Response:
+        return Response.json({"status": "ok"})
+
+    server.route("POST", "/v1/generate", generate)
+    server.route("POST", "/v1/validate", validate)
+    server.route("GET", "/healthz", health)
+    return server
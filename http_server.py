@@ -0,0 +1,264 @@
+"""
+Модуль с минимальным асинхронным HTTP/1.1-сервером на asyncio.
+
+Сервер держит соединения открытыми (keep-alive): клиент, например сервер
+Telegram, отправляет много запросов по одному соединению без повторных
+рукопожатий TCP/TLS. Поддерживается ровно то, что нужно боту: запросы с
+Content-Length, маршрутизация по методу и пути, ответы с телом целиком или
+потоком частей (Transfer-Encoding: chunked), чтобы большой ответ не собирать в памяти.
+"""
+import asyncio
+import json
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlsplit
+
+# Ограничения на размер запроса
+MAX_HEADER_BYTES = 16 * 1024
+DEFAULT_MAX_BODY = 1024 * 1024
+# Сколько при остановке ждать обработчиков, которые еще формируют ответ
+STOP_TIMEOUT = 5.0
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    401: "Unauthorized",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    408: "Request Timeout",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class Request:
+    """
+    HTTP-запрос: метод, путь, параметры строки запроса, заголовки (имена в нижнем регистре) и тело.
+    """
+
+    def __init__(self, method: str, target: str, headers: Dict[str, str], body: bytes,
+                 version: str = "HTTP/1.1") -> None:
+        self.method = method
+        self.version = version
+        url = urlsplit(target)
+        self.path = url.path
+        self.query = dict(parse_qsl(url.query))
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        """
+        Тело запроса, разобранное как JSON. Бросает ValueError при неверном JSON.
+        """
+        return json.loads(self.body)
+
+
+class Response:
+    """
+    HTTP-ответ. Тело - байты или асинхронный итератор частей тела.
+    """
+
+    def __init__(self, status: int = 200, body: Union[bytes, AsyncIterator[bytes]] = b"",
+                 content_type: str = "text/plain; charset=utf-8",
+                 headers: Optional[Dict[str, str]] = None) -> None:
+        self.status = status
+        self.body = body
+        self.content_type = content_type
+        self.headers = headers or {}
+
+    @classmethod
+    def json(cls, data, status: int = 200) -> "Response":
+        """
+        Ответ с телом в формате JSON.
+        """
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        return cls(status, body, "application/json")
+
+    @classmethod
+    def text(cls, text: str, status: int = 200) -> "Response":
+        """
+        Текстовый ответ.
+        """
+        return cls(status, text.encode("utf-8"))
+
+    @classmethod
+    def stream(cls, chunks: AsyncIterator[bytes], content_type: str, status: int = 200) -> "Response":
+        """
+        Ответ, тело которого отправляется по частям по мере их получения из chunks.
+        """
+        return cls(status, chunks, content_type)
+
+
+Handler = Callable[[Request], Awaitable[Response]]
+
+
+class HttpError(Exception):
+    """
+    Ошибка разбора запроса, на которую отвечаем статусом и закрываем соединение.
+    """
+
+    def __init__(self, status: int) -> None:
+        super().__init__(_REASONS.get(status, str(status)))
+        self.status = status
+
+
+class HttpServer:
+    """
+    HTTP/1.1-сервер с постоянными соединениями и таблицей маршрутов (метод, путь) -> обработчик.
+    """
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 8080, max_body: int = DEFAULT_MAX_BODY,
+                 idle_timeout: float = 75.0) -> None:
+        self.host = host
+        self.port = port
+        self.max_body = max_body
+        self.idle_timeout = idle_timeout
+        self._routes: Dict[Tuple[str, str], Handler] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: set = set()
+        self._tasks: set = set()
+
+    def route(self, method: str, path: str, handler: Handler) -> None:
+        """
+        Регистрирует обработчик для метода и пути.
+        """
+        self._routes[(method.upper(), path)] = handler
+
+    async def start(self) -> None:
+        """
+        Начинает принимать соединения. При port=0 порт выбирается системой и записывается в self.port.
+        """
+        self._server = await asyncio.start_server(self._serve_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """
+        Перестает принимать соединения и закрывает открытые. Обработчики, которые
+        еще формируют ответ, получают STOP_TIMEOUT секунд, после чего отменяются.
+        """
+        if self._server is None:
+            return
+        self._server.close()
+        for writer in list(self._connections):
+            writer.close()
+        if self._tasks:
+            _, pending = await asyncio.wait(set(self._tasks), timeout=STOP_TIMEOUT)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+        await self._server.wait_closed()
+        self._server = None
+
+    async def dispatch(self, request: Request) -> Response:
+        """
+        Находит обработчик для запроса и вызывает его.
+        """
+        handler = self._routes.get((request.method, request.path))
+        if handler is None:
+            allowed = any(path == request.path for _, path in self._routes)
+            return Response.text(_REASONS[405] if allowed else _REASONS[404], 405 if allowed else 404)
+        return await handler(request)
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Обслуживает одно соединение: читает запросы один за другим, пока клиент не закроет его.
+        """
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        self._connections.add(writer)
+        try:
+            while True:
+                try:
+                    request, keep_alive = await asyncio.wait_for(self._read_request(reader), self.idle_timeout)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except HttpError as error:
+                    await self._write_response(writer, Response.text(str(error), error.status), keep_alive=False)
+                    break
+                try:
+                    response = await self.dispatch(request)
+                except Exception:
+                    response = Response.text(_REASONS[500], 500)
+                if not isinstance(response.body, bytes) and request.version != "HTTP/1.1":
+                    # Клиент HTTP/1.0 не понимает chunked: тело ограничивается закрытием соединения
+                    keep_alive = False
+                try:
+                    await self._write_response(writer, response, keep_alive, chunked=request.version == "HTTP/1.1")
+                except Exception:
+                    # Ошибка посреди потокового ответа: статус уже отправлен, остается оборвать соединение
+                    break
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            # Отмену не пропускаем наружу: в Python 3.11 asyncio пишет в лог ошибку
+            # про отмененную задачу соединения
+            pass
+        finally:
+            self._tasks.discard(task)
+            self._connections.discard(writer)
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Tuple[Request, bool]:
+        """
+        Читает строку запроса, заголовки и тело. Возвращает запрос и признак keep-alive.
+        """
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.LimitOverrunError:
+            raise HttpError(413)
+        if len(head) > MAX_HEADER_BYTES:
+            raise HttpError(413)
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ")
+        except ValueError:
+            raise HttpError(400)
+        headers: Dict[str, str] = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HttpError(400)
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise HttpError(400)
+        if length < 0:
+            raise HttpError(400)
+        if length > self.max_body:
+            raise HttpError(413)
+        body = await reader.readexactly(length) if length else b""
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        return Request(method.upper(), target, headers, body, version), keep_alive
+
+    async def _write_response(self, writer: asyncio.StreamWriter, response: Response, keep_alive: bool,
+                              chunked: bool = True) -> None:
+        """
+        Отправляет ответ: тело-байты целиком, потоковое тело - по частям по мере готовности.
+        """
+        streaming = not isinstance(response.body, bytes)
+        headers = {"Content-Type": response.content_type}
+        if not streaming:
+            headers["Content-Length"] = str(len(response.body))
+        elif chunked:
+            headers["Transfer-Encoding"] = "chunked"
+        headers["Connection"] = "keep-alive" if keep_alive else "close"
+        headers.update(response.headers)
+        head = f"HTTP/1.1 {response.status} {_REASONS.get(response.status, '')}\r\n"
+        head += "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+        if not streaming:
+            writer.write(head.encode("latin-1") + b"\r\n" + response.body)
+            await writer.drain()
+            return
+        writer.write(head.encode("latin-1") + b"\r\n")
+        async for chunk in response.body:
+            if chunk:
+                writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk) if chunked else chunk)
+                # Ждем, пока клиент заберет часть, чтобы медленный клиент не раздувал буфер
+                await writer.drain()
+        if chunked:
+            writer.write(b"0\r\n\r\n")
+        await writer.drain()
@@ -0,0 +1,32 @@
+"""
+Модуль с простым HTTP-клиентом для тестов встроенного HTTP-сервера.
+
+Запрос пишется в открытое соединение как есть, а ответ разбирается вручную,
+поэтому по одному соединению можно проверить keep-alive, chunked-ответы и
+заголовки без сторонних HTTP-клиентов.
+"""
+
+
+async def send_request(reader, writer, method, path, body=b"", headers=None):
+    """
+    Отправляет запрос по открытому соединению и читает ответ. Возвращает (статус, заголовки, тело).
+    """
+    lines = [f"{method} {path} HTTP/1.1", "Host: localhost", f"Content-Length: {len(body)}"]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+    status = int(head[0].split(" ")[1])
+    response_headers = {}
+    for line in head[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+    if response_headers.get("transfer-encoding") != "chunked":
+        return status, response_headers, await reader.readexactly(int(response_headers["content-length"]))
+    body = b""
+    while True:
+        size = int(await reader.readuntil(b"\r\n"), 16)
+        body += (await reader.readexactly(size + 2))[:-2]
+        if not size:
+            return status, response_headers, body
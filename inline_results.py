@@ -0,0 +1,109 @@
+"""
+Модуль для ответов бота в инлайн-режиме (@bot 5, @bot 0123-4567-8912).
+
+Запрос из одних цифр длиной до двух знаков - количество номеров для генерации,
+пустой запрос - один номер, все остальное проверяется как серийный номер.
+Функции здесь только разбирают запрос и собирают списки результатов;
+проверка, кеширование и учет выпуска остаются в bot.py.
+
+Номера в результатах - только предложения: пользователь листает их с каждым
+нажатием клавиши, а выпущенными считаются лишь те, что он выбрал
+(по chosen_inline_result). Поэтому их добавочные числа идут подряд, и по id
+результата номера восстанавливаются без хранения состояния.
+"""
+import random
+from typing import List, Tuple
+
+from telegram import InlineQueryResultArticle, InputTextMessageContent
+
+from serial_number import SerialNumber, SerialNumberError, TimeLike, generate_serial_numbers
+
+# Telegram принимает не больше 50 результатов на запрос;
+# один из них занимает результат "все номера сразу"
+INLINE_RESULTS_LIMIT = 50
+MAX_INLINE_COUNT = INLINE_RESULTS_LIMIT - 1
+
+GENERATE = "generate"
+CHECK = "check"
+
+
+def parse_inline_query(query: str) -> Tuple[str, int]:
+    """
+    Определяет, что нужно сделать по тексту инлайн-запроса.
+    Возвращает (GENERATE, количество) или (CHECK, 0).
+    """
+    query = query.strip()
+    if not query:
+        return GENERATE, 1
+    if query.isdigit() and len(query) <= 2:
+        return GENERATE, min(max(int(query), 1), MAX_INLINE_COUNT)
+    return CHECK, 0
+
+
+def preview_serials(count: int, time: TimeLike, rng: random.Random = random) -> List[Tuple[str, str]]:
+    """
+    Номера-предложения для инлайн-запроса: count номеров одной секунды
+    с подряд идущими добавочными числами из 1..99, начиная со случайного.
+    Аллокатор не используется и ничего не отмечается выпущенным.
+    """
+    start = rng.randint(1, 100 - count)
+    return list(generate_serial_numbers(time, range(start, start + count)))
+
+
+def chosen_serials(result_id: str) -> List[Tuple[str, str]]:
+    """
+    Номера выбранного результата по его id: номер для одного результата
+    и all-<первый номер>-<количество> для результата со всеми номерами.
+    Для результатов проверки и неизвестных id возвращает пустой список.
+    """
+    first, count = result_id, 1
+    if result_id.startswith("all-"):
+        first, _, count_text = result_id[4:].partition("-")
+        if not count_text.isdigit():
+            return []
+        count = int(count_text)
+    try:
+        serial = SerialNumber.parse(first)
+    except SerialNumberError:
+        return []
+    if first != serial.digits or not 1 <= count <= MAX_INLINE_COUNT or not 1 <= serial.adds <= 100 - count:
+        return []
+    return list(generate_serial_numbers(serial.timestamp, range(serial.adds, serial.adds + count)))
+
+
+def serial_results(serials: List[Tuple[str, str]]) -> List[InlineQueryResultArticle]:
+    """
+    Результаты для сгенерированных номеров: по одному на номер, а для нескольких
+    номеров первым идет результат со всеми номерами в одном сообщении.
+    """
+    results = []
+    if len(serials) > 1:
+        results.append(InlineQueryResultArticle(
+            id=f"all-{serials[0][0]}-{len(serials)}",
+            title=f"Все номера ({len(serials)})",
+            description=f"{serials[0][1]} … {serials[-1][1]}",
+            input_message_content=InputTextMessageContent(
+                "\n".join(f"`{formatted_serial}`" for _, formatted_serial in serials), parse_mode="Markdown",
+            ),
+        ))
+    for serial, formatted_serial in serials:
+        results.append(InlineQueryResultArticle(
+            id=serial,
+            title=formatted_serial,
+            description="Новый серийный номер",
+            input_message_content=InputTextMessageContent(f"`{formatted_serial}`", parse_mode="Markdown"),
+        ))
+    return results
+
+
+def check_results(digits: str, is_valid: bool, message: str, response: str) -> List[InlineQueryResultArticle]:
+    """
+    Результат проверки номера: заголовок с итогом, описание с датой генерации
+    или причиной ошибки и текст ответа как у /c.
+    """
+    return [InlineQueryResultArticle(
+        id=f"check-{digits}"[:64],
+        title="Валидный номер" if is_valid else "Невалидный номер",
+        description=message,
+        input_message_content=InputTextMessageContent(response, parse_mode="Markdown"),
+    )]
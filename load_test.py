@@ -0,0 +1,76 @@
+"""
+Нагрузочный тест бота без Telegram: бот из bot.py и поддельный Bot API
+(fake_bot_api.py) в одном процессе.
+
+    python load_test.py --rate 200 --duration 20
+    SEND_GLOBAL_RATE=0 python load_test.py --rate 500 --mix g=1 --json
+
+Бот собирается через bot.build_application с адресом поддельного сервера и
+получает обновления long polling, как при обычном запуске. Настройки бота
+берутся из тех же переменных окружения (CONCURRENT_UPDATES, SEND_GLOBAL_RATE
+и т. д.); реестр, битовые карты и аренда блоков не открываются. Бот и сервер
+делят одно ядро и цикл событий, поэтому для измерения самого бота под
+большой нагрузкой лучше запустить fake_bot_api.py отдельным процессом.
+"""
+import argparse
+import asyncio
+import os
+import sys
+from typing import Optional
+
+from fake_bot_api import (
+    FAKE_TOKEN, MAX_POLL_SECONDS, FakeBotApi, LoadProfile, LoadReport, add_profile_arguments, print_report,
+    profile_from_args,
+)
+
+# bot.py требует токен при импорте; настоящий токен для теста не нужен
+os.environ.setdefault("BOT_TOKEN", FAKE_TOKEN)
+
+import bot  # noqa: E402
+
+
+async def run_load_test(profile: LoadProfile, reply_timeout: float = 10.0) -> LoadReport:
+    """
+    Запускает поддельный Bot API и бота, дает нагрузку по профилю и возвращает отчет.
+    Порядок запуска и остановки - как в run_polling.
+    """
+    api = FakeBotApi(profile)
+    await api.start()
+    application = bot.build_application(api.token, api.base_url)
+    try:
+        await application.initialize()
+        try:
+            if application.post_init:
+                await application.post_init(application)
+            await application.start()
+            await application.updater.start_polling(poll_interval=0, timeout=int(MAX_POLL_SECONDS))
+            try:
+                await api.polled.wait()
+                await api.run_load()
+                await api.wait_replies(reply_timeout)
+                return api.report()
+            finally:
+                await application.updater.stop()
+                await application.stop()
+                if application.post_stop:
+                    await application.post_stop(application)
+        finally:
+            await application.shutdown()
+            if application.post_shutdown:
+                await application.post_shutdown(application)
+    finally:
+        await api.stop()
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Нагрузочный тест."""
+    parser = argparse.ArgumentParser(description="Нагрузочный тест бота на поддельном Bot API")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+    report = asyncio.run(run_load_test(profile_from_args(parser, args), args.reply_timeout))
+    print_report(report, args.json)
+    return 0 if not report.unanswered else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,32 +1,309 @@
 """
 Модуль для алгоритма Луна проверки контрольной суммы.
+
+Вычисления построены на заранее рассчитанных таблицах: цифры переводятся в
+значения через bytes.translate, а удвоенные цифры берутся из отдельной таблицы,
+поэтому в горячем цикле нет ни int(), ни ветвлений, ни вывода в stdout.
+Поддерживаются входные данные типов str, bytes и int.
+
+Для пакетной обработки есть векторизованные функции на NumPy; если NumPy не
+установлен, используется реализация на чистом Python с тем же результатом.
 """
+from typing import List, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен
+    np = None
+
+LuhnInput = Union[str, bytes, bytearray, int]
+
+_ASCII_DIGITS = b"0123456789"
+
+# Значение цифры: b"7" -> 7
+_PLAIN_TABLE = bytes.maketrans(_ASCII_DIGITS, bytes(range(10)))
+# Удвоенная цифра с вычитанием 9: b"7" -> 7 * 2 - 9 = 5
+_DOUBLED_TABLE = bytes.maketrans(_ASCII_DIGITS, bytes((0, 2, 4, 6, 8, 1, 3, 5, 7, 9)))
+
+
+def _to_digits(number: LuhnInput) -> bytes:
+    """
+    Приводит входные данные к ASCII-строке цифр в виде bytes.
+    """
+    if isinstance(number, str):
+        data = number.encode("ascii")
+    elif isinstance(number, (bytes, bytearray)):
+        data = bytes(number)
+    elif isinstance(number, int):
+        if number < 0:
+            raise ValueError(f"Отрицательное число не может быть номером: {number}")
+        data = b"%d" % number
+    else:
+        raise TypeError(f"Неподдерживаемый тип: {type(number).__name__}")
+    if data and not data.isdigit():
+        raise ValueError(f"Номер должен состоять только из цифр: {number!r}")
+    return data
+
+
+def _luhn_sum(data: bytes, double_first: bool = False) -> int:
+    """
+    Сумма слагаемых алгоритма Луна, считая цифры справа налево.
+    Если double_first=True, удваивается самая правая цифра (так считается
+    сумма для числа, к которому еще будет приписана контрольная цифра).
+    """
+    reversed_data = data[::-1]
+    plain = reversed_data[1::2] if double_first else reversed_data[0::2]
+    doubled = reversed_data[0::2] if double_first else reversed_data[1::2]
+    return sum(plain.translate(_PLAIN_TABLE)) + sum(doubled.translate(_DOUBLED_TABLE))
+
+
+def _trace(data: bytes) -> None:
+    """
+    Отладочный вывод слагаемых алгоритма Луна (справа налево).
+    """
+    for i, digit in enumerate(reversed(data)):
+        table = _DOUBLED_TABLE if i % 2 == 1 else _PLAIN_TABLE
+        print(table[digit])
+
 
-def calculate_luhn_checksum(number: str) -> int:
+def calculate_luhn_checksum(number: LuhnInput, debug: bool = False) -> int:
     """
     Рассчитывает контрольную сумму по алгоритму Луна.
+    При debug=True печатает слагаемое для каждой цифры.
     """
-    checksum = 0
-    for i, digit in enumerate(reversed(number)):
-        digit = int(digit)
-        if i % 2 == 1:
-            digit *= 2
-            if digit > 9:
-                digit -= 9
-        print(digit)
-        checksum += digit
-    return checksum % 10
+    data = _to_digits(number)
+    if debug:
+        _trace(data)
+    return _luhn_sum(data) % 10
 
-def validate_luhn_checksum(number: str) -> bool:
+
+def validate_luhn_checksum(number: LuhnInput, debug: bool = False) -> bool:
     """
     Проверяет контрольную сумму по алгоритму Луна.
     """
-    return calculate_luhn_checksum(number) == 0
+    return calculate_luhn_checksum(number, debug) == 0
+
 
-def add_valid_luhn_checksum(number: str) -> str:
+def calculate_luhn_check_digit(number: LuhnInput) -> int:
+    """
+    Возвращает цифру, которую нужно приписать справа, чтобы контрольная сумма стала валидной.
+    """
+    return (10 - _luhn_sum(_to_digits(number), double_first=True) % 10) % 10
+
+
+def add_valid_luhn_checksum(number: LuhnInput) -> LuhnInput:
     """
     Добавляет валидную цифру к последовательности, так чтобы контрольная сумма была валидной.
     Алгоритм такой: приписываем справа 0, вычисляем контрольную сумму, затем вычитаем из 10 и приписываем получившуюся цифру.
+    Результат имеет тот же тип, что и входные данные.
+    """
+    check_digit = calculate_luhn_check_digit(number)
+    if isinstance(number, str):
+        return number + str(check_digit)
+    if isinstance(number, (bytes, bytearray)):
+        return number + _ASCII_DIGITS[check_digit:check_digit + 1]
+    return number * 10 + check_digit
+
+
+class LuhnAccumulator:
+    """
+    Частичная контрольная сумма Луна для префикса номера.
+
+    Вес цифры в алгоритме Луна зависит от ее позиции справа, которая для префикса
+    еще неизвестна. Поэтому храним две суммы: для случая, когда последняя цифра
+    префикса останется последней (не удваивается), и для случая, когда за ней
+    будет приписана еще одна цифра (удваивается). Добавление цифры - O(1).
+    Объект неизменяемый, так что один префикс можно продолжать разными суффиксами.
+    """
+    __slots__ = ("_last_plain", "_last_doubled", "length")
+
+    def __init__(self, number: LuhnInput = b"") -> None:
+        data = _to_digits(number)
+        self._last_plain = _luhn_sum(data)
+        self._last_doubled = _luhn_sum(data, double_first=True)
+        self.length = len(data)
+
+    def extend(self, digits: LuhnInput) -> "LuhnAccumulator":
+        """
+        Возвращает новый аккумулятор для префикса, продолженного цифрами digits.
+        """
+        data = _to_digits(digits)
+        last_plain, last_doubled = self._last_plain, self._last_doubled
+        for value, doubled in zip(data.translate(_PLAIN_TABLE), data.translate(_DOUBLED_TABLE)):
+            last_plain, last_doubled = last_doubled + value, last_plain + doubled
+        result = LuhnAccumulator.__new__(LuhnAccumulator)
+        result._last_plain = last_plain
+        result._last_doubled = last_doubled
+        result.length = self.length + len(data)
+        return result
+
+    @property
+    def checksum(self) -> int:
+        """
+        Контрольная сумма префикса как законченного номера.
+        """
+        return self._last_plain % 10
+
+    @property
+    def is_valid(self) -> bool:
+        """
+        Валиден ли префикс как законченный номер.
+        """
+        return self._last_plain % 10 == 0
+
+    @property
+    def check_digit(self) -> int:
+        """
+        Контрольная цифра, которую нужно приписать к префиксу.
+        """
+        return (10 - self._last_doubled % 10) % 10
+
+    def check_digit_for(self, suffix: LuhnInput) -> int:
+        """
+        Контрольная цифра для префикса, продолженного суффиксом suffix.
+        """
+        return self.extend(suffix).check_digit
+
+
+# Пакетная обработка.
+# Номера передаются либо матрицей цифр (N, width) со значениями 0..9,
+# либо упакованным буфером ASCII-цифр фиксированной ширины, где записи идут
+# с шагом stride байт (например, width=12, stride=13 для номеров через "\n").
+
+BatchInput = Union[bytes, bytearray, memoryview, Sequence[Sequence[int]], "np.ndarray"]
+
+_DOUBLED_DIGITS = (0, 2, 4, 6, 8, 1, 3, 5, 7, 9)
+# Значения 0..9 -> ASCII-цифры, остальные байты -> не цифра, чтобы их отклонила проверка, как в NumPy
+_ROW_TO_ASCII = _ASCII_DIGITS + b"x" * (256 - 10)
+
+if np is not None:
+    _NUMPY_DOUBLED = np.array(_DOUBLED_DIGITS, dtype=np.uint8)
+
+
+def _buffer_rows(buffer: bytes, width: int, stride: int) -> int:
+    """
+    Количество записей в упакованном буфере. Разделитель после последней записи необязателен.
+    """
+    if stride < width:
+        raise ValueError("stride не может быть меньше width")
+    if not buffer:
+        return 0
+    rows = (len(buffer) + stride - width) // stride
+    if len(buffer) not in (rows * stride, rows * stride - (stride - width)):
+        raise ValueError(f"Длина буфера {len(buffer)} не кратна шагу записи {stride}")
+    return rows
+
+
+def _numpy_digit_matrix(serials: BatchInput, width: int, stride: Optional[int]) -> "np.ndarray":
+    """
+    Приводит входные данные к матрице цифр uint8 формы (N, width) без лишних копий.
+    """
+    if isinstance(serials, (bytes, bytearray, memoryview)):
+        buffer = memoryview(serials).cast("B")
+        stride = stride or width
+        rows = _buffer_rows(buffer, width, stride)
+        if rows == 0:
+            return np.zeros((0, width), dtype=np.uint8)
+        raw = np.ndarray(shape=(rows, width), dtype=np.uint8, buffer=buffer, strides=(stride, 1))
+        matrix = raw - np.uint8(ord("0"))
+    else:
+        matrix = np.asarray(serials, dtype=np.uint8)
+        if matrix.size == 0:
+            matrix = matrix.reshape(0, width)
+    if matrix.ndim != 2 or matrix.shape[1] != width:
+        raise ValueError("Ожидается матрица цифр формы (N, width)")
+    if matrix.size and matrix.max() > 9:
+        raise ValueError("Номера должны состоять только из цифр")
+    return matrix
+
+
+def _numpy_luhn_sums(matrix: "np.ndarray", double_first: bool) -> "np.ndarray":
+    """
+    Суммы Луна для каждой строки матрицы цифр.
+    """
+    width = matrix.shape[1]
+    # Позиция справа: width - 1 - j; удваиваются нечетные (или четные при double_first)
+    first_doubled = width - 1 if double_first else width - 2
+    doubled_columns = slice(first_doubled % 2, width, 2) if first_doubled >= 0 else slice(0, 0)
+    terms = matrix.copy()
+    terms[:, doubled_columns] = _NUMPY_DOUBLED[matrix[:, doubled_columns]]
+    return terms.sum(axis=1, dtype=np.uint32)
+
+
+def _python_digit_rows(serials: BatchInput, width: int, stride: Optional[int]) -> List[bytes]:
+    """
+    Приводит входные данные к списку строк ASCII-цифр (реализация без NumPy).
+    """
+    if isinstance(serials, (bytes, bytearray, memoryview)):
+        buffer = bytes(serials)
+        stride = stride or width
+        rows = [buffer[i:i + width] for i in range(0, _buffer_rows(buffer, width, stride) * stride, stride)]
+    else:
+        rows = [bytes(map(int, row)).translate(_ROW_TO_ASCII) for row in serials]
+    for row in rows:
+        if len(row) != width:
+            raise ValueError("Ожидается матрица цифр формы (N, width)")
+        if not row.isdigit():
+            raise ValueError("Номера должны состоять только из цифр")
+    return rows
+
+
+def _row_width(serials: BatchInput, width: Optional[int]) -> int:
+    """
+    Ширина записи: задана явно или берется из матрицы.
+    """
+    if width is not None:
+        return width
+    if isinstance(serials, (bytes, bytearray, memoryview)):
+        return 12
+    shape = getattr(serials, "shape", None)
+    if shape is not None and len(shape) == 2:
+        return shape[1]
+    return len(serials[0]) if len(serials) else 12
+
+
+def check_luhn_batch(serials: BatchInput, width: Optional[int] = None,
+                     stride: Optional[int] = None, use_numpy: bool = True) -> Tuple[Sequence[bool], Sequence[int]]:
+    """
+    Пакетно проверяет номера по алгоритму Луна.
+    Возвращает маску валидности и контрольные цифры, которые должны стоять
+    в последней позиции каждого номера (вычислены по первым width - 1 цифрам).
+    С NumPy результат - массивы numpy, без него - списки.
+    """
+    width = _row_width(serials, width)
+    if np is not None and use_numpy:
+        matrix = _numpy_digit_matrix(serials, width, stride)
+        sums = _numpy_luhn_sums(matrix, double_first=False)
+        mask = sums % 10 == 0
+        if width == 0:
+            return mask, np.zeros(len(matrix), dtype=np.uint8)
+        last = matrix[:, -1]
+        check_digits = ((10 - (sums - last) % 10) % 10).astype(np.uint8)
+        return mask, check_digits
+    rows = _python_digit_rows(serials, width, stride)
+    mask = [_luhn_sum(row) % 10 == 0 for row in rows]
+    check_digits = [(10 - _luhn_sum(row[:-1], double_first=True) % 10) % 10 if row else 0 for row in rows]
+    return mask, check_digits
+
+
+def validate_luhn_batch(serials: BatchInput, width: Optional[int] = None,
+                        stride: Optional[int] = None, use_numpy: bool = True) -> Sequence[bool]:
+    """
+    Пакетная версия validate_luhn_checksum: маска валидности номеров.
+    """
+    return check_luhn_batch(serials, width, stride, use_numpy)[0]
+
+
+def calculate_luhn_check_digits_batch(prefixes: BatchInput, width: Optional[int] = None,
+                                      stride: Optional[int] = None, use_numpy: bool = True) -> Sequence[int]:
+    """
+    Пакетная версия calculate_luhn_check_digit: контрольные цифры, которые нужно
+    приписать к каждому префиксу.
     """
-    checksum = calculate_luhn_checksum(number + "0")
-    return number + str((10 - checksum ) % 10)
+    width = _row_width(prefixes, width)
+    if np is not None and use_numpy:
+        matrix = _numpy_digit_matrix(prefixes, width, stride)
+        sums = _numpy_luhn_sums(matrix, double_first=True)
+        return ((10 - sums % 10) % 10).astype(np.uint8)
+    rows = _python_digit_rows(prefixes, width, stride)
+    return [(10 - _luhn_sum(row, double_first=True) % 10) % 10 for row in rows]
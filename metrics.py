@@ -0,0 +1,253 @@
+"""
+Модуль с метриками в текстовом формате Prometheus.
+
+Запись метрики не берет блокировок: у каждого потока свой шард (словарь
+"значения меток -> счетчик"), который меняет только этот поток, а при
+чтении метрики (запрос /metrics) шарды всех потоков копируются и
+складываются. Блокировка нужна лишь один раз на поток - чтобы добавить его
+шард в список. Значения умерших потоков остаются в сумме, поэтому счетчики
+не убывают.
+
+    REQUESTS = Counter("app_requests_total", "Запросы", ("handler",))
+    REQUESTS.inc("generate")
+    LATENCY = Histogram("app_latency_seconds", "Время обработки", ("handler",))
+    LATENCY.observe(0.012, "generate")
+"""
+import math
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from http_server import HttpServer, Request, Response
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Границы корзин гистограммы по умолчанию, секунды
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[str, ...]
+# Сэмпл для вывода: (суффикс имени, метки, значение)
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+class Registry:
+    """
+    Набор метрик, выводимых вместе.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: List["Metric"] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: "Metric") -> None:
+        with self._lock:
+            if any(existing.name == metric.name for existing in self._metrics):
+                raise ValueError(f"Метрика {metric.name} уже зарегистрирована")
+            self._metrics.append(metric)
+
+    def unregister(self, metric: "Metric") -> None:
+        with self._lock:
+            self._metrics.remove(metric)
+
+    def render(self) -> str:
+        """
+        Все метрики в текстовом формате Prometheus.
+        """
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Реестр по умолчанию для метрик процесса
+REGISTRY = Registry()
+
+
+class Metric:
+    """
+    Базовый класс метрики с именем, описанием и именами меток.
+    """
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional[Registry] = REGISTRY) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        if registry is not None:
+            registry.register(self)
+
+    def _labels(self, values: Labels) -> Dict[str, str]:
+        return dict(zip(self.labelnames, values))
+
+    def samples(self) -> Iterable[Sample]:
+        raise NotImplementedError
+
+
+class _ShardedMetric(Metric):
+    """
+    Метрика с шардом на поток. Шард меняет только его поток, поэтому запись идет без блокировок.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional[Registry] = REGISTRY) -> None:
+        super().__init__(name, documentation, labelnames, registry)
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def _snapshots(self) -> List[dict]:
+        """
+        Копии шардов. dict.copy выполняется целиком под GIL, поэтому копия согласована.
+        """
+        with self._shards_lock:
+            shards = list(self._shards)
+        return [shard.copy() for shard in shards]
+
+    def _check_labels(self, labels: Labels) -> None:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name}: ожидаются метки {self.labelnames}, получено {labels}")
+
+
+class Counter(_ShardedMetric):
+    """
+    Счетчик, который только растет.
+    """
+    type = "counter"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """
+        Увеличивает счетчик для значений меток labels.
+        """
+        shard = self._shard()
+        value = shard.get(labels)
+        if value is None:
+            self._check_labels(labels)
+            value = 0
+        shard[labels] = value + amount
+
+    def value(self, *labels: str) -> float:
+        """
+        Текущее значение для значений меток labels.
+        """
+        return sum(snapshot.get(labels, 0) for snapshot in self._snapshots())
+
+    def samples(self) -> Iterable[Sample]:
+        totals: Dict[Labels, float] = {}
+        for snapshot in self._snapshots():
+            for labels, value in snapshot.items():
+                totals[labels] = totals.get(labels, 0) + value
+        for labels in sorted(totals):
+            yield "", self._labels(labels), totals[labels]
+
+
+class Histogram(_ShardedMetric):
+    """
+    Гистограмма: число наблюдений по корзинам, их сумма и количество.
+    """
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry: Optional[Registry] = REGISTRY) -> None:
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        """
+        Добавляет наблюдение. Счетчик корзины не накопительный: накопление - при выводе.
+        """
+        shard = self._shard()
+        counts = shard.get(labels)
+        if counts is None:
+            self._check_labels(labels)
+            # Корзины, последняя - +Inf, затем сумма
+            counts = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def count(self, *labels: str) -> int:
+        """
+        Число наблюдений для значений меток labels.
+        """
+        return sum(sum(snapshot[labels][:-1]) for snapshot in self._snapshots() if labels in snapshot)
+
+    def samples(self) -> Iterable[Sample]:
+        totals: Dict[Labels, List[float]] = {}
+        for snapshot in self._snapshots():
+            for labels, counts in snapshot.items():
+                # Список корзин меняет поток-владелец; копия одним срезом
+                counts = counts[:]
+                total = totals.setdefault(labels, [0] * len(counts))
+                for index, value in enumerate(counts):
+                    total[index] += value
+        for labels in sorted(totals):
+            counts = totals[labels]
+            base = self._labels(labels)
+            cumulative = 0
+            for bound, value in zip(self.buckets + (math.inf,), counts[:-1]):
+                cumulative += value
+                yield "_bucket", {**base, "le": _format_value(bound)}, cumulative
+            yield "_sum", base, counts[-1]
+            yield "_count", base, cumulative
+
+
+class CallbackMetric(Metric):
+    """
+    Метрика, значения которой при выводе берутся из функции: пары (значения меток, значение).
+    Подходит для счетчиков и размеров, которые уже ведет другой объект.
+    """
+
+    def __init__(self, name: str, documentation: str, function: Callable[[], Iterable[Tuple[Labels, float]]],
+                 labelnames: Sequence[str] = (), metric_type: str = "gauge",
+                 registry: Optional[Registry] = REGISTRY) -> None:
+        super().__init__(name, documentation, labelnames, registry)
+        self.type = metric_type
+        self._function = function
+
+    def samples(self) -> Iterable[Sample]:
+        for labels, value in self._function():
+            yield "", self._labels(labels), value
+
+
+def create_metrics_server(registry: Registry = REGISTRY, host: str = "127.0.0.1", port: int = 9100) -> HttpServer:
+    """
+    HTTP-сервер с метриками на GET /metrics.
+    """
+    server = HttpServer(host, port)
+
+    async def metrics(request: Request) -> Response:
+        return Response(200, registry.render().encode("utf-8"), CONTENT_TYPE)
+
+    server.route("GET", "/metrics", metrics)
+    return server
@@ -0,0 +1,324 @@
+"""
+Модуль для исходящей очереди сообщений с ограничением скорости.
+
+Telegram ограничивает скорость отправки: около 30 сообщений в секунду на бота
+и около одного сообщения в секунду в один чат. Обработчики не отправляют
+ответы сами, а кладут их в очередь, и один планировщик отправляет их:
+- глобальное и початовое ограничение - корзины токенов;
+- чаты обслуживаются по кругу, поэтому длинная очередь одного чата не
+  задерживает остальные;
+- стоящие в очереди текстовые сообщения в один чат с одинаковыми параметрами
+  и группой (например, ответы на одну команду) склеиваются в одно (в пределах
+  лимита длины сообщения); сообщения с coalesce=False не склеиваются;
+- в один чат одновременно отправляется не больше одного сообщения, поэтому
+  порядок сообщений в чате сохраняется.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Set, Tuple
+
+from bulk_reply import MESSAGE_LIMIT
+
+logger = logging.getLogger(__name__)
+
+# Функция отправки: (chat_id, text, параметры send_message) -> отправленное сообщение
+SendFunction = Callable[..., Awaitable[Any]]
+
+
+class TokenBucket:
+    """
+    Корзина токенов: rate токенов в секунду, не больше capacity накопленных.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic) -> None:
+        if rate <= 0 or capacity < 1:
+            raise ValueError("Скорость должна быть положительной, а емкость - не меньше 1")
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self) -> float:
+        """
+        Сколько секунд ждать до появления токена (0 - токен есть).
+        """
+        self._refill()
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def take(self) -> None:
+        """
+        Забирает токен. Без проверки: вызывать после wait_time() == 0.
+        """
+        self._refill()
+        self._tokens -= 1
+
+    @property
+    def full(self) -> bool:
+        """
+        Корзина заполнена - по ней можно не хранить состояние.
+        """
+        self._refill()
+        return self._tokens >= self.capacity
+
+
+class _Outgoing:
+    """
+    Сообщение в очереди.
+    """
+    __slots__ = ("chat_id", "text", "kwargs", "group", "coalesce", "future", "queued_at")
+
+    def __init__(self, chat_id: int, text: str, kwargs: Dict[str, Any], group: Hashable, coalesce: bool,
+                 future: asyncio.Future, queued_at: float) -> None:
+        self.chat_id = chat_id
+        self.text = text
+        self.kwargs = kwargs
+        self.group = group
+        self.coalesce = coalesce
+        self.future = future
+        self.queued_at = queued_at
+
+    def joins(self, other: "_Outgoing") -> bool:
+        """
+        Можно ли дописать сообщение other к этому.
+        """
+        return (self.coalesce and other.coalesce and self.group == other.group
+                and self.kwargs == other.kwargs)
+
+
+class SendQueue:
+    """
+    Планировщик исходящих сообщений. Запускается start() внутри работающего цикла событий.
+    """
+
+    def __init__(self, send: SendFunction, global_rate: float = 30.0, chat_rate: float = 1.0,
+                 chat_burst: float = 3.0, message_limit: int = MESSAGE_LIMIT,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self._send = send
+        self._clock = clock
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.message_limit = message_limit
+        self._global = TokenBucket(global_rate, max(1.0, global_rate), clock)
+        self._chat_buckets: Dict[int, TokenBucket] = {}
+        self._pending: Dict[int, Deque[_Outgoing]] = {}
+        # Чаты с сообщениями в очереди в порядке обслуживания по кругу
+        self._ready: Deque[int] = deque()
+        self._in_flight: Set[int] = set()
+        self._paused_until = 0.0
+        self._wakeup = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+        self._deliveries: Set[asyncio.Task] = set()
+        # Последнее поставленное в очередь сообщение каждого чата, пока оно не отправлено
+        self._last: Dict[int, asyncio.Future] = {}
+        # Статистика
+        self.depth = 0
+        self.max_depth = 0
+        self.sent = 0
+        self.coalesced = 0
+        self.failed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._waited = 0
+
+    def start(self) -> None:
+        """
+        Запускает планировщик.
+        """
+        if self._worker is None:
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self, drain: bool = True) -> None:
+        """
+        Останавливает планировщик. При drain=True сначала отправляет все сообщения из очереди.
+        """
+        if drain and self._worker is not None:
+            while self.depth or self._deliveries:
+                await asyncio.sleep(0.05)
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        for items in self._pending.values():
+            for item in items:
+                item.future.cancel()
+
+    def send(self, chat_id: int, text: str, *, group: Hashable = None, coalesce: bool = True,
+             **kwargs: Any) -> asyncio.Future:
+        """
+        Ставит сообщение в очередь. Возвращает future с отправленным сообщением;
+        ждать его не обязательно. Склеиваются только сообщения одной группы group
+        (например, ответы на одну команду); coalesce=False - отправить отдельным сообщением.
+        """
+        future = asyncio.get_running_loop().create_future()
+        # Ошибку отправки пишет планировщик; future без ожидающих не должен ругаться
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        items = self._pending.get(chat_id)
+        if items is None:
+            items = self._pending[chat_id] = deque()
+            if chat_id not in self._in_flight:
+                self._ready.append(chat_id)
+        items.append(_Outgoing(chat_id, text, kwargs, group, coalesce, future, self._clock()))
+        self._last[chat_id] = future
+        future.add_done_callback(lambda done: self._last.get(chat_id) is done and self._last.pop(chat_id))
+        self.depth += 1
+        self.max_depth = max(self.max_depth, self.depth)
+        self._wakeup.set()
+        return future
+
+    async def wait_chat(self, chat_id: int) -> None:
+        """
+        Ждет, пока будут отправлены все сообщения, поставленные в очередь чата.
+        Нужно, чтобы отправленное в обход очереди (например, файл) не обогнало их.
+        """
+        last = self._last.get(chat_id)
+        if last is not None:
+            await asyncio.wait([last])
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Глубина очереди, число отправленных и склеенных сообщений, время ожидания в очереди.
+        """
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "chats": len(self._pending),
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "failed": self.failed,
+            "wait_avg": self._wait_total / self._waited if self._waited else 0.0,
+            "wait_max": self._wait_max,
+        }
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._chat_buckets[chat_id] = TokenBucket(self.chat_rate, self.chat_burst, self._clock)
+        return bucket
+
+    def _pick_chat(self) -> Tuple[Optional[int], float]:
+        """
+        Первый по кругу чат, в который уже можно отправлять. Если такого нет -
+        (None, сколько ждать до ближайшего).
+        """
+        shortest = float("inf")
+        for _ in range(len(self._ready)):
+            chat_id = self._ready.popleft()
+            wait = self._chat_bucket(chat_id).wait_time()
+            if wait == 0:
+                return chat_id, 0.0
+            self._ready.append(chat_id)
+            shortest = min(shortest, wait)
+        return None, shortest
+
+    def _take_batch(self, chat_id: int) -> List[_Outgoing]:
+        """
+        Забирает из очереди чата первое сообщение и склеивает с ним следующие с теми же параметрами и группой.
+        """
+        items = self._pending[chat_id]
+        batch = [items.popleft()]
+        length = len(batch[0].text)
+        while items and batch[0].joins(items[0]) and length + 1 + len(items[0].text) <= self.message_limit:
+            length += 1 + len(items[0].text)
+            batch.append(items.popleft())
+        if not items:
+            del self._pending[chat_id]
+        self.depth -= len(batch)
+        return batch
+
+    async def _sleep(self, timeout: float) -> None:
+        """
+        Ждет timeout секунд или появления нового сообщения.
+        """
+        self._wakeup.clear()
+        # asyncio.wait, а не wait_for: в Python 3.11 wait_for теряет отмену, пришедшую одновременно с событием
+        waiter = asyncio.ensure_future(self._wakeup.wait())
+        try:
+            await asyncio.wait([waiter], timeout=timeout)
+        finally:
+            waiter.cancel()
+
+    async def _run(self) -> None:
+        """
+        Цикл планировщика.
+        """
+        while True:
+            if not self._ready:
+                await self._sleep(3600)
+                continue
+            pause = max(self._paused_until - self._clock(), self._global.wait_time())
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+            chat_id, wait = self._pick_chat()
+            if chat_id is None:
+                await self._sleep(wait)
+                continue
+            self._global.take()
+            self._chat_bucket(chat_id).take()
+            batch = self._take_batch(chat_id)
+            self._in_flight.add(chat_id)
+            task = asyncio.get_running_loop().create_task(self._deliver(chat_id, batch))
+            self._deliveries.add(task)
+            task.add_done_callback(self._deliveries.discard)
+            self._prune_buckets()
+
+    async def _deliver(self, chat_id: int, batch: List[_Outgoing]) -> None:
+        """
+        Отправляет склеенные сообщения одним запросом и возвращает чат в круг, если в нем еще есть сообщения.
+        """
+        now = self._clock()
+        for item in batch:
+            wait = now - item.queued_at
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+            self._waited += 1
+        text = "\n".join(item.text for item in batch)
+        try:
+            message = await self._send(chat_id, text, **batch[0].kwargs)
+        except Exception as error:
+            retry_after = getattr(error, "retry_after", None)
+            if retry_after is not None:
+                # Telegram просит подождать: возвращаем сообщения в начало очереди чата
+                seconds = retry_after.total_seconds() if hasattr(retry_after, "total_seconds") else retry_after
+                self._paused_until = self._clock() + float(seconds)
+                items = self._pending.setdefault(chat_id, deque())
+                items.extendleft(reversed(batch))
+                self.depth += len(batch)
+            else:
+                logger.warning("Не удалось отправить сообщение в чат %s: %s", chat_id, error)
+                self.failed += len(batch)
+                for item in batch:
+                    if not item.future.done():
+                        item.future.set_exception(error)
+        else:
+            self.sent += 1
+            self.coalesced += len(batch) - 1
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_result(message)
+        finally:
+            self._in_flight.discard(chat_id)
+            if chat_id in self._pending:
+                self._ready.append(chat_id)
+            self._wakeup.set()
+
+    def _prune_buckets(self) -> None:
+        """
+        Забывает корзины простаивающих чатов: заполненная корзина ничем не отличается от новой.
+        """
+        if len(self._chat_buckets) < 1024:
+            return
+        for chat_id in [chat_id for chat_id, bucket in self._chat_buckets.items()
+                        if chat_id not in self._pending and chat_id not in self._in_flight and bucket.full]:
+            del self._chat_buckets[chat_id]
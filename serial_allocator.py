@@ -0,0 +1,120 @@
+"""
+Модуль для раздачи уникальных серийных номеров.
+
+Номер однозначно определяется секундой генерации (квартал + секунды с его начала)
+и добавочным числом AA. Аллокатор ведет для каждой секунды (слота) счетчик уже
+выданных добавочных чисел и гарантирует, что в пределах процесса одна и та же
+пара (секунда, AA) не будет выдана дважды. Когда слот заполнен, выдача
+переносится на следующую секунду.
+"""
+import random
+import threading
+import time as _time
+from typing import Dict, List, Optional, Protocol, Sequence, Tuple
+
+from serial_number import TimeLike, generate_serial_numbers, to_timestamp
+
+# Добавочные числа, которые раздаются в каждой секунде (как и раньше, 01..99)
+DEFAULT_ADDS_VALUES = tuple(range(1, 100))
+
+# Сколько секунд хранить состояние слотов в прошлом
+DEFAULT_RETENTION_SECONDS = 3600
+
+
+class Allocator(Protocol):
+    """
+    Интерфейс аллокатора: выдает группы (секунда, [добавочные числа]).
+    """
+
+    def allocate(self, count: int, timestamp: int) -> List[Tuple[int, List[int]]]:
+        ...
+
+
+class SerialAllocator:
+    """
+    Потокобезопасный аллокатор пар (секунда, добавочное число).
+
+    Порядок выдачи добавочных чисел - одна случайная перестановка, построенная
+    при создании аллокатора; каждый слот начинает ее со случайного места.
+    Поэтому на запрос не нужно строить диапазон: слот - это два целых числа.
+    """
+
+    def __init__(self, adds_values: Sequence[int] = DEFAULT_ADDS_VALUES,
+                 retention_seconds: int = DEFAULT_RETENTION_SECONDS,
+                 rng: Optional[random.Random] = None) -> None:
+        if not adds_values:
+            raise ValueError("Нужно хотя бы одно добавочное число")
+        self._rng = rng or random.Random()
+        self._order = tuple(self._rng.sample(list(adds_values), len(adds_values)))
+        self.slot_size = len(self._order)
+        self.retention_seconds = retention_seconds
+        # timestamp -> [смещение в перестановке, сколько уже выдано]
+        self._slots: Dict[int, List[int]] = {}
+        # Слоты раньше этого момента уже удалены, выдавать в них нельзя
+        self._floor = 0
+        self._lock = threading.Lock()
+
+    def allocate(self, count: int, timestamp: int) -> List[Tuple[int, List[int]]]:
+        """
+        Выделяет count уникальных пар начиная с секунды timestamp.
+        Возвращает список групп (секунда, [добавочные числа]) в порядке возрастания секунд.
+        """
+        if count < 0:
+            raise ValueError("Количество не может быть отрицательным")
+        groups: List[Tuple[int, List[int]]] = []
+        with self._lock:
+            slot_timestamp = max(timestamp, self._floor)
+            remaining = count
+            while remaining:
+                slot = self._slots.get(slot_timestamp)
+                if slot is None:
+                    slot = self._slots[slot_timestamp] = [self._rng.randrange(self.slot_size), 0]
+                start, issued = slot
+                taken = min(remaining, self.slot_size - issued)
+                if taken:
+                    first = start + issued
+                    adds = [self._order[(first + i) % self.slot_size] for i in range(taken)]
+                    slot[1] += taken
+                    groups.append((slot_timestamp, adds))
+                    remaining -= taken
+                slot_timestamp += 1
+            self._prune(timestamp)
+        return groups
+
+    def issued_in_slot(self, timestamp: int) -> int:
+        """
+        Сколько добавочных чисел уже выдано в секунде timestamp.
+        """
+        with self._lock:
+            slot = self._slots.get(timestamp)
+            return slot[1] if slot else 0
+
+    def _prune(self, now: int) -> None:
+        """
+        Удаляет слоты старше срока хранения. Вызывается под блокировкой.
+        """
+        floor = now - self.retention_seconds
+        # Чистим не чаще раза в минуту, чтобы не перебирать слоты на каждом запросе
+        if floor - self._floor < 60:
+            return
+        self._floor = floor
+        for slot_timestamp in [t for t in self._slots if t < floor]:
+            del self._slots[slot_timestamp]
+
+
+# Общий аллокатор процесса: через него должны проходить все обработчики
+default_allocator = SerialAllocator()
+
+
+def issue_serial_numbers(count: int, time: Optional[TimeLike] = None,
+                         allocator: Optional[Allocator] = None) -> List[Tuple[str, str]]:
+    """
+    Выдает count уникальных серийных номеров для момента time (по умолчанию - сейчас).
+    Возвращает пары (номер, отформатированный номер).
+    """
+    timestamp = to_timestamp(time) if time is not None else int(_time.time())
+    allocator = allocator or default_allocator
+    serials: List[Tuple[str, str]] = []
+    for slot_timestamp, adds in allocator.allocate(count, timestamp):
+        serials.extend(generate_serial_numbers(slot_timestamp, adds))
+    return serials
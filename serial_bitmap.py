@@ -0,0 +1,182 @@
+"""
+Модуль для битового индекса выпущенных серийных номеров.
+
+Номер однозначно задается тройкой (квартал, секунды с начала квартала, AA),
+поэтому для каждого квартала достаточно плотной битовой карты из
+(секунд в квартале) * 100 бит - около 95 МБ. Карта хранится в файле и
+отображается в память через mmap: при запуске файл не читается, ОС подгружает
+только те страницы, к которым было обращение, а незаписанные участки
+остаются дырами в разреженном файле.
+"""
+import mmap
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from serial_number import SerialLike, get_quarter_start_timestamp, serial_value
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен
+    np = None
+
+
+# Количество возможных добавочных чисел AA в секунде
+ADDS_PER_SECOND = 100
+
+
+def quarter_bitmap_bits(quarter: int) -> int:
+    """
+    Количество бит в карте квартала: секунды в квартале * 100.
+    """
+    seconds = get_quarter_start_timestamp(quarter + 1) - get_quarter_start_timestamp(quarter)
+    return seconds * ADDS_PER_SECOND
+
+
+class SerialBitmap:
+    """
+    Хранилище битовых карт выпущенных номеров, по файлу на квартал.
+    Проверка наличия номера - чтение одного байта из отображенной памяти.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._lock = threading.Lock()
+
+    def path(self, quarter: int) -> str:
+        """
+        Путь к файлу карты квартала.
+        """
+        return os.path.join(self.directory, f"quarter_{quarter:02d}.bitmap")
+
+    def _bitmap(self, quarter: int, create: bool) -> Optional[mmap.mmap]:
+        """
+        Отображение карты квартала в память. Файл создается разреженным только при записи.
+        """
+        bitmap = self._maps.get(quarter)
+        if bitmap is not None:
+            return bitmap
+        path = self.path(quarter)
+        if not create and not os.path.exists(path):
+            return None
+        with self._lock:
+            bitmap = self._maps.get(quarter)
+            if bitmap is None:
+                size = (quarter_bitmap_bits(quarter) + 7) // 8
+                with open(path, "a+b") as file:
+                    if os.fstat(file.fileno()).st_size < size:
+                        file.truncate(size)
+                    bitmap = mmap.mmap(file.fileno(), size)
+                self._maps[quarter] = bitmap
+        return bitmap
+
+    @staticmethod
+    def _position(serial: SerialLike) -> Tuple[int, int]:
+        """
+        Квартал и номер бита для серийного номера.
+        """
+        value = serial_value(serial)
+        quarter = value // 10 ** 10
+        seconds = value // 1000 % 10 ** 7
+        adds = value // 10 % 100
+        return quarter, seconds * ADDS_PER_SECOND + adds
+
+    def add(self, serial: SerialLike) -> None:
+        """
+        Отмечает номер как выпущенный.
+        """
+        quarter, bit = self._position(serial)
+        if bit >= quarter_bitmap_bits(quarter):
+            raise ValueError(f"Секунды номера выходят за пределы квартала: {serial}")
+        bitmap = self._bitmap(quarter, create=True)
+        with self._lock:
+            bitmap[bit >> 3] |= 1 << (bit & 7)
+
+    def __contains__(self, serial: SerialLike) -> bool:
+        quarter, bit = self._position(serial)
+        bitmap = self._bitmap(quarter, create=False)
+        if bitmap is None or bit >= len(bitmap) * 8:
+            return False
+        return bool(bitmap[bit >> 3] & (1 << (bit & 7)))
+
+    def contains(self, serial: SerialLike) -> bool:
+        """
+        Был ли номер отмечен как выпущенный.
+        """
+        return serial in self
+
+    def add_many(self, serials: Iterable[SerialLike]) -> None:
+        """
+        Отмечает много номеров за раз. С NumPy биты выставляются векторно прямо в отображенной памяти.
+        """
+        for quarter, bits in self._group_by_quarter(serials).items():
+            if max(bits) >= quarter_bitmap_bits(quarter):
+                raise ValueError(f"Секунды номера выходят за пределы квартала {quarter}")
+            bitmap = self._bitmap(quarter, create=True)
+            with self._lock:
+                if np is not None:
+                    view = np.frombuffer(bitmap, dtype=np.uint8)
+                    positions = np.asarray(bits, dtype=np.int64)
+                    np.bitwise_or.at(view, positions >> 3, (1 << (positions & 7)).astype(np.uint8))
+                    del view
+                else:
+                    for bit in bits:
+                        bitmap[bit >> 3] |= 1 << (bit & 7)
+
+    def contains_many(self, serials: Sequence[SerialLike]) -> List[bool]:
+        """
+        Проверяет много номеров за раз. Результат - в порядке входных номеров.
+        """
+        positions = [self._position(serial) for serial in serials]
+        result = [False] * len(positions)
+        by_quarter: Dict[int, List[int]] = {}
+        for index, (quarter, _) in enumerate(positions):
+            by_quarter.setdefault(quarter, []).append(index)
+        for quarter, indexes in by_quarter.items():
+            bitmap = self._bitmap(quarter, create=False)
+            if bitmap is None:
+                continue
+            limit = len(bitmap) * 8
+            if np is not None:
+                view = np.frombuffer(bitmap, dtype=np.uint8)
+                bits = np.array([positions[i][1] for i in indexes], dtype=np.int64)
+                inside = bits < limit
+                found = np.zeros(len(bits), dtype=bool)
+                found[inside] = ((view[bits[inside] >> 3] >> (bits[inside] & 7)) & 1).astype(bool)
+                del view
+                for index, value in zip(indexes, found.tolist()):
+                    result[index] = value
+            else:
+                for index in indexes:
+                    bit = positions[index][1]
+                    result[index] = bit < limit and bool(bitmap[bit >> 3] & (1 << (bit & 7)))
+        return result
+
+    def _group_by_quarter(self, serials: Iterable[SerialLike]) -> Dict[int, List[int]]:
+        """
+        Группирует номера битов по кварталам.
+        """
+        groups: Dict[int, List[int]] = {}
+        for serial in serials:
+            quarter, bit = self._position(serial)
+            groups.setdefault(quarter, []).append(bit)
+        return groups
+
+    def flush(self) -> None:
+        """
+        Сбрасывает измененные страницы на диск.
+        """
+        for bitmap in list(self._maps.values()):
+            bitmap.flush()
+
+    def close(self) -> None:
+        """
+        Сбрасывает изменения и закрывает отображения.
+        """
+        with self._lock:
+            for bitmap in self._maps.values():
+                bitmap.flush()
+                bitmap.close()
+            self._maps.clear()
@@ -0,0 +1,315 @@
+"""
+Модуль для фильтра Блума по выпущенным серийным номерам.
+
+Фильтр отвечает "возможно выпущен" или "точно не выпущен" без общей базы
+данных. Он сохраняется в компактный файл (заголовок + битовый массив), который
+реплики бота отображают в память и периодически перечитывают, когда файл
+обновляется.
+
+Сборка фильтра из списка номеров или из реестра SQLite:
+
+    python serial_bloom.py build --input serials.txt --output issued.bloom --fp-rate 0.001
+    python serial_bloom.py build --registry issued_serials.sqlite3 --output issued.bloom
+    python serial_bloom.py info issued.bloom
+"""
+import argparse
+import hashlib
+import logging
+import math
+import mmap
+import os
+import random
+import sqlite3
+import struct
+import sys
+import tempfile
+import time
+from typing import Iterable, Iterator, Optional, TextIO, Union
+
+from serial_number import SerialLike, extract_digits, serial_value
+
+logger = logging.getLogger(__name__)
+
+# Заголовок файла: сигнатура, число бит, число хеш-функций, число элементов
+_MAGIC = b"SNBLOOM1"
+_HEADER = struct.Struct("<8sQIQ")
+
+# Серийные номера меньше 10**12, поэтому числа из этого диапазона заведомо не выпускались
+_NON_MEMBER_START = 10 ** 12
+
+
+class BloomFilter:
+    """
+    Фильтр Блума с двойным хешированием: k позиций получаются из двух 64-битных
+    половин одного хеша blake2b.
+    """
+
+    def __init__(self, bit_count: int, hash_count: int, bits: Optional[Union[bytearray, memoryview]] = None,
+                 count: int = 0) -> None:
+        if bit_count <= 0 or hash_count <= 0:
+            raise ValueError("Размер фильтра и число хеш-функций должны быть положительными")
+        self.bit_count = bit_count
+        self.hash_count = hash_count
+        self.count = count
+        self._bits = bits if bits is not None else bytearray((bit_count + 7) // 8)
+        self._mmap: Optional[mmap.mmap] = None
+
+    @classmethod
+    def for_capacity(cls, capacity: int, fp_rate: float) -> "BloomFilter":
+        """
+        Создает фильтр под capacity элементов с заданной долей ложных срабатываний.
+        """
+        if not 0 < fp_rate < 1:
+            raise ValueError("Доля ложных срабатываний должна быть в интервале (0, 1)")
+        capacity = max(capacity, 1)
+        bit_count = math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2)
+        hash_count = max(1, round(bit_count / capacity * math.log(2)))
+        return cls(bit_count, hash_count)
+
+    def _positions(self, serial: SerialLike) -> Iterator[int]:
+        """
+        Номера бит, соответствующие элементу.
+        """
+        digest = hashlib.blake2b(serial_value(serial).to_bytes(8, "little"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (first + i * second) % self.bit_count
+
+    def add(self, serial: SerialLike) -> None:
+        """
+        Добавляет номер в фильтр.
+        """
+        if self._mmap is not None:
+            raise TypeError("Фильтр, загруженный из файла, доступен только для чтения")
+        bits = self._bits
+        for position in self._positions(serial):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def add_many(self, serials: Iterable[SerialLike]) -> None:
+        """
+        Добавляет много номеров.
+        """
+        for serial in serials:
+            self.add(serial)
+
+    def __contains__(self, serial: SerialLike) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(serial))
+
+    @property
+    def memory_bytes(self) -> int:
+        """
+        Размер битового массива в байтах.
+        """
+        return len(self._bits)
+
+    def expected_fp_rate(self) -> float:
+        """
+        Теоретическая доля ложных срабатываний при текущем числе элементов.
+        """
+        return (1 - math.exp(-self.hash_count * self.count / self.bit_count)) ** self.hash_count
+
+    def measure_fp_rate(self, samples: int = 100_000, seed: int = 0) -> float:
+        """
+        Измеряет долю ложных срабатываний на числах, которые заведомо не являются номерами.
+        """
+        rng = random.Random(seed)
+        hits = sum(rng.randrange(_NON_MEMBER_START, 2 * _NON_MEMBER_START) in self for _ in range(samples))
+        return hits / samples
+
+    def save(self, path: str) -> None:
+        """
+        Атомарно сохраняет фильтр в файл: читатели видят либо старую, либо новую версию.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix=".bloom-")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(_HEADER.pack(_MAGIC, self.bit_count, self.hash_count, self.count))
+                file.write(self._bits)
+            os.replace(temporary_path, path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "BloomFilter":
+        """
+        Загружает фильтр из файла, отображая его в память только для чтения.
+        """
+        with open(path, "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(mapped) < _HEADER.size or mapped[:len(_MAGIC)] != _MAGIC:
+            mapped.close()
+            raise ValueError(f"Файл не является фильтром Блума: {path}")
+        _, bit_count, hash_count, count = _HEADER.unpack_from(mapped)
+        # Обрезанный файл дал бы IndexError или ложные ответы "точно не выпущен"
+        if bit_count <= 0 or hash_count <= 0 or len(mapped) != _HEADER.size + (bit_count + 7) // 8:
+            mapped.close()
+            raise ValueError(f"Размер файла фильтра не соответствует заголовку: {path}")
+        bits = memoryview(mapped)[_HEADER.size:_HEADER.size + (bit_count + 7) // 8]
+        bloom = cls(bit_count, hash_count, bits, count)
+        bloom._mmap = mapped
+        return bloom
+
+    def close(self) -> None:
+        """
+        Освобождает отображение файла, если фильтр был загружен.
+        """
+        if self._mmap is not None:
+            self._bits.release()
+            self._mmap.close()
+            self._mmap = None
+
+
+class BloomSnapshot:
+    """
+    Фильтр из файла, который перечитывается, когда файл обновился.
+    Проверка обновления выполняется не чаще раза в reload_interval секунд.
+    Прежний фильтр при перечитывании не закрывается: его еще могут читать другие
+    потоки, а отображение освобождается сборщиком мусора вместе с последней ссылкой.
+    """
+
+    def __init__(self, path: str, reload_interval: float = 60.0) -> None:
+        self.path = path
+        self.reload_interval = reload_interval
+        self._bloom: Optional[BloomFilter] = None
+        self._signature = None
+        self._checked_at = 0.0
+        self.reload()
+
+    def reload(self) -> bool:
+        """
+        Перечитывает файл, если он изменился. Возвращает True, если фильтр обновлен.
+        """
+        self._checked_at = time.monotonic()
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return False
+        self._bloom = BloomFilter.load(self.path)
+        self._signature = signature
+        return True
+
+    def maybe_reload(self) -> None:
+        """
+        Перечитывает файл, если с прошлой проверки прошло reload_interval секунд.
+        Если новый файл не читается (удален или обрезан во время замены, неверный
+        заголовок), ошибка пишется в лог, а проверки идут по прежнему фильтру.
+        """
+        if time.monotonic() - self._checked_at >= self.reload_interval:
+            try:
+                self.reload()
+            except (OSError, ValueError) as error:
+                logger.warning("Не удалось перечитать фильтр Блума %s: %s", self.path, error)
+
+    @property
+    def loaded(self) -> bool:
+        """
+        Загружен ли фильтр (файл мог еще не появиться).
+        """
+        return self._bloom is not None
+
+    def __contains__(self, serial: SerialLike) -> bool:
+        self.maybe_reload()
+        bloom = self._bloom
+        # Пока файла нет, ничего нельзя утверждать - считаем, что номер мог быть выпущен
+        return bloom is None or serial in bloom
+
+    def close(self) -> None:
+        """
+        Освобождает отображение файла.
+        """
+        if self._bloom is not None:
+            self._bloom.close()
+            self._bloom = None
+
+
+def _serials_from_lines(lines: Iterable[str]) -> Iterator[int]:
+    """
+    Извлекает номера из строк текста; строки без 12 цифр пропускаются.
+    """
+    for line in lines:
+        digits = extract_digits(line)
+        if len(digits) == 12:
+            yield int(digits)
+
+
+def _serials_from_registry(path: str) -> Iterator[int]:
+    """
+    Читает все номера из реестра SQLite.
+    """
+    connection = sqlite3.connect(path)
+    try:
+        for (serial,) in connection.execute("SELECT serial FROM issued_serials"):
+            yield serial
+    finally:
+        connection.close()
+
+
+def _report(bloom: BloomFilter, samples: int, output: TextIO) -> None:
+    """
+    Печатает размер фильтра и долю ложных срабатываний.
+    """
+    print(f"Элементов: {bloom.count}", file=output)
+    print(f"Бит: {bloom.bit_count}, хеш-функций: {bloom.hash_count}", file=output)
+    print(f"Размер: {bloom.memory_bytes} байт ({bloom.memory_bytes / 1024 / 1024:.2f} МБ)", file=output)
+    print(f"Ожидаемая доля ложных срабатываний: {bloom.expected_fp_rate():.6f}", file=output)
+    if samples:
+        print(f"Измеренная доля ложных срабатываний ({samples} проб): {bloom.measure_fp_rate(samples):.6f}", file=output)
+
+
+def _build(serials: Iterable[int], args: argparse.Namespace) -> int:
+    """
+    Собирает фильтр из номеров, сохраняет его и печатает отчет.
+    """
+    # Если емкость не задана, сначала считаем номера, иначе добавляем их потоком
+    if not args.capacity:
+        serials = list(serials)
+    bloom = BloomFilter.for_capacity(args.capacity or len(serials), args.fp_rate)
+    bloom.add_many(serials)
+    bloom.save(args.output)
+    _report(bloom, args.samples, sys.stdout)
+    return 0
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Сборка фильтра и вывод информации о нем."""
+    parser = argparse.ArgumentParser(description="Фильтр Блума по выпущенным серийным номерам")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="собрать фильтр из списка номеров или реестра")
+    source = build.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="файл с номерами по одному в строке ('-' - stdin)")
+    source.add_argument("--registry", help="файл реестра SQLite")
+    build.add_argument("--output", required=True, help="куда сохранить фильтр")
+    build.add_argument("--fp-rate", type=float, default=0.001, help="доля ложных срабатываний")
+    build.add_argument("--capacity", type=int, help="ожидаемое число номеров (по умолчанию - число номеров во входе)")
+    build.add_argument("--samples", type=int, default=100_000, help="сколько проб для измерения ложных срабатываний")
+
+    info = commands.add_parser("info", help="показать размер и долю ложных срабатываний фильтра")
+    info.add_argument("path")
+    info.add_argument("--samples", type=int, default=100_000)
+
+    args = parser.parse_args(argv)
+    if args.command == "info":
+        bloom = BloomFilter.load(args.path)
+        _report(bloom, args.samples, sys.stdout)
+        bloom.close()
+        return 0
+
+    if args.registry:
+        return _build(_serials_from_registry(args.registry), args)
+    if args.input == "-":
+        return _build(_serials_from_lines(sys.stdin), args)
+    with open(args.input, encoding="utf-8") as file:
+        return _build(_serials_from_lines(file), args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
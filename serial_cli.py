@@ -0,0 +1,269 @@
+"""
+Командная строка для проверки и генерации серийных номеров без Telegram.
+
+Проверка номеров (по одному в строке) из файлов или stdin:
+
+    python serial_cli.py validate serials.txt --format jsonl
+    cat serials.txt | python serial_cli.py validate --workers 4 > result.csv
+    python serial_cli.py validate generated.csv --column 1
+
+Генерация номеров для каждой секунды интервала [start, end):
+
+    python serial_cli.py generate --start 2026-04-01T00:00:00 --end 2026-04-01T01:00:00 --per-second 99
+
+Вход обрабатывается пачками по --chunk-size строк (или секунд), поэтому расход
+памяти не зависит от объема данных. С --workers N пачки обрабатываются в пуле
+из N процессов, порядок результатов сохраняется. В конце в stderr выводится
+скорость обработки.
+"""
+import argparse
+import csv
+import io
+import itertools
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Deque, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from serial_number import (
+    QUARTER_START_TIMESTAMPS, SerialNumber, SerialNumberError, generate_serial_numbers, to_timestamp,
+)
+
+VALIDATE_FIELDS = ("input", "serial", "valid", "message", "quarter", "seconds", "adds", "date", "timestamp")
+GENERATE_FIELDS = ("serial", "formatted")
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+# Результат обработки пачки: готовый текст для вывода, число номеров, число валидных
+ChunkResult = Tuple[str, int, int]
+
+
+def _render(rows: Iterable[Sequence], fields: Sequence[str], output_format: str) -> str:
+    """
+    Превращает строки результата в текст CSV (без заголовка) или JSONL.
+    """
+    buffer = io.StringIO()
+    if output_format == "jsonl":
+        for row in rows:
+            buffer.write(json.dumps(dict(zip(fields, row)), ensure_ascii=False))
+            buffer.write("\n")
+    else:
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue()
+
+
+def validate_row(user_input: str) -> Tuple:
+    """
+    Проверяет один номер и раскладывает его на части. Поля - как в VALIDATE_FIELDS.
+    """
+    try:
+        serial = SerialNumber.parse(user_input)
+    except SerialNumberError as error:
+        return user_input, error.digits, False, error.message, None, None, None, None, None
+    return (user_input, serial.digits, True, "", serial.quarter, serial.seconds, serial.adds,
+            serial.date_string, serial.timestamp)
+
+
+def _select_column(line: str, column: Optional[int]) -> str:
+    """
+    Ячейка column (с 1) строки CSV или вся строка, если колонка не задана.
+    Ячейки в кавычках могут содержать запятые, поэтому строка разбирается модулем csv.
+    """
+    if column is None:
+        return line.strip()
+    cells = next(csv.reader([line]), [])
+    return cells[column - 1].strip() if column <= len(cells) else ""
+
+
+def validate_chunk(lines: List[str], output_format: str = "csv", column: Optional[int] = None) -> ChunkResult:
+    """
+    Проверяет пачку строк. Строки без цифр (пустые, заголовки CSV) пропускаются.
+    """
+    values = (_select_column(line, column) for line in lines)
+    rows = [validate_row(value) for value in values if any(char.isdigit() for char in value)]
+    valid = sum(1 for row in rows if row[2])
+    if output_format == "csv":
+        # В CSV булевы значения и пропуски пишем так же, как bulk_check
+        rows = [(row[0], row[1], "true" if row[2] else "false", *("" if value is None else value for value in row[3:]))
+                for row in rows]
+    return _render(rows, VALIDATE_FIELDS, output_format), len(rows), valid
+
+
+def generate_chunk(timestamps: List[int], adds_values: Sequence[int], output_format: str = "csv") -> ChunkResult:
+    """
+    Генерирует номера для пачки секунд: для каждой секунды - по одному на каждое добавочное число.
+    """
+    rows = [pair for timestamp in timestamps for pair in generate_serial_numbers(timestamp, adds_values)]
+    return _render(rows, GENERATE_FIELDS, output_format), len(rows), len(rows)
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[list]:
+    """
+    Разбивает поток на списки по size элементов.
+    """
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _input_lines(paths: Sequence[str]) -> Iterator[str]:
+    """
+    Строки из файлов по очереди; '-' или пустой список - stdin.
+    """
+    for path in paths or ["-"]:
+        if path == "-":
+            yield from sys.stdin
+        else:
+            with open(path, encoding="utf-8", errors="replace") as file:
+                yield from file
+
+
+def parse_time(value: str) -> int:
+    """
+    Разбирает момент времени: Unix-время или дата в формате ISO 8601 (без часового пояса - UTC).
+    """
+    if value.lstrip("-").isdigit():
+        return int(value)
+    try:
+        return to_timestamp(datetime.fromisoformat(value))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Неверный момент времени: {value}")
+
+
+def parse_adds(value: str) -> List[int]:
+    """
+    Разбирает список добавочных чисел: "1-99", "5" или "1,2,10-20".
+    """
+    adds: List[int] = []
+    try:
+        for part in value.split(","):
+            first, _, last = part.partition("-")
+            adds.extend(range(int(first), int(last or first) + 1))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Неверный список добавочных чисел: {value}")
+    if not adds or not all(0 <= number <= 99 for number in adds):
+        raise argparse.ArgumentTypeError("Добавочные числа должны быть в диапазоне 0..99")
+    return adds
+
+
+def _process_chunk(task: Tuple[Callable[..., ChunkResult], tuple]) -> ChunkResult:
+    """
+    Обработка одной пачки в процессе пула.
+    """
+    process, chunk = task
+    return process(*chunk)
+
+
+def run_chunks(process: Callable[..., ChunkResult], chunks: Iterable[tuple], workers: int,
+               output: TextIO) -> Tuple[int, int]:
+    """
+    Обрабатывает пачки в текущем процессе или в пуле процессов и пишет результат по порядку.
+    Возвращает (число номеров, число валидных).
+    """
+    total = valid = 0
+    if workers > 1:
+        executor = ProcessPoolExecutor(workers)
+        results = _ordered_results(executor, process, chunks, workers)
+    else:
+        executor = None
+        results = (process(*chunk) for chunk in chunks)
+    try:
+        for text, count, chunk_valid in results:
+            output.write(text)
+            total += count
+            valid += chunk_valid
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    return total, valid
+
+
+def _ordered_results(executor: ProcessPoolExecutor, process: Callable[..., ChunkResult],
+                     chunks: Iterable[tuple], workers: int) -> Iterator[ChunkResult]:
+    """
+    Отдает результаты пачек в порядке входа. В работе не больше 2 * workers пачек,
+    поэтому вход читается по мере обработки, а не целиком.
+    """
+    pending: Deque[Future] = deque()
+    for chunk in chunks:
+        pending.append(executor.submit(_process_chunk, (process, chunk)))
+        if len(pending) >= 2 * workers:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Проверка и генерация серийных номеров из командной строки."""
+    parser = argparse.ArgumentParser(description="Проверка и генерация серийных номеров")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    validate = commands.add_parser("validate", help="проверить номера по одному в строке")
+    validate.add_argument("files", nargs="*", help="файлы с номерами ('-' или ничего - stdin)")
+    validate.add_argument("--column", type=int, help="брать номер из этой колонки CSV (с 1), а не всю строку")
+
+    generate = commands.add_parser("generate", help="сгенерировать номера для интервала времени")
+    generate.add_argument("--start", type=parse_time, required=True, help="начало интервала (Unix-время или ISO 8601)")
+    generate.add_argument("--end", type=parse_time, help="конец интервала, не включая (по умолчанию - start + 1 с)")
+    adds = generate.add_mutually_exclusive_group()
+    adds.add_argument("--adds", type=parse_adds, help="добавочные числа, например 1-99 или 1,5,10-20")
+    adds.add_argument("--per-second", type=int, help="сколько номеров в секунду (добавочные числа 1..N)")
+
+    for command in (validate, generate):
+        command.add_argument("--format", choices=("csv", "jsonl"), default="csv", help="формат вывода")
+        command.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="размер пачки")
+        command.add_argument("--workers", type=int, default=1, help="число процессов для обработки")
+        command.add_argument("--no-header", action="store_true", help="не выводить заголовок CSV")
+
+    args = parser.parse_args(argv)
+    if args.chunk_size <= 0:
+        parser.error("--chunk-size должен быть положительным")
+
+    output = sys.stdout
+    started = time.perf_counter()
+    if args.command == "validate":
+        fields = VALIDATE_FIELDS
+        if args.column is not None and args.column < 1:
+            parser.error("--column должен быть положительным")
+        chunks = ((chunk, args.format, args.column) for chunk in _chunks(_input_lines(args.files), args.chunk_size))
+        process = validate_chunk
+    else:
+        end = args.end if args.end is not None else args.start + 1
+        # Вне кварталов 1..99 номер получился бы с нулевым кварталом или из 13 цифр
+        first, last = QUARTER_START_TIMESTAMPS[0], QUARTER_START_TIMESTAMPS[-1]
+        if not first <= args.start < last or not first < end <= last:
+            since, until = (datetime.fromtimestamp(timestamp, timezone.utc) for timestamp in (first, last))
+            parser.error(f"интервал должен лежать в кварталах 1..99: [{since:%Y-%m-%d}, {until:%Y-%m-%d})")
+        if args.per_second is not None:
+            if not 1 <= args.per_second <= 99:
+                parser.error("--per-second должен быть в диапазоне 1..99")
+            adds_values = list(range(1, args.per_second + 1))
+        else:
+            adds_values = args.adds or list(range(1, 100))
+        fields = GENERATE_FIELDS
+        chunks = ((chunk, adds_values, args.format)
+                  for chunk in _chunks(range(args.start, end), max(1, args.chunk_size // len(adds_values))))
+        process = generate_chunk
+
+    if args.format == "csv" and not args.no_header:
+        output.write(",".join(fields) + "\n")
+    total, valid = run_chunks(process, chunks, args.workers, output)
+    output.flush()
+
+    elapsed = time.perf_counter() - started
+    rate = total / elapsed if elapsed > 0 else 0.0
+    summary = f"Обработано номеров: {total}"
+    if args.command == "validate":
+        summary += f", валидных: {valid}"
+    print(f"{summary}. Время: {elapsed:.3f} с, {rate:.0f} номеров/с", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Модуль для раздачи серийных номеров несколькими репликами бота.
+
+Пространство (секунда, AA) делится на блоки: в каждой секунде добавочные
+числа 01..99 разбиты на блоки по block_size чисел. Реплика арендует блок в
+общем файле SQLite (короткая транзакция BEGIN IMMEDIATE, которая блокирует
+запись для остальных), после чего раздает номера из блока без какой-либо
+координации, пока блок не закончится. Блоки разных реплик не пересекаются,
+поэтому номера не повторяются.
+"""
+import sqlite3
+import threading
+from typing import List, Optional, Sequence, Tuple
+
+from serial_allocator import DEFAULT_ADDS_VALUES, DEFAULT_RETENTION_SECONDS
+
+# Сколько добавочных чисел в одном блоке: 99 = 9 блоков по 11
+DEFAULT_BLOCK_SIZE = 11
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS slot_leases (
+    slot INTEGER PRIMARY KEY,
+    next_block INTEGER NOT NULL
+)
+"""
+
+
+class LeaseStore:
+    """
+    Общий для реплик счетчик арендованных блоков в каждой секунде.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0,
+                 retention_seconds: int = DEFAULT_RETENTION_SECONDS) -> None:
+        self.path = path
+        self.retention_seconds = retention_seconds
+        # isolation_level=None: транзакциями управляем сами
+        self._connection = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(_SCHEMA)
+        self._lock = threading.Lock()
+        self._pruned_before = 0
+
+    def lease(self, first_slot: int, blocks_per_slot: int) -> Tuple[int, int]:
+        """
+        Арендует свободный блок в первой секунде, начиная с first_slot, где он еще есть.
+        Возвращает (секунда, номер блока).
+        """
+        with self._lock:
+            cursor = self._connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                slot = first_slot
+                while True:
+                    row = cursor.execute("SELECT next_block FROM slot_leases WHERE slot = ?", (slot,)).fetchone()
+                    block = row[0] if row else 0
+                    if block < blocks_per_slot:
+                        cursor.execute(
+                            "INSERT INTO slot_leases (slot, next_block) VALUES (?, ?) "
+                            "ON CONFLICT (slot) DO UPDATE SET next_block = excluded.next_block",
+                            (slot, block + 1),
+                        )
+                        break
+                    slot += 1
+                self._prune(cursor, first_slot)
+                cursor.execute("COMMIT")
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            return slot, block
+
+    def _prune(self, cursor: sqlite3.Cursor, now: int) -> None:
+        """
+        Удаляет записи о давно прошедших секундах. Вызывается внутри транзакции.
+        """
+        before = now - self.retention_seconds
+        if before - self._pruned_before < 60:
+            return
+        cursor.execute("DELETE FROM slot_leases WHERE slot < ?", (before,))
+        self._pruned_before = before
+
+    def close(self) -> None:
+        """
+        Закрывает соединение с базой.
+        """
+        self._connection.close()
+
+
+class LeasedSerialAllocator:
+    """
+    Аллокатор пар (секунда, добавочное число) поверх арендованных блоков.
+    Интерфейс совпадает с serial_allocator.SerialAllocator.
+    """
+
+    def __init__(self, store: LeaseStore, adds_values: Sequence[int] = DEFAULT_ADDS_VALUES,
+                 block_size: int = DEFAULT_BLOCK_SIZE) -> None:
+        if block_size <= 0:
+            raise ValueError("Размер блока должен быть положительным")
+        self.store = store
+        self._adds = tuple(adds_values)
+        self.block_size = block_size
+        self.blocks_per_slot = (len(self._adds) + block_size - 1) // block_size
+        # Текущий блок: секунда и еще не выданные добавочные числа
+        self._slot: Optional[int] = None
+        self._free: List[int] = []
+        self._lock = threading.Lock()
+
+    def allocate(self, count: int, timestamp: int) -> List[Tuple[int, List[int]]]:
+        """
+        Выделяет count уникальных пар начиная с секунды timestamp.
+        Возвращает список групп (секунда, [добавочные числа]) в порядке возрастания секунд.
+        """
+        if count < 0:
+            raise ValueError("Количество не может быть отрицательным")
+        groups: List[Tuple[int, List[int]]] = []
+        with self._lock:
+            remaining = count
+            while remaining:
+                # Блок прошедшей секунды не используем: номер не может быть выпущен задним числом
+                if not self._free or self._slot < timestamp:
+                    first_slot = timestamp if self._slot is None else max(timestamp, self._slot)
+                    self._slot, block = self.store.lease(first_slot, self.blocks_per_slot)
+                    self._free = list(self._adds[block * self.block_size:(block + 1) * self.block_size])
+                taken, self._free = self._free[:remaining], self._free[remaining:]
+                if groups and groups[-1][0] == self._slot:
+                    groups[-1][1].extend(taken)
+                else:
+                    groups.append((self._slot, taken))
+                remaining -= len(taken)
+        return groups
@@ -6,48 +6,377 @@
 - AA: добавочные числа
 - Z: контрольная сумма по алгоритму Луна
 """
+import calendar
+import math
+import unicodedata
+import time as _time
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timezone
-from typing import Tuple, Optional
+from functools import lru_cache, total_ordering
+from typing import Iterable, Iterator, Sequence, Tuple, Optional, Union
 
-from luhn_algorithm import add_valid_luhn_checksum, validate_luhn_checksum
+from luhn_algorithm import LuhnAccumulator, validate_luhn_checksum
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен
+    np = None
 
 # Дата начала отсчета - 1 января 2026, 00:00:00 UTC
 Q1_2026_START = datetime(2026, 1, 1, 0, 0, 0, tzinfo=timezone.utc)
 
-def get_quarter_number(time: datetime) -> int:
+# Последний квартал, который помещается в двузначное поле XX
+MAX_QUARTER = 99
+
+# Момент времени: datetime или Unix-время в секундах
+TimeLike = Union[datetime, int]
+
+def _quarter_start_timestamp(quarter: int) -> int:
+    """
+    Unix-время начала квартала с номером quarter (начиная с Q1 2026).
+    """
+    year, quarter_index = divmod(quarter - 1, 4)
+    return calendar.timegm((Q1_2026_START.year + year, quarter_index * 3 + 1, 1, 0, 0, 0))
+
+# Начала кварталов 1..MAX_QUARTER и конец последнего квартала
+QUARTER_START_TIMESTAMPS: Tuple[int, ...] = tuple(_quarter_start_timestamp(q) for q in range(1, MAX_QUARTER + 2))
+
+Q1_2026_START_TIMESTAMP = QUARTER_START_TIMESTAMPS[0]
+
+if np is not None:
+    _QUARTER_STARTS_ARRAY = np.array(QUARTER_START_TIMESTAMPS, dtype=np.int64)
+
+def to_timestamp(time: TimeLike) -> int:
+    """
+    Переводит момент времени в целое Unix-время (секунды, с округлением вниз).
+    Наивный datetime считается заданным в UTC.
+    """
+    if isinstance(time, int):
+        return time
+    if time.tzinfo is None:
+        time = time.replace(tzinfo=timezone.utc)
+    return math.floor(time.timestamp())
+
+def _split_timestamp_by_calendar(timestamp: int) -> Tuple[int, int]:
+    """
+    Номер квартала и секунды с его начала для моментов вне таблицы кварталов.
+    """
+    utc_time = _time.gmtime(timestamp)
+    quarter_in_year = (utc_time.tm_mon - 1) // 3 + 1
+    quarter = (utc_time.tm_year - Q1_2026_START.year) * 4 + quarter_in_year
+    return quarter, timestamp - _quarter_start_timestamp(quarter)
+
+def split_timestamp(timestamp: int) -> Tuple[int, int]:
+    """
+    Возвращает номер квартала начиная с Q1 2026 и количество секунд с начала квартала
+    для Unix-времени. Внутри диапазона кварталов 1..MAX_QUARTER - бинарный поиск по таблице.
+    """
+    index = bisect_right(QUARTER_START_TIMESTAMPS, timestamp)
+    if 0 < index <= MAX_QUARTER:
+        return index, timestamp - QUARTER_START_TIMESTAMPS[index - 1]
+    return _split_timestamp_by_calendar(timestamp)
+
+def split_timestamps(timestamps: Sequence[int]) -> Tuple[Sequence[int], Sequence[int]]:
+    """
+    Векторизованная версия split_timestamp для массива Unix-времен.
+    С NumPy возвращает массивы numpy, без него - списки.
+    """
+    if np is None:
+        pairs = [split_timestamp(int(timestamp)) for timestamp in timestamps]
+        return [quarter for quarter, _ in pairs], [seconds for _, seconds in pairs]
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    indexes = np.searchsorted(_QUARTER_STARTS_ARRAY, timestamps, side="right")
+    quarters = indexes.astype(np.int64)
+    seconds = timestamps - _QUARTER_STARTS_ARRAY[np.clip(indexes - 1, 0, MAX_QUARTER)]
+    outside = (indexes == 0) | (indexes > MAX_QUARTER)
+    for position in np.flatnonzero(outside):
+        quarters[position], seconds[position] = _split_timestamp_by_calendar(int(timestamps[position]))
+    return quarters, seconds
+
+def get_quarter_start_timestamp(quarter: int) -> int:
+    """
+    Возвращает Unix-время начала квартала с номером quarter (начиная с Q1 2026).
+    """
+    if 1 <= quarter <= MAX_QUARTER + 1:
+        return QUARTER_START_TIMESTAMPS[quarter - 1]
+    return _quarter_start_timestamp(quarter)
+
+def get_quarter_number(time: TimeLike) -> int:
     """
     Определяет номер квартала в текущем году.
     """
-    return (time.month - 1) // 3 + 1
+    return (split_timestamp(to_timestamp(time))[0] - 1) % 4 + 1
 
-def get_quarter_number_since_q1_2026(time: datetime) -> int:
+def get_quarter_number_since_q1_2026(time: TimeLike) -> int:
     """
     Определяет номер квартала начиная с Q1 2026.
     """
-    years_diff = time.year - Q1_2026_START.year
-    return years_diff * 4 + get_quarter_number(time)
+    return split_timestamp(to_timestamp(time))[0]
 
-def get_seconds_since_quarter_start(time: datetime) -> int:
+def get_seconds_since_quarter_start(time: TimeLike) -> int:
     """
     Возвращает количество секунд с начала квартала.
     """
-    quarter_number = get_quarter_number(time)
+    return split_timestamp(to_timestamp(time))[1]
 
-    quarter_start = datetime(time.year, (quarter_number - 1) * 3 + 1, 1, 0, 0, 0, tzinfo=timezone.utc)
-    return int((time - quarter_start).total_seconds())
+def get_serial_lower_bound(time: TimeLike) -> int:
+    """
+    Наименьший номер (как целое XXSSSSSSSAAC), который мог быть сгенерирован в момент time или позже.
+    Номера упорядочены по времени генерации, поэтому номера, сгенерированные в [t1, t2),
+    лежат в диапазоне [get_serial_lower_bound(t1), get_serial_lower_bound(t2)).
+    """
+    quarter, seconds = split_timestamp(to_timestamp(time))
+    return quarter * 10 ** 10 + seconds * 1000
 
-def generate_serial_number(time: datetime, adds: int) -> str:
+def decode_timestamps(serials: Sequence[int]) -> Sequence[int]:
+    """
+    Векторизованное восстановление Unix-времени генерации по номерам (целым XXSSSSSSSAAC).
+    С NumPy возвращает массив numpy, без него - список.
+    """
+    if np is None:
+        return [get_quarter_start_timestamp(value // 10 ** 10) + value // 1000 % 10 ** 7 for value in map(int, serials)]
+    values = np.asarray(serials, dtype=np.int64)
+    quarters = values // 10 ** 10
+    seconds = values // 1000 % 10 ** 7
+    inside = (quarters >= 1) & (quarters <= MAX_QUARTER + 1)
+    starts = _QUARTER_STARTS_ARRAY[np.clip(quarters - 1, 0, MAX_QUARTER)]
+    for position in np.flatnonzero(~inside):
+        starts[position] = _quarter_start_timestamp(int(quarters[position]))
+    return starts + seconds
+
+@lru_cache(maxsize=16)
+def _prefix_accumulator(prefix: str) -> LuhnAccumulator:
+    """
+    Частичная сумма Луна для префикса XXSSSSSSS.
+    Все номера одной секунды делят префикс, поэтому он сканируется один раз.
+    """
+    return LuhnAccumulator(prefix)
+
+def generate_serial_number(time: TimeLike, adds: int) -> str:
     """
     Генерирует серийный номер.
     """
-    quarter_number = get_quarter_number_since_q1_2026(time)
-    seconds = get_seconds_since_quarter_start(time)
-    return add_valid_luhn_checksum(f"{quarter_number:02d}{seconds:07d}{adds:02d}")
+    quarter_number, seconds = split_timestamp(to_timestamp(time))
+    prefix = f"{quarter_number:02d}{seconds:07d}"
+    suffix = f"{adds:02d}"
+    return f"{prefix}{suffix}{_prefix_accumulator(prefix).check_digit_for(suffix)}"
+
+def generate_serial_numbers(time: TimeLike, adds_iterable: Iterable[int]) -> Iterator[Tuple[str, str]]:
+    """
+    Лениво генерирует серийные номера для одного момента времени.
+    Возвращает пары (номер, отформатированный номер), совпадающие с
+    generate_serial_number и format_serial_number. Зависящий от времени
+    префикс и его сумма Луна вычисляются один раз на весь пакет.
+    """
+    quarter_number, seconds = split_timestamp(to_timestamp(time))
+    prefix = f"{quarter_number:02d}{seconds:07d}"
+    formatted_prefix = f"{prefix[0:4]}-{prefix[4:8]}-{prefix[8:]}"
+    accumulator = _prefix_accumulator(prefix)
+    for adds in adds_iterable:
+        adds_digits = f"{adds:02d}"
+        suffix = f"{adds_digits}{accumulator.check_digit_for(adds_digits)}"
+        serial = prefix + suffix
+        if len(serial) == 12:
+            yield serial, formatted_prefix + suffix
+        else:
+            yield serial, format_serial_number(serial)
+
+class SerialNumberError(ValueError):
+    """
+    Невалидный серийный номер. В digits - цифры, извлеченные из ввода.
+    """
+    def __init__(self, message: str, digits: str) -> None:
+        super().__init__(message)
+        self.message = message
+        self.digits = digits
+
+class SerialNumberLengthError(SerialNumberError):
+    """
+    Серийный номер содержит не 12 цифр.
+    """
+
+class SerialNumberChecksumError(SerialNumberError):
+    """
+    Контрольная сумма серийного номера не сходится.
+    """
+
+class _DigitTranslation(dict):
+    """
+    Таблица для str.translate: оставляет только десятичные цифры (приводя их к ASCII),
+    остальные символы удаляет. ASCII заполняется заранее, остальные цифры - при первой
+    встрече. Прочие символы не запоминаются, поэтому таблица не больше числа цифр в Unicode.
+    """
+    def __missing__(self, code: int) -> Optional[str]:
+        char = chr(code)
+        if not char.isdecimal():
+            return None
+        value = self[code] = str(unicodedata.decimal(char))
+        return value
+
+_DIGITS_ONLY = _DigitTranslation(dict.fromkeys(range(128)))
+_DIGITS_ONLY.update((_code, chr(_code)) for _code in range(ord("0"), ord("9") + 1))
+
+QUARTER_ROMAN = ("I", "II", "III", "IV")
+
+def get_quarter_date_string(quarter: int) -> str:
+    """
+    Описание квартала с номером quarter (начиная с Q1 2026), например "II квартал 26 года".
+    """
+    year_offset, quarter_index = divmod(quarter - 1, 4)
+    year = Q1_2026_START.year + year_offset
+    return f"{QUARTER_ROMAN[quarter_index]} квартал {year % 100:02d} года"
+
+def extract_digits(user_input: str) -> str:
+    """
+    Извлекает из строки только цифры.
+    """
+    return user_input.translate(_DIGITS_ONLY)
+
+@total_ordering
+class SerialNumber:
+    """
+    Серийный номер, хранящийся как одно целое число XXSSSSSSSAAC (< 10**12, помещается в 64 бита).
+    Составные части и текстовое представление вычисляются по запросу.
+    """
+    __slots__ = ("value", "_digits")
+
+    def __init__(self, value: int) -> None:
+        if not 0 <= value < 10 ** 12:
+            raise ValueError(f"Серийный номер должен содержать 12 цифр: {value}")
+        self.value = value
+        self._digits: Optional[str] = None
+
+    @classmethod
+    def parse(cls, user_input: str) -> "SerialNumber":
+        """
+        Разбирает пользовательский ввод: извлекает цифры, проверяет длину и контрольную сумму.
+        Бросает SerialNumberLengthError или SerialNumberChecksumError.
+        """
+        digits = user_input.translate(_DIGITS_ONLY)
+        if len(digits) != 12:
+            raise SerialNumberLengthError("Серийный номер должен содержать ровно 12 цифр", digits)
+        if not validate_luhn_checksum(digits):
+            raise SerialNumberChecksumError("Проверьте корректность введенного серийного номера, возможна опечатка", digits)
+        serial = cls(int(digits))
+        serial._digits = digits
+        return serial
+
+    @classmethod
+    def from_parts(cls, quarter: int, seconds: int, adds: int) -> "SerialNumber":
+        """
+        Собирает серийный номер из квартала, секунд и добавочных чисел, вычисляя контрольную цифру.
+        """
+        prefix = f"{quarter:02d}{seconds:07d}{adds:02d}"
+        if len(prefix) != 11:
+            raise ValueError(f"Части не помещаются в формат XXSSSSSSSAA: {quarter}, {seconds}, {adds}")
+        return cls(int(prefix) * 10 + LuhnAccumulator(prefix).check_digit)
+
+    @property
+    def quarter(self) -> int:
+        """Номер квартала начиная с Q1 2026."""
+        return self.value // 10 ** 10
+
+    @property
+    def quarter_in_year(self) -> int:
+        """Номер квартала в году (1..4)."""
+        return (self.quarter - 1) % 4 + 1
+
+    @property
+    def year(self) -> int:
+        """Год генерации."""
+        return Q1_2026_START.year + (self.quarter - 1) // 4
+
+    @property
+    def seconds(self) -> int:
+        """Секунды с начала квартала."""
+        return self.value // 1000 % 10 ** 7
+
+    @property
+    def adds(self) -> int:
+        """Добавочные числа."""
+        return self.value // 10 % 100
+
+    @property
+    def check_digit(self) -> int:
+        """Контрольная цифра."""
+        return self.value % 10
+
+    @property
+    def digits(self) -> str:
+        """Номер в виде строки из 12 цифр."""
+        if self._digits is None:
+            self._digits = f"{self.value:012d}"
+        return self._digits
+
+    @property
+    def formatted(self) -> str:
+        """Номер в формате XXXX-XXXX-XXXX."""
+        digits = self.digits
+        return f"{digits[0:4]}-{digits[4:8]}-{digits[8:12]}"
+
+    @property
+    def timestamp(self) -> int:
+        """Unix-время генерации (обратное к generate_serial_number)."""
+        return get_quarter_start_timestamp(self.quarter) + self.seconds
+
+    @property
+    def generated_at(self) -> datetime:
+        """Момент генерации в UTC."""
+        return datetime.fromtimestamp(self.timestamp, timezone.utc)
+
+    @property
+    def date_string(self) -> str:
+        """Квартал и год генерации, например "II квартал 26 года"."""
+        return get_quarter_date_string(self.quarter)
+
+    def __int__(self) -> int:
+        return self.value
+
+    def __str__(self) -> str:
+        return self.digits
+
+    def __repr__(self) -> str:
+        return f"SerialNumber({self.formatted!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, SerialNumber):
+            return self.value == other.value
+        return NotImplemented
+
+    def __lt__(self, other: "SerialNumber") -> bool:
+        if isinstance(other, SerialNumber):
+            return self.value < other.value
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.value)
+
+# Номер в любом из представлений: строка цифр, целое число или SerialNumber
+SerialLike = Union[str, int, SerialNumber]
+
+def serial_value(serial: SerialLike) -> int:
+    """
+    Приводит номер к целому числу XXSSSSSSSAAC.
+    """
+    if isinstance(serial, SerialNumber):
+        return serial.value
+    return int(serial)
+
+def serials_between(serials: Sequence[Union[int, SerialNumber]], start: TimeLike, end: TimeLike) -> Sequence[Union[int, SerialNumber]]:
+    """
+    Номера из отсортированной последовательности, сгенерированные в интервале [start, end).
+    Границы ищутся бинарным поиском, просмотра всей последовательности нет.
+    """
+    low = bisect_left(serials, get_serial_lower_bound(start), key=int)
+    high = bisect_left(serials, get_serial_lower_bound(end), lo=low, key=int)
+    return serials[low:high]
 
-def format_serial_number(serial: str) -> str:
+def format_serial_number(serial: Union[str, SerialNumber]) -> str:
     """
     Форматирует серийный номер в формат XXXX-XXXX-XXXX.
     """
+    if isinstance(serial, SerialNumber):
+        return serial.formatted
     return f"{serial[0:4]}-{serial[4:8]}-{serial[8:12]}"
 
 def parse_serial_number(user_input: str) -> Tuple[bool, str, str]:
@@ -55,26 +384,8 @@ def parse_serial_number(user_input: str) -> Tuple[bool, str, str]:
     Валидирует серийный номер и извлекает информацию о квартале и годе из серийного номера.
     Проверяет что в нем только цифры и что его длина равна 12, а так же что его контрольная сумма валидна.
     """
-    # Извлекаем только цифры
-    serial = ''.join(filter(str.isdigit, user_input))
-
-    if len(serial) != 12:
-        return False, serial, "Серийный номер должен содержать ровно 12 цифр"
-    if not validate_luhn_checksum(serial):
-        return False, serial, "Проверьте корректность введенного серийного номера, возможна опечатка"
-    
-    # Извлекаем информацию о квартале и годе из серийного номера
-    # serial: строка из 12 цифр (без пробелов и дефисов)
-    quarter_roman = {1: "I", 2: "II", 3: "III", 4: "IV"}
     try:
-        quarter_and_year = int(serial[:2])
-        # Квартал с начала 2026, т.е. 01 - Q1'26, 02 - Q2'26, ..., 05 - Q1'27 и т.д.
-        absolute_quarter = quarter_and_year
-        year_offset = (absolute_quarter - 1) // 4
-        quarter_in_year = ((absolute_quarter - 1) % 4) + 1
-        year = 26 + year_offset
-        quarter_str = quarter_roman[quarter_in_year]
-        date_string = f"{quarter_str} квартал {year:02d} года"
-        return True, serial, date_string
-    except Exception:
-        return True, serial, "Не удалось определить дату из серийного номера"
+        serial = SerialNumber.parse(user_input)
+    except SerialNumberError as error:
+        return False, error.digits, error.message
+    return True, serial.digits, serial.date_string
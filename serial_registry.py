@@ -0,0 +1,189 @@
+"""
+Модуль для реестра выпущенных серийных номеров на SQLite.
+
+Запись идет через очередь с отложенной записью: обработчики бота только кладут
+номера в очередь и не ждут диска, а отдельный поток пачками вставляет их в базу
+и фиксирует транзакцию. База открывается в режиме WAL, поэтому чтение не
+блокируется записью.
+"""
+import asyncio
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from serial_number import SerialLike, TimeLike, get_serial_lower_bound, serial_value
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS issued_serials (
+    serial INTEGER PRIMARY KEY,
+    issued_at INTEGER NOT NULL,
+    chat_id INTEGER,
+    user_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS issued_serials_issued_at ON issued_serials (issued_at);
+"""
+
+_INSERT = "INSERT OR IGNORE INTO issued_serials (serial, issued_at, chat_id, user_id) VALUES (?, ?, ?, ?)"
+_SELECT = "SELECT serial, issued_at, chat_id, user_id FROM issued_serials WHERE serial = ?"
+_SELECT_RANGE = ("SELECT serial, issued_at, chat_id, user_id FROM issued_serials "
+                 "WHERE serial >= ? AND serial < ? ORDER BY serial")
+
+# Признак остановки потока записи
+_STOP = None
+
+
+class IssuedSerial(NamedTuple):
+    """
+    Запись о выпущенном номере.
+    """
+    serial: int
+    issued_at: int
+    chat_id: Optional[int]
+    user_id: Optional[int]
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    """
+    Открывает соединение с базой в режиме WAL.
+    """
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class SerialRegistry:
+    """
+    Реестр выпущенных номеров с пакетной отложенной записью.
+    """
+
+    def __init__(self, path: str, batch_size: int = 500, flush_interval: float = 0.5) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        with _connect(path) as connection:
+            connection.executescript(_SCHEMA)
+        connection.close()
+        self._queue: "queue.Queue[Optional[IssuedSerial]]" = queue.Queue()
+        # Номера в очереди на запись: lookup находит их сразу после выдачи, не дожидаясь записи
+        self._pending: Dict[int, IssuedSerial] = {}
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._writer = threading.Thread(target=self._write_loop, name="serial-registry-writer", daemon=True)
+        self._writer.start()
+
+    def record(self, serials: Iterable[SerialLike], issued_at: int,
+               chat_id: Optional[int] = None, user_id: Optional[int] = None) -> None:
+        """
+        Ставит номера в очередь на запись. Не блокируется на диске.
+        """
+        for serial in serials:
+            issued = IssuedSerial(serial_value(serial), issued_at, chat_id, user_id)
+            self._pending.setdefault(issued.serial, issued)
+            self._queue.put_nowait(issued)
+
+    def lookup(self, serial: SerialLike) -> Optional[IssuedSerial]:
+        """
+        Ищет номер среди ожидающих записи, затем в реестре по первичному ключу.
+        Поток записи убирает номер из ожидающих только после фиксации транзакции,
+        поэтому номер, записанный между этими двумя проверками, все равно находится.
+        """
+        value = serial_value(serial)
+        pending = self._pending.get(value)
+        if pending is not None:
+            return pending
+        row = self._reader().execute(_SELECT, (value,)).fetchone()
+        return IssuedSerial(*row) if row else None
+
+    def issued_between(self, start: TimeLike, end: TimeLike) -> List[IssuedSerial]:
+        """
+        Номера, сгенерированные в интервале [start, end), по возрастанию.
+        Ищутся только уже записанные номера (см. flush).
+        Время генерации закодировано в номере, а номера упорядочены по времени, поэтому
+        интервал превращается в диапазон первичного ключа и ищется по B-дереву без просмотра таблицы.
+        """
+        bounds = (get_serial_lower_bound(start), get_serial_lower_bound(end))
+        return [IssuedSerial(*row) for row in self._reader().execute(_SELECT_RANGE, bounds)]
+
+    async def lookup_async(self, serial: SerialLike) -> Optional[IssuedSerial]:
+        """
+        Асинхронная версия lookup: запрос выполняется в отдельном потоке.
+        """
+        return await asyncio.to_thread(self.lookup, serial)
+
+    def flush(self) -> None:
+        """
+        Ждет, пока все поставленные в очередь номера будут записаны.
+        """
+        self._queue.join()
+
+    def close(self) -> None:
+        """
+        Дописывает очередь и останавливает поток записи.
+        """
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        with self._readers_lock:
+            for connection in self._readers:
+                connection.close()
+            self._readers.clear()
+
+    def _reader(self) -> sqlite3.Connection:
+        """
+        Соединение для чтения, свое для каждого потока.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = _connect(self.path)
+            with self._readers_lock:
+                self._readers.append(connection)
+        return connection
+
+    def _write_loop(self) -> None:
+        """
+        Поток записи: собирает номера из очереди в пачки и записывает каждую пачку одной транзакцией.
+        Пачка закрывается, когда набрано batch_size номеров или прошло flush_interval секунд.
+        Неудачная пачка (диск заполнен, база заблокирована или повреждена) пишется в лог
+        и отбрасывается, а поток продолжает работу, чтобы flush и close не зависали.
+        """
+        connection = _connect(self.path)
+        try:
+            stopping = False
+            while not stopping:
+                item = self._queue.get()
+                taken = 1
+                batch: List[IssuedSerial] = []
+                deadline = time.monotonic() + self.flush_interval
+                while True:
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+                    timeout = deadline - time.monotonic()
+                    if len(batch) >= self.batch_size or timeout <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=timeout)
+                    except queue.Empty:
+                        break
+                    taken += 1
+                try:
+                    if batch:
+                        with connection:
+                            connection.executemany(_INSERT, batch)
+                except Exception:
+                    logger.exception("Не удалось записать в реестр %d номеров", len(batch))
+                finally:
+                    for issued in batch:
+                        self._pending.pop(issued.serial, None)
+                    for _ in range(taken):
+                        self._queue.task_done()
+        finally:
+            connection.close()
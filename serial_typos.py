@@ -0,0 +1,122 @@
+"""
+Модуль для подсказок при опечатке в серийном номере.
+
+Если контрольная сумма не сходится, перебираются замены одной цифры и
+перестановки соседних цифр. Перебор не проверяет каждый вариант заново:
+вклад цифры в сумму Луна зависит только от самой цифры и четности позиции,
+поэтому по заранее рассчитанным таблицам сразу известно, какая цифра в
+каждой позиции исправляет сумму (ровно одна) и какие перестановки ее сохраняют.
+Из примерно 120 вариантов получается не больше 23 кандидатов, которые затем
+ранжируются по правдоподобию (квартал и секунды не в будущем) и по тому,
+выпускал ли бот такой номер.
+"""
+import time as _time
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+from serial_number import SerialNumber, TimeLike, get_quarter_start_timestamp, split_timestamp, to_timestamp
+
+SERIAL_LENGTH = 12
+
+# Вклад цифры в сумму Луна: в обычной и в удваиваемой позиции
+_TERMS = (tuple(range(10)), (0, 2, 4, 6, 8, 1, 3, 5, 7, 9))
+
+
+def _build_substitutions() -> Tuple[Tuple[Tuple[int, ...], ...], ...]:
+    """
+    Таблица [удваивается][цифра][остаток суммы] -> цифра, после замены на которую сумма делится на 10.
+    Вклад - биекция цифр по модулю 10, поэтому такая цифра ровно одна.
+    """
+    table = []
+    for terms in _TERMS:
+        inverse = {term % 10: digit for digit, term in enumerate(terms)}
+        table.append(tuple(
+            tuple(inverse[(terms[digit] - residue) % 10] for residue in range(10)) for digit in range(10)
+        ))
+    return tuple(table)
+
+
+def _build_transpositions() -> Tuple[Tuple[Tuple[int, ...], ...], ...]:
+    """
+    Таблица [удваивается левая позиция][a][b] -> изменение суммы (по модулю 10)
+    при перестановке соседних цифр ab -> ba.
+    """
+    table = []
+    for first in (0, 1):
+        left, right = _TERMS[first], _TERMS[1 - first]
+        table.append(tuple(
+            tuple((left[b] + right[a] - left[a] - right[b]) % 10 for b in range(10)) for a in range(10)
+        ))
+    return tuple(table)
+
+
+_SUBSTITUTIONS = _build_substitutions()
+_TRANSPOSITIONS = _build_transpositions()
+
+# В 12-значном номере с контрольной цифрой в конце удваиваются позиции 0, 2, 4, ... слева
+_DOUBLED_POSITIONS = tuple(int(position % 2 == 0) for position in range(SERIAL_LENGTH))
+
+
+class TypoSuggestion(NamedTuple):
+    """
+    Вариант исправления: номер, вид опечатки ("замена" или "перестановка"),
+    позиция (с 0, для перестановки - левая из двух цифр), правдоподобие и выпуск ботом.
+    """
+    serial: SerialNumber
+    kind: str
+    position: int
+    plausible: bool
+    issued: bool
+
+
+def typo_candidates(digits: str) -> List[Tuple[str, str, int]]:
+    """
+    Все номера с верной контрольной суммой, отличающиеся от digits заменой одной цифры
+    или перестановкой соседних. Возвращает тройки (цифры, вид опечатки, позиция).
+    Для номера с верной суммой или не из 12 цифр кандидатов нет.
+    """
+    if len(digits) != SERIAL_LENGTH or not digits.isdigit():
+        return []
+    values = [ord(char) - 48 for char in digits]
+    residue = sum(_TERMS[doubled][value] for doubled, value in zip(_DOUBLED_POSITIONS, values)) % 10
+    if residue == 0:
+        return []
+    candidates: List[Tuple[str, str, int]] = []
+    for position, (doubled, value) in enumerate(zip(_DOUBLED_POSITIONS, values)):
+        replacement = _SUBSTITUTIONS[doubled][value][residue]
+        candidates.append((f"{digits[:position]}{replacement}{digits[position + 1:]}", "замена", position))
+    for position in range(SERIAL_LENGTH - 1):
+        a, b = values[position], values[position + 1]
+        if a != b and (residue + _TRANSPOSITIONS[_DOUBLED_POSITIONS[position]][a][b]) % 10 == 0:
+            swapped = f"{digits[:position]}{b}{a}{digits[position + 2:]}"
+            candidates.append((swapped, "перестановка", position))
+    return candidates
+
+
+def is_plausible(serial: SerialNumber, now: TimeLike) -> bool:
+    """
+    Может ли номер быть сгенерирован к моменту now: квартал не раньше Q1 2026,
+    секунды не выходят за пределы квартала, время генерации не в будущем.
+    """
+    quarter = serial.quarter
+    if quarter < 1 or quarter > split_timestamp(to_timestamp(now))[0]:
+        return False
+    if serial.seconds >= get_quarter_start_timestamp(quarter + 1) - get_quarter_start_timestamp(quarter):
+        return False
+    return serial.timestamp <= to_timestamp(now)
+
+
+def suggest_corrections(digits: str, now: Optional[TimeLike] = None,
+                        is_issued: Optional[Callable[[SerialNumber], bool]] = None) -> List[TypoSuggestion]:
+    """
+    Варианты исправления опечатки, лучшие первыми: выпущенные ботом, затем правдоподобные,
+    затем остальные. Выпуск проверяется только для правдоподобных номеров.
+    """
+    now = int(_time.time()) if now is None else now
+    suggestions = []
+    for candidate, kind, position in typo_candidates(digits):
+        serial = SerialNumber(int(candidate))
+        plausible = is_plausible(serial, now)
+        issued = plausible and is_issued is not None and is_issued(serial)
+        suggestions.append(TypoSuggestion(serial, kind, position, plausible, issued))
+    suggestions.sort(key=lambda suggestion: (not suggestion.issued, not suggestion.plausible))
+    return suggestions
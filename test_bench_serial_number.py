@@ -0,0 +1,62 @@
+"""
+Модульные тесты для микробенчмарков.
+"""
+import json
+
+from bench_serial_number import build_benchmarks, compare, main, render
+
+
+class TestBuildBenchmarks:
+    """Тесты для функции build_benchmarks."""
+    
+    def test_all_run(self):
+        """Тест того, что каждый бенчмарк выполняется на маленькой пачке."""
+        benchmarks = build_benchmarks(batch_size=150)
+        for name, (items, function) in benchmarks.items():
+            assert items in (1, 99, 150), name
+            function()
+    
+    def test_batch_results_match(self):
+        """Тест того, что пакетные бенчмарки работают с валидными номерами."""
+        benchmarks = build_benchmarks(batch_size=150)
+        mask, _ = benchmarks["luhn.check_batch"][1]()
+        assert all(mask)
+        assert all(is_valid for is_valid, _, _ in benchmarks["serial.parse[batch]"][1]())
+
+
+class TestCompare:
+    """Тесты для функции compare."""
+    
+    def test_threshold(self):
+        """Тест того, что замедлением считается только превышение порога."""
+        baseline = {"a": {"n": 1, "ns": 100.0}, "b": {"n": 1, "ns": 100.0}}
+        results = {"a": {"n": 1, "ns": 125.0}, "b": {"n": 1, "ns": 126.0}}
+        assert compare(results, baseline, threshold=1.25) == [("b", 1.26)]
+    
+    def test_new_benchmark_ignored(self):
+        """Тест того, что бенчмарки без базовой линии не сравниваются."""
+        assert compare({"new": {"n": 1, "ns": 1e9}}, {}) == []
+    
+    def test_render_marks_regression(self):
+        """Тест пометки замедления в таблице."""
+        table = render({"a": {"n": 1, "ns": 300.0}, "new": {"n": 1, "ns": 1.0}}, {"a": {"n": 1, "ns": 100.0}})
+        assert "ЗАМЕДЛЕНИЕ" in table.splitlines()[1]
+        assert "ЗАМЕДЛЕНИЕ" not in table.splitlines()[2]
+
+
+class TestMain:
+    """Тесты для командной строки бенчмарков."""
+    
+    def test_save_and_compare(self, tmp_path, capsys):
+        """Тест сохранения базовой линии и сравнения с ней."""
+        path = tmp_path / "baseline.json"
+        assert main(["--filter", "quarter.start_timestamp", "--repeat", "1", "--save", str(path)]) == 0
+        saved = json.loads(path.read_text(encoding="utf-8"))
+        assert list(saved["results"]) == ["quarter.start_timestamp"]
+        assert saved["environment"]["python"]
+        
+        # Базовая линия в тысячу раз быстрее реальной - сравнение должно провалиться
+        saved["results"]["quarter.start_timestamp"]["ns"] /= 1000
+        path.write_text(json.dumps(saved), encoding="utf-8")
+        assert main(["--filter", "quarter.start_timestamp", "--repeat", "1", "--compare", str(path)]) == 1
+        assert "quarter.start_timestamp" in capsys.readouterr().err
@@ -0,0 +1,193 @@
+"""
+Модульные тесты для обработчиков бота.
+"""
+import asyncio
+import os
+import subprocess
+import sys
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from telegram import Chat, Message, Update
+
+from fake_bot_api import FAKE_TOKEN
+
+# bot.py требует токен при импорте; настоящий токен для тестов не нужен
+os.environ.setdefault("BOT_TOKEN", FAKE_TOKEN)
+
+import bot  # noqa: E402
+from bot_metrics import SERIALS_ISSUED  # noqa: E402
+from send_queue import SendQueue  # noqa: E402
+from serial_bitmap import SerialBitmap  # noqa: E402
+from serial_registry import SerialRegistry  # noqa: E402
+
+
+class FakeMessage:
+    """Сообщение, которое запоминает ответы вместо отправки."""
+
+    def __init__(self):
+        self.replies = []
+
+    async def reply_text(self, text, **kwargs):
+        self.replies.append(("text", text))
+
+    async def reply_document(self, **kwargs):
+        self.replies.append(("document", kwargs["filename"]))
+
+
+class FakeUpdate:
+    """Обновление с сообщением, без чата и пользователя."""
+
+    def __init__(self):
+        self.message = FakeMessage()
+        self.effective_chat = None
+        self.effective_user = None
+
+
+class FakeContext:
+    """Контекст с аргументами команды."""
+
+    def __init__(self, args):
+        self.args = args
+
+
+@pytest.fixture(autouse=True)
+def bare_bot(monkeypatch):
+    """Бот без очереди исходящих сообщений и источников выпущенных номеров."""
+    for name in ("send_queue", "registry", "bitmap", "bloom"):
+        monkeypatch.setattr(bot, name, None)
+    monkeypatch.setattr(bot, "TYPO_SUGGESTIONS", 0)
+
+
+def _check(text):
+    update = FakeUpdate()
+    asyncio.run(bot.check_command(update, FakeContext(text.split())))
+    return update.message.replies
+
+
+class TestCheckCommand:
+    """Тесты выбора между проверкой одного номера и массовой проверкой в /c."""
+
+    def test_single_serial(self):
+        """Тест проверки одного номера."""
+        replies = _check("0100-0010-0429")
+        assert len(replies) == 1 and "I квартал 26 года" in replies[0][1]
+
+    @pytest.mark.parametrize("text", ["0123 4567 89123", "1234 5678 9012 3456", "010000100429 0123"])
+    def test_serial_with_spaces_is_single(self, text):
+        """Тест того, что номер с пробелами и лишними цифрами проверяется как один номер."""
+        replies = _check(text)
+        assert len(replies) == 1 and "ровно 12 цифр" in replies[0][1]
+
+    def test_several_serials_are_bulk(self):
+        """Тест массовой проверки нескольких полных номеров."""
+        replies = _check("0100 0010 0429 0100 0010 0420")
+        assert [kind for kind, _ in replies] == ["text", "document"]
+        assert "Проверено номеров: 2" in replies[0][1]
+
+    
+    def test_bulk_reports_registry_issuance(self, monkeypatch, tmp_path):
+        """Тест того, что массовая проверка сообщает о выпуске по реестру, а не только по битовой карте."""
+        registry = SerialRegistry(str(tmp_path / "issued.sqlite3"))
+        registry.record(["010000100429"], issued_at=1)
+        registry.flush()
+        monkeypatch.setattr(bot, "registry", registry)
+        try:
+            update = FakeUpdate()
+            documents = []
+            
+            async def reply_document(**kwargs):
+                documents.append(kwargs["document"].decode("utf-8"))
+            
+            update.message.reply_document = reply_document
+            asyncio.run(bot.check_command(update, FakeContext(["0100-0010-0429", "0100-0010-0420"])))
+        finally:
+            registry.close()
+        rows = documents[0].splitlines()
+        assert rows[0].endswith(",issued")
+        assert rows[1].endswith(",true") and rows[2].endswith(",")
+
+
+class TestReplyQueue:
+    """Тесты ответов через очередь исходящих сообщений."""
+
+    def _generate(self, monkeypatch, chat_type, **message_fields):
+        sent = []
+
+        async def send(chat_id, text, **kwargs):
+            sent.append((chat_id, text, kwargs))
+
+        async def main():
+            queue = SendQueue(send, chat_rate=100, chat_burst=10)
+            monkeypatch.setattr(bot, "send_queue", queue)
+            message = Message(7, datetime.now(timezone.utc), Chat(-100, chat_type), text="/g 3", **message_fields)
+            await bot.generate_command(Update(1, message=message), FakeContext(["3"]))
+            queue.start()
+            await queue.stop()
+
+        monkeypatch.setattr(bot, "GENERATE_REPLY_MODE", "per_message")
+        asyncio.run(main())
+        return sent
+
+    def test_forum_topic(self, monkeypatch):
+        """Тест того, что в теме форума ответы цитируют команду, остаются в теме и не склеиваются."""
+        sent = self._generate(monkeypatch, Chat.SUPERGROUP, message_thread_id=3, is_topic_message=True)
+        assert len(sent) == 3
+        assert all(kwargs == {"parse_mode": "Markdown", "reply_to_message_id": 7, "message_thread_id": 3}
+                   for _, _, kwargs in sent)
+
+    def test_private_chat(self, monkeypatch):
+        """Тест того, что в личном чате ответ не цитирует команду."""
+        sent = self._generate(monkeypatch, Chat.PRIVATE)
+        assert len(sent) == 3 and sent[0][2] == {"parse_mode": "Markdown"}
+
+
+class TestInline:
+    """Тесты инлайн-режима: выпущенными считаются только выбранные номера."""
+
+    def test_preview_not_issued(self, monkeypatch, tmp_path):
+        """Тест того, что предложения не отмечаются выпущенными, а выбранный результат - отмечается."""
+        answers = []
+
+        async def answer(results, **kwargs):
+            answers.append(results)
+
+        bitmap = SerialBitmap(str(tmp_path))
+        monkeypatch.setattr(bot, "bitmap", bitmap)
+        monkeypatch.setattr(bot, "inline_cache", bot.LRUCache(16))
+        user = SimpleNamespace(id=5)
+        before = SERIALS_ISSUED.value("inline")
+        try:
+            query = SimpleNamespace(query="3", from_user=user, answer=answer)
+            asyncio.run(bot.inline_query(SimpleNamespace(inline_query=query), None))
+            serials = [result.id for result in answers[0][1:]]
+            assert len(serials) == 3 and not any(bitmap.contains(serial) for serial in serials)
+            assert SERIALS_ISSUED.value("inline") == before
+
+            chosen = SimpleNamespace(result_id=answers[0][2].id, from_user=user)
+            asyncio.run(bot.chosen_inline_result(SimpleNamespace(chosen_inline_result=chosen), None))
+            assert [bitmap.contains(serial) for serial in serials] == [False, True, False]
+            chosen = SimpleNamespace(result_id=answers[0][0].id, from_user=user)
+            asyncio.run(bot.chosen_inline_result(SimpleNamespace(chosen_inline_result=chosen), None))
+            assert all(bitmap.contains(serial) for serial in serials)
+            assert SERIALS_ISSUED.value("inline") == before + 4
+        finally:
+            bitmap.close()
+
+
+class TestSettings:
+    """Тесты проверки настроек при запуске."""
+
+    @pytest.mark.parametrize("settings, message", [
+        ({"BOT_MODE": "webhok"}, "BOT_MODE"),
+        ({"BOT_MODE": "webhook", "WEBHOOK_SECRET": ""}, "WEBHOOK_SECRET"),
+        ({"GENERATE_REPLY_MODE": "permessage"}, "GENERATE_REPLY_MODE"),
+    ])
+    def test_invalid_settings(self, settings, message):
+        """Тест того, что бот не запускается с неверными настройками."""
+        env = {**os.environ, "BOT_TOKEN": FAKE_TOKEN, **settings}
+        result = subprocess.run([sys.executable, "-c", "import bot"], env=env, capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        assert result.returncode != 0
+        assert f"ValueError: {message}" in result.stderr
@@ -0,0 +1,73 @@
+"""
+Модульные тесты для метрик бота.
+"""
+import asyncio
+
+import pytest
+
+from bot_metrics import (
+    BOT_API_DURATION, BOT_API_ERRORS, HANDLER_DURATION, HANDLER_ERRORS, HANDLER_REQUESTS, VALIDATIONS,
+    InstrumentedRequest, instrument_handler, record_bulk_check, record_validation,
+)
+from bulk_check import BulkCheckSummary
+from fake_bot_api import FakeBotApi, LoadProfile
+from metrics import REGISTRY
+
+
+class TestBotMetrics:
+    """Тесты для метрик обработчиков, проверок и вызовов Bot API."""
+
+    def test_instrument_handler(self):
+        """Тест учета вызовов, времени и исключений обработчика."""
+        @instrument_handler("test_ok")
+        async def ok(update, context):
+            return "ok"
+
+        @instrument_handler("test_fail")
+        async def fail(update, context):
+            raise KeyError("x")
+
+        assert asyncio.run(ok(None, None)) == "ok"
+        with pytest.raises(KeyError):
+            asyncio.run(fail(None, None))
+        assert ok.__name__ == "ok"
+        assert HANDLER_REQUESTS.value("test_ok") == 1 and HANDLER_DURATION.count("test_ok") == 1
+        assert HANDLER_ERRORS.value("test_ok", "KeyError") == 0
+        assert HANDLER_ERRORS.value("test_fail", "KeyError") == 1
+        assert 'serial_bot_handler_duration_seconds_count{handler="test_fail"} 1' in REGISTRY.render()
+
+    def test_validations(self):
+        """Тест учета результатов проверки номеров."""
+        before = {outcome: VALIDATIONS.value(outcome) for outcome in ("valid", "bad_length", "bad_checksum")}
+        record_validation(True, "010000100429")
+        record_validation(False, "0100")
+        record_validation(False, "010000100420")
+        summary = BulkCheckSummary()
+        summary.total, summary.valid, summary.bad_length, summary.bad_checksum = 6, 3, 1, 2
+        record_bulk_check(summary)
+        assert VALIDATIONS.value("valid") - before["valid"] == 4
+        assert VALIDATIONS.value("bad_length") - before["bad_length"] == 2
+        assert VALIDATIONS.value("bad_checksum") - before["bad_checksum"] == 3
+
+    def test_instrumented_request(self):
+        """Тест замера вызовов Bot API и учета HTTP-ошибок."""
+        async def main():
+            api = FakeBotApi(LoadProfile())
+            await api.start()
+            request = InstrumentedRequest()
+            try:
+                await request.initialize()
+                base = f"{api.base_url}{api.token}"
+                results = [await request.do_request(f"{base}/getMe", "POST"),
+                           await request.do_request(f"{base}/unknownMethod", "POST")]
+                await request.shutdown()
+            finally:
+                await api.stop()
+            return results
+
+        errors = BOT_API_ERRORS.value("unknownMethod", "http_404")
+        (status, _), (missing, _) = asyncio.run(main())
+        assert status == 200 and missing == 404
+        assert BOT_API_DURATION.count("getMe") >= 1
+        assert BOT_API_ERRORS.value("getMe", "http_200") == 0
+        assert BOT_API_ERRORS.value("unknownMethod", "http_404") == errors + 1
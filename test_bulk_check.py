@@ -0,0 +1,69 @@
+"""
+Модульные тесты для массовой проверки серийных номеров.
+"""
+import io
+
+from bulk_check import check_lines, split_serials
+from serial_number import SerialNumber
+
+VALID = SerialNumber.from_parts(2, 1234567, 42)
+OTHER = SerialNumber.from_parts(5, 7654321, 7)
+TYPO = VALID.digits[:-1] + str((VALID.check_digit + 1) % 10)
+
+
+class TestSplitSerials:
+    """Тесты для функции split_serials."""
+    
+    def test_single_serial_with_spaces(self):
+        """Тест номера, введенного группами через пробел."""
+        assert split_serials("0123 4567 8912") == ["0123 4567 8912"]
+    
+    def test_several_serials(self):
+        """Тест нескольких номеров в одной строке."""
+        line = f"{VALID.formatted} {OTHER.digits}  {VALID.digits[:4]} {VALID.digits[4:]}"
+        assert split_serials(line) == [VALID.formatted, OTHER.digits, f"{VALID.digits[:4]} {VALID.digits[4:]}"]
+    
+    def test_short_fragment_is_reported(self):
+        """Тест того, что номер с пропущенной цифрой не теряется."""
+        assert split_serials(f"{VALID.formatted} 0123 4567 891") == [VALID.formatted, "0123 4567 891"]
+    
+    def test_csv_noise_cells_are_ignored(self):
+        """Тест того, что в CSV посторонние числа рядом с номером не считаются номерами."""
+        assert split_serials(f"5,{VALID.formatted},2026-10-17") == [VALID.formatted]
+        assert split_serials("id,serial,date") == []
+    
+    def test_no_digits(self):
+        """Тест строки без цифр."""
+        assert split_serials("серийные номера:") == []
+
+
+class TestCheckLines:
+    """Тесты для функции check_lines."""
+    
+    def test_summary_and_output(self):
+        """Тест сводки и построчного CSV с результатами."""
+        lines = ["serial", VALID.formatted, f"{OTHER.digits}, {TYPO}", "12345"]
+        output = io.StringIO()
+        summary = check_lines(lines, output)
+        assert (summary.total, summary.valid, summary.bad_checksum, summary.bad_length) == (4, 2, 1, 1)
+        assert summary.by_quarter == {2: 1, 5: 1}
+        rows = output.getvalue().splitlines()
+        assert rows[0] == "line,input,serial,valid,message"
+        assert rows[1] == f"2,{VALID.formatted},{VALID.digits},true,II квартал 26 года"
+        assert len(rows) == 5
+        text = summary.render()
+        assert "Проверено номеров: 4" in text
+        assert "I квартал 27 года: 1" in text
+    
+    def test_issued_column(self):
+        """Тест колонки о выпуске номера ботом."""
+        output = io.StringIO()
+        summary = check_lines([VALID.digits, OTHER.digits], output, is_issued=lambda serial: serial == VALID)
+        assert summary.issued == 1
+        assert output.getvalue().splitlines()[1].endswith(",true")
+    
+    def test_streaming(self):
+        """Тест того, что строки читаются лениво из генератора."""
+        lines = (OTHER.digits for _ in range(10_000))
+        summary = check_lines(lines)
+        assert summary.valid == 10_000
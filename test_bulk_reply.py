@@ -0,0 +1,43 @@
+"""
+Модульные тесты для упаковки массовых ответов.
+"""
+from bulk_reply import pack_lines, serials_csv, MESSAGE_LIMIT
+
+
+class TestPackLines:
+    """Тесты для функции pack_lines."""
+    
+    def test_single_message(self):
+        """Тест того, что 99 номеров помещаются в одно сообщение."""
+        lines = ["`0123-4567-8912`"] * 99
+        messages = pack_lines(lines)
+        assert len(messages) == 1
+        assert messages[0].split("\n") == lines
+    
+    def test_split_on_limit(self):
+        """Тест разбиения по лимиту длины сообщения."""
+        lines = ["x" * 10] * 10
+        messages = pack_lines(lines, limit=32)
+        # В сообщение помещаются 3 строки: 10 + 1 + 10 + 1 + 10 = 32
+        assert [len(m) for m in messages] == [32, 32, 32, 10]
+        assert "\n".join(messages).split("\n") == lines
+    
+    def test_no_message_exceeds_limit(self):
+        """Тест того, что ни одно сообщение не превышает лимит Telegram."""
+        lines = [f"`{i:04d}-0000-0000`" for i in range(1000)]
+        messages = pack_lines(lines)
+        assert all(len(m) <= MESSAGE_LIMIT for m in messages)
+        assert sum(len(m.split("\n")) for m in messages) == 1000
+    
+    def test_empty(self):
+        """Тест пустого ввода."""
+        assert pack_lines([]) == []
+
+
+class TestSerialsCsv:
+    """Тесты для функции serials_csv."""
+    
+    def test_content(self):
+        """Тест содержимого CSV-файла."""
+        data = serials_csv([("012345678912", "0123-4567-8912")])
+        assert data.decode("utf-8") == "serial,formatted\n012345678912,0123-4567-8912\n"
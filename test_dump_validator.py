@@ -0,0 +1,68 @@
+"""
+Модульные тесты для проверки больших выгрузок серийных номеров.
+"""
+import pytest
+
+from dump_validator import main, split_chunks, validate_dump
+from serial_number import SerialNumber
+
+VALID = [SerialNumber.from_parts(quarter, seconds, 7) for quarter in (2, 3) for seconds in range(0, 300, 3)]
+
+
+def _write_dump(tmp_path):
+    """
+    Выгрузка с номерами в разных форматах и тремя невалидными строками.
+    Возвращает путь к файлу и смещения невалидных строк.
+    """
+    lines = []
+    for index, serial in enumerate(VALID):
+        lines.append((serial.digits, serial.formatted, serial.formatted + "\r", f" {serial.digits} ")[index % 4])
+    lines[10:10] = ["0100-1234-5428", "", "1234", "0100-1234-542x"]
+    text = "\n".join(lines) + "\n"
+    offsets = [len("\n".join(lines[:index])) + 1 for index in (10, 12, 13)]
+    path = tmp_path / "dump.txt"
+    path.write_bytes(text.encode("ascii"))
+    return str(path), offsets
+
+
+class TestValidateDump:
+    """Тесты для функции validate_dump."""
+    
+    @pytest.mark.parametrize("workers, chunk_size, use_numpy", [
+        (1, 1 << 20, True),
+        (1, 100, True),
+        (1, 100, False),
+        (2, 500, True),
+    ])
+    def test_counts_and_offsets(self, tmp_path, workers, chunk_size, use_numpy):
+        """Тест подсчета по кварталам и смещений невалидных строк при любом делении на куски."""
+        path, offsets = _write_dump(tmp_path)
+        report = validate_dump(path, workers, chunk_size, use_numpy)
+        assert report.total == len(VALID) + 3
+        assert report.valid == len(VALID)
+        assert (report.bad_checksum, report.bad_length) == (1, 2)
+        assert dict(report.by_quarter) == {2: 100, 3: 100}
+        assert report.invalid_offsets == offsets
+    
+    def test_split_chunks(self, tmp_path):
+        """Тест того, что куски покрывают файл и заканчиваются на границе строки."""
+        path, _ = _write_dump(tmp_path)
+        data = open(path, "rb").read()
+        chunks = split_chunks(path, 64)
+        assert chunks[0][0] == 0 and chunks[-1][1] == len(data)
+        assert all(end == next_start for (_, end), (next_start, _) in zip(chunks, chunks[1:]))
+        assert all(data[end - 1:end] == b"\n" for _, end in chunks)
+    
+    def test_empty_file(self, tmp_path):
+        """Тест пустого файла."""
+        path = tmp_path / "empty.txt"
+        path.write_bytes(b"")
+        assert validate_dump(str(path)).total == 0
+    
+    def test_list_invalid(self, tmp_path, capsys):
+        """Тест вывода невалидных строк с их смещениями."""
+        path, offsets = _write_dump(tmp_path)
+        main([path, "--workers", "1", "--list-invalid"])
+        assert capsys.readouterr().out.splitlines() == [
+            f"{offsets[0]}\t0100-1234-5428", f"{offsets[1]}\t1234", f"{offsets[2]}\t0100-1234-542x",
+        ]
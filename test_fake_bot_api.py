@@ -0,0 +1,96 @@
+"""
+Модульные тесты для поддельного Bot API и нагрузочного теста.
+"""
+import asyncio
+
+import pytest
+from telegram.ext import Application, CommandHandler
+
+from fake_bot_api import FakeBotApi, LoadProfile, LoadReport, parse_mix, percentile
+
+
+class TestHelpers:
+    """Тесты для вспомогательных функций."""
+
+    def test_parse_mix(self):
+        """Тест разбора смеси команд."""
+        assert parse_mix("g=5,/c=2.5,start") == {"g": 5.0, "c": 2.5, "start": 1.0}
+
+    def test_parse_mix_errors(self):
+        """Тест ошибок в смеси команд."""
+        for text in ("x=1", "g=-1", "g=0,c=0"):
+            with pytest.raises(ValueError):
+                parse_mix(text)
+
+    def test_percentile(self):
+        """Тест перцентилей по ближайшему рангу."""
+        values = list(range(1, 101))
+        assert percentile(values, 0.50) == 50
+        assert percentile(values, 0.95) == 95
+        assert percentile(values, 0.99) == 99
+        assert percentile([7], 0.99) == 7
+        assert percentile([], 0.5) == 0.0
+
+    def test_report(self):
+        """Тест итогов нагрузки."""
+        report = LoadReport(10, 8, 8, 0, [0.3, 0.1, 0.2] + [0.1] * 5, 2.0, {"g": 10})
+        data = report.to_dict()
+        assert report.unanswered == 2 and data["error_rate"] == 0.2
+        assert data["throughput"] == 4.0
+        assert data["max_ms"] == pytest.approx(300.0)
+        assert "без ответа: 2" in report.render()
+
+
+class TestFakeBotApi:
+    """Тесты поддельного Bot API с настоящим приложением python-telegram-bot."""
+
+    def test_echo_bot(self):
+        """Тест полного цикла: getUpdates -> обработчик -> sendMessage и замер задержек."""
+        async def reply(update, context):
+            await update.message.reply_text(update.message.text)
+
+        async def main():
+            api = FakeBotApi(LoadProfile(rate=100, duration=0.3, mix={"g": 1, "c": 1, "start": 1}, seed=1))
+            await api.start()
+            application = Application.builder().token(api.token).base_url(api.base_url).build()
+            application.add_handler(CommandHandler(["g", "c", "start"], reply))
+            try:
+                await application.initialize()
+                await application.start()
+                await application.updater.start_polling(poll_interval=0, timeout=1)
+                await api.polled.wait()
+                await api.run_load()
+                await api.wait_replies(5)
+                await application.updater.stop()
+                await application.stop()
+                await application.shutdown()
+            finally:
+                await api.stop()
+            return api.report()
+
+        report = asyncio.run(main())
+        assert report.commands == 30
+        assert report.answered == 30 and report.messages == 30
+        assert sum(report.by_command.values()) == 30
+        assert 0 < report.latencies[0] <= report.latencies[-1] < 5
+
+    def test_shared_chats(self):
+        """Тест того, что ответы закрывают команды своего чата по порядку."""
+        async def main():
+            api = FakeBotApi(LoadProfile(chats=1))
+            api.add_command("/start", 1)
+            api.add_command("/start", 1)
+            api._reply_to(1)
+            return api.answered, len(api._pending[1])
+        assert asyncio.run(main()) == (1, 1)
+
+
+class TestLoadTest:
+    """Тест нагрузочного прогона настоящего бота."""
+
+    def test_bot_answers_all(self):
+        """Тест того, что бот из bot.py отвечает на все команды поддельного Bot API."""
+        from load_test import run_load_test
+        report = asyncio.run(run_load_test(LoadProfile(rate=40, duration=0.5, seed=2), reply_timeout=5))
+        assert report.commands == 20
+        assert report.unanswered == 0
@@ -0,0 +1,122 @@
+"""
+Модульные тесты для HTTP API генерации и проверки номеров.
+"""
+import asyncio
+import json
+import threading
+
+from http_api import STREAM_CHUNK, create_api_server
+from http_test_client import send_request
+from serial_allocator import SerialAllocator, issue_serial_numbers
+
+
+class TestHttpApi:
+    """Тесты для HTTP API генерации и проверки номеров."""
+    
+    def _scenario(self, requests, token=None, is_issued=None):
+        allocator = SerialAllocator()
+        issued = []
+        
+        def issue(count):
+            serials = issue_serial_numbers(count, 1_790_000_000, allocator)
+            issued.extend(serial for serial, _ in serials)
+            return serials
+        
+        async def main():
+            server = create_api_server(issue, is_issued, token, "127.0.0.1", 0, max_count=5000)
+            await server.start()
+            try:
+                reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+                responses = [await send_request(reader, writer, *request) for request in requests]
+                writer.close()
+            finally:
+                await server.stop()
+            return responses
+        return asyncio.run(main()), issued
+    
+    def test_generate(self):
+        """Тест генерации номеров через общий аллокатор."""
+        responses, issued = self._scenario([
+            ("POST", "/v1/generate", b'{"count": 3}'),
+            ("POST", "/v1/generate?count=2"),
+        ])
+        first, second = (json.loads(body) for _, _, body in responses)
+        assert [item["serial"] for item in first + second] == issued
+        assert len(set(issued)) == 5
+        assert first[0]["formatted"].replace("-", "") == first[0]["serial"]
+    
+    def test_generate_stream_ndjson(self):
+        """Тест потоковой выдачи большого количества номеров в NDJSON."""
+        responses, issued = self._scenario([
+            ("POST", "/v1/generate?format=ndjson", b'{"count": 2500}'),
+        ])
+        status, headers, body = responses[0]
+        assert status == 200 and headers["transfer-encoding"] == "chunked"
+        assert headers["content-type"] == "application/x-ndjson"
+        assert [json.loads(line)["serial"] for line in body.decode().splitlines()] == issued
+        assert len(set(issued)) == 2500
+    
+    def test_generate_bad_count(self):
+        """Тест ответа на неверное количество."""
+        responses, issued = self._scenario([
+            ("POST", "/v1/generate", b'{"count": 0}'),
+            ("POST", "/v1/generate", b'{"count": 5001}'),
+            ("POST", "/v1/generate", b'{"count": "x"}'),
+            ("POST", "/v1/generate", b'[1]'),
+        ])
+        assert [status for status, _, _ in responses] == [400] * 4
+        assert issued == []
+    
+    def test_validate_json(self):
+        """Тест проверки JSON-массива номеров."""
+        responses, _ = self._scenario(
+            [("POST", "/v1/validate", json.dumps(["0100-0010-0429", "0100-0010-0420", "12"]).encode())],
+            is_issued=lambda serial: serial == "010000100429",
+        )
+        items = json.loads(responses[0][2])
+        assert [item["valid"] for item in items] == [True, False, False]
+        assert [item["issued"] for item in items] == [True, False, False]
+        assert items[0]["quarter"] == 1 and items[0]["adds"] == 42
+        assert items[1]["serial"] == "010000100420" and items[1]["message"]
+    
+    def test_validate_checks_issued_off_loop(self):
+        """Тест того, что проверка выпуска (запрос к реестру) не выполняется в потоке цикла событий."""
+        threads = set()
+        
+        def is_issued(serial):
+            threads.add(threading.current_thread())
+            return False
+        
+        self._scenario([("POST", "/v1/validate", b'["0100-0010-0429"]')], is_issued=is_issued)
+        assert threads and threading.main_thread() not in threads
+    
+    def test_validate_ndjson_stream(self):
+        """Тест потоковой проверки NDJSON: номера строками и JSON-строками."""
+        lines = ["0100-0010-0429", '"0100-0010-0420"'] * STREAM_CHUNK
+        responses, _ = self._scenario([(
+            "POST", "/v1/validate", "\n".join(lines).encode(), {"Content-Type": "application/x-ndjson"},
+        )])
+        status, headers, body = responses[0]
+        assert headers["transfer-encoding"] == "chunked"
+        items = json.loads(body)
+        assert len(items) == 2 * STREAM_CHUNK
+        assert [item["valid"] for item in items[:4]] == [True, False, True, False]
+        assert "issued" not in items[0]
+    
+    def test_validate_bad_body(self):
+        """Тест ответа на тело, не являющееся массивом."""
+        responses, _ = self._scenario([
+            ("POST", "/v1/validate", b'{"serial": "0100-1234-5420"}'),
+            ("POST", "/v1/validate", b"{oops"),
+        ])
+        assert [status for status, _, _ in responses] == [400, 400]
+    
+    def test_token(self):
+        """Тест проверки токена доступа."""
+        responses, issued = self._scenario([
+            ("POST", "/v1/generate"),
+            ("POST", "/v1/generate", b"", {"Authorization": "Bearer s3cret"}),
+            ("GET", "/healthz"),
+        ], token="s3cret")
+        assert [status for status, _, _ in responses] == [401, 200, 200]
+        assert len(issued) == 1
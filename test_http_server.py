@@ -0,0 +1,183 @@
+"""
+Модульные тесты для встроенного HTTP-сервера и приема обновлений через вебхук.
+"""
+import asyncio
+import json
+
+import pytest
+from telegram import Update
+from telegram.ext import Application
+
+from fake_bot_api import FakeBotApi, LoadProfile
+from http_server import HttpServer, Response
+from http_test_client import send_request
+from webhook import create_webhook_server, run_webhook
+
+UPDATE = {
+    "update_id": 1001,
+    "message": {
+        "message_id": 7,
+        "date": 1_790_000_000,
+        "chat": {"id": 42, "type": "private"},
+        "from": {"id": 42, "is_bot": False, "first_name": "Тест"},
+        "text": "/c 0100-1234-5420",
+    },
+}
+
+
+def _run(scenario):
+    """
+    Запускает сценарий на сервере, слушающем свободный порт.
+    """
+    async def main():
+        server = HttpServer("127.0.0.1", 0)
+
+        async def echo(request):
+            return Response.json({"path": request.path, "query": request.query, "body": request.body.decode()})
+
+        async def numbers(request):
+            async def chunks():
+                for index in range(int(request.query.get("n", "3"))):
+                    yield f"{index}\n".encode()
+            return Response.stream(chunks(), "application/x-ndjson")
+
+        server.route("POST", "/echo", echo)
+        server.route("GET", "/numbers", numbers)
+        await server.start()
+        try:
+            return await scenario(server)
+        finally:
+            await server.stop()
+    return asyncio.run(main())
+
+
+class TestHttpServer:
+    """Тесты для класса HttpServer."""
+    
+    def test_keep_alive(self):
+        """Тест того, что по одному соединению обрабатывается несколько запросов."""
+        async def scenario(server):
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            results = []
+            for index in range(3):
+                status, headers, body = await send_request(reader, writer, "POST", f"/echo?n={index}", b"x" * index)
+                results.append((status, headers["connection"], json.loads(body)))
+            writer.close()
+            return results
+        results = _run(scenario)
+        assert [status for status, _, _ in results] == [200, 200, 200]
+        assert all(connection == "keep-alive" for _, connection, _ in results)
+        assert results[2][2] == {"path": "/echo", "query": {"n": "2"}, "body": "xx"}
+    
+    def test_connection_close(self):
+        """Тест того, что сервер закрывает соединение по Connection: close."""
+        async def scenario(server):
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            status, headers, _ = await send_request(reader, writer, "POST", "/echo", headers={"Connection": "close"})
+            return status, headers["connection"], await reader.read()
+        assert _run(scenario) == (200, "close", b"")
+    
+    def test_not_found_and_method(self):
+        """Тест ответов 404 и 405."""
+        async def scenario(server):
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            missing = (await send_request(reader, writer, "GET", "/missing"))[0]
+            wrong_method = (await send_request(reader, writer, "GET", "/echo"))[0]
+            writer.close()
+            return missing, wrong_method
+        assert _run(scenario) == (404, 405)
+    
+    def test_streaming(self):
+        """Тест потокового ответа по частям и продолжения соединения после него."""
+        async def scenario(server):
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            streamed = await send_request(reader, writer, "GET", "/numbers?n=1000")
+            after = await send_request(reader, writer, "POST", "/echo", b"ok")
+            writer.close()
+            return streamed, after
+        (status, headers, body), after = _run(scenario)
+        assert status == 200 and headers["transfer-encoding"] == "chunked"
+        assert "content-length" not in headers
+        assert body.decode().split() == [str(index) for index in range(1000)]
+        assert json.loads(after[2])["body"] == "ok"
+    
+    def test_streaming_http10(self):
+        """Тест того, что клиенту HTTP/1.0 поток отдается без chunked до закрытия соединения."""
+        async def scenario(server):
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            writer.write(b"GET /numbers HTTP/1.0\r\n\r\n")
+            return await reader.read()
+        head, _, body = _run(scenario).partition(b"\r\n\r\n")
+        assert b"Connection: close" in head and b"chunked" not in head
+        assert body == b"0\n1\n2\n"
+    
+    def test_body_too_large(self):
+        """Тест ограничения размера тела."""
+        async def scenario(server):
+            server.max_body = 10
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            return (await send_request(reader, writer, "POST", "/echo", b"x" * 11))[0]
+        assert _run(scenario) == 413
+
+
+class TestWebhook:
+    """Тесты для приема обновлений через вебхук."""
+    
+    def _scenario(self, requests, secret_token=None):
+        async def main():
+            application = Application.builder().token("123:TEST").build()
+            server = create_webhook_server(application, "/telegram", secret_token, "127.0.0.1", 0)
+            await server.start()
+            try:
+                reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+                statuses = [(await send_request(reader, writer, *request))[0] for request in requests]
+                writer.close()
+            finally:
+                await server.stop()
+            updates = []
+            while not application.update_queue.empty():
+                updates.append(application.update_queue.get_nowait())
+            return statuses, updates
+        return asyncio.run(main())
+    
+    def test_update_is_queued(self):
+        """Тест того, что присланное обновление попадает в очередь приложения."""
+        statuses, updates = self._scenario([
+            ("POST", "/telegram", json.dumps(UPDATE).encode()),
+            ("GET", "/healthz"),
+        ])
+        assert statuses == [200, 200]
+        assert len(updates) == 1 and isinstance(updates[0], Update)
+        assert updates[0].message.text == "/c 0100-1234-5420"
+    
+    def test_bad_json(self):
+        """Тест ответа на неверный JSON."""
+        statuses, updates = self._scenario([("POST", "/telegram", b"{oops")])
+        assert statuses == [400] and updates == []
+    
+    def test_secret_token(self):
+        """Тест проверки секрета из заголовка."""
+        body = json.dumps(UPDATE).encode()
+        statuses, updates = self._scenario([
+            ("POST", "/telegram", body),
+            ("POST", "/telegram", body, {"X-Telegram-Bot-Api-Secret-Token": "s3cret"}),
+        ], secret_token="s3cret")
+        assert statuses == [403, 200] and len(updates) == 1
+    
+    def test_server_start_failure(self):
+        """Тест того, что приложение останавливается, если HTTP-сервер не запустился."""
+        async def main():
+            api = FakeBotApi(LoadProfile())
+            await api.start()
+            application = Application.builder().token(api.token).base_url(api.base_url).build()
+            # Порт уже занят сервером поддельного Bot API
+            server = create_webhook_server(application, "/telegram", None, "127.0.0.1", api.server.port)
+            try:
+                with pytest.raises(OSError):
+                    await run_webhook(application, server)
+            finally:
+                await api.stop()
+            return application
+        application = asyncio.run(main())
+        assert not application.running and not application._initialized
+
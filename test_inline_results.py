@@ -0,0 +1,111 @@
+"""
+Модульные тесты для ответов в инлайн-режиме.
+"""
+import random
+
+from inline_results import (
+    CHECK, GENERATE, INLINE_RESULTS_LIMIT, MAX_INLINE_COUNT, check_results, chosen_serials, parse_inline_query,
+    preview_serials, serial_results,
+)
+from serial_number import SerialNumber, generate_serial_numbers
+
+
+class TestParseInlineQuery:
+    """Тесты для функции parse_inline_query."""
+
+    def test_empty_generates_one(self):
+        """Тест того, что пустой запрос генерирует один номер."""
+        assert parse_inline_query("") == (GENERATE, 1)
+        assert parse_inline_query("   ") == (GENERATE, 1)
+
+    def test_count(self):
+        """Тест запроса с количеством номеров."""
+        assert parse_inline_query("5") == (GENERATE, 5)
+        assert parse_inline_query(" 12 ") == (GENERATE, 12)
+
+    def test_count_clamped(self):
+        """Тест ограничения количества лимитом результатов Telegram."""
+        assert parse_inline_query("99") == (GENERATE, MAX_INLINE_COUNT)
+        assert parse_inline_query("0") == (GENERATE, 1)
+
+    def test_serial_is_checked(self):
+        """Тест того, что номер и любой другой текст проверяются."""
+        assert parse_inline_query("0123-4567-8912") == (CHECK, 0)
+        assert parse_inline_query("012345678912") == (CHECK, 0)
+        assert parse_inline_query("123") == (CHECK, 0)
+        assert parse_inline_query("abc") == (CHECK, 0)
+
+
+class TestSerialResults:
+    """Тесты для функции serial_results."""
+
+    def test_single(self):
+        """Тест результата для одного номера."""
+        serials = list(generate_serial_numbers(1_780_000_000, range(1, 2)))
+        results = serial_results(serials)
+        assert len(results) == 1
+        assert results[0].id == serials[0][0]
+        assert results[0].title == serials[0][1]
+        assert results[0].input_message_content.message_text == f"`{serials[0][1]}`"
+
+    def test_all_first(self):
+        """Тест того, что для нескольких номеров первым идет результат со всеми номерами."""
+        serials = list(generate_serial_numbers(1_780_000_000, range(1, 4)))
+        results = serial_results(serials)
+        assert len(results) == 4
+        assert results[0].input_message_content.message_text.split("\n") == [f"`{f}`" for _, f in serials]
+        assert [result.id for result in results[1:]] == [serial for serial, _ in serials]
+
+    def test_limit(self):
+        """Тест того, что максимум номеров укладывается в лимит результатов и id уникальны."""
+        results = serial_results(list(generate_serial_numbers(1_780_000_000, range(1, MAX_INLINE_COUNT + 1))))
+        assert len(results) == INLINE_RESULTS_LIMIT
+        assert len({result.id for result in results}) == INLINE_RESULTS_LIMIT
+        assert all(len(result.id.encode()) <= 64 for result in results)
+
+
+class TestChosenSerials:
+    """Тесты для функций preview_serials и chosen_serials."""
+
+    def test_preview(self):
+        """Тест того, что предложения - номера одной секунды с подряд идущими добавочными числами."""
+        rng = random.Random(1)
+        for count in (1, 5, MAX_INLINE_COUNT):
+            serials = preview_serials(count, 1_780_000_000, rng)
+            adds = [SerialNumber(int(serial)).adds for serial, _ in serials]
+            assert adds == list(range(adds[0], adds[0] + count)) and 1 <= adds[0] and adds[-1] <= 99
+            assert {SerialNumber(int(serial)).timestamp for serial, _ in serials} == {1_780_000_000}
+
+    def test_round_trip(self):
+        """Тест восстановления номеров по id любого результата."""
+        serials = preview_serials(7, 1_780_000_000, random.Random(2))
+        results = serial_results(serials)
+        assert chosen_serials(results[0].id) == serials
+        assert [chosen_serials(result.id) for result in results[1:]] == [[serial] for serial in serials]
+
+    def test_unknown_ids(self):
+        """Тест того, что результаты проверки и чужие id не дают номеров."""
+        serial = next(generate_serial_numbers(1_780_000_000, range(98, 99)))[0]
+        assert chosen_serials(check_results("1" * 12, False, "", "")[0].id) == []
+        assert chosen_serials(f"all-{serial}-5") == []
+        assert chosen_serials(f"all-{serial}-x") == []
+        assert chosen_serials(serial[:-1] + str((int(serial[-1]) + 1) % 10)) == []
+        assert chosen_serials("") == []
+
+
+class TestCheckResults:
+    """Тесты для функции check_results."""
+
+    def test_valid(self):
+        """Тест результата для валидного номера."""
+        results = check_results("012345678912", True, "01.01.2026", "`0123-4567-8912`\nВалидный номер")
+        assert len(results) == 1
+        assert results[0].title == "Валидный номер"
+        assert results[0].description == "01.01.2026"
+        assert results[0].input_message_content.message_text == "`0123-4567-8912`\nВалидный номер"
+
+    def test_long_input_id(self):
+        """Тест того, что id результата не превышает 64 байта для длинного ввода."""
+        results = check_results("1" * 100, False, "Неверная длина", "ответ")
+        assert results[0].title == "Невалидный номер"
+        assert len(results[0].id) <= 64
@@ -0,0 +1,145 @@
+"""
+Модульные тесты для метрик в формате Prometheus.
+"""
+import asyncio
+import threading
+
+import pytest
+
+from http_test_client import send_request
+from metrics import CONTENT_TYPE, CallbackMetric, Counter, Histogram, Registry, create_metrics_server
+
+
+class TestCounter:
+    """Тесты для класса Counter."""
+
+    def test_inc_and_render(self):
+        """Тест счетчика с метками и его вывода."""
+        registry = Registry()
+        counter = Counter("app_requests_total", "Запросы", ("handler",), registry=registry)
+        counter.inc("generate")
+        counter.inc("generate", amount=2)
+        counter.inc("check")
+        assert counter.value("generate") == 3
+        assert counter.value("start") == 0
+        assert registry.render() == (
+            "# HELP app_requests_total Запросы\n"
+            "# TYPE app_requests_total counter\n"
+            'app_requests_total{handler="check"} 1\n'
+            'app_requests_total{handler="generate"} 3\n'
+        )
+
+    def test_without_labels(self):
+        """Тест счетчика без меток."""
+        registry = Registry()
+        counter = Counter("app_events_total", "События", registry=registry)
+        counter.inc(amount=0.5)
+        assert registry.render().splitlines()[-1] == "app_events_total 0.5"
+
+    def test_labels_checked(self):
+        """Тест проверки числа меток."""
+        counter = Counter("app_errors_total", "Ошибки", ("handler", "exception"), registry=None)
+        with pytest.raises(ValueError):
+            counter.inc("generate")
+
+    def test_escaping(self):
+        """Тест экранирования значений меток."""
+        registry = Registry()
+        counter = Counter("app_errors_total", "Ошибки", ("error",), registry=registry)
+        counter.inc('a"b\\c\nd')
+        assert 'app_errors_total{error="a\\"b\\\\c\\nd"} 1' in registry.render()
+
+    def test_threads(self):
+        """Тест того, что значения из шардов разных потоков складываются."""
+        counter = Counter("app_requests_total", "Запросы", ("handler",), registry=None)
+
+        def work():
+            for _ in range(1000):
+                counter.inc("generate")
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        counter.inc("generate")
+        assert counter.value("generate") == 8001
+        assert len(counter._shards) == 9
+
+
+class TestHistogram:
+    """Тесты для класса Histogram."""
+
+    def test_cumulative_buckets(self):
+        """Тест накопительных корзин, суммы и количества."""
+        registry = Registry()
+        histogram = Histogram("app_latency_seconds", "Время", ("handler",), buckets=(0.1, 0.5), registry=registry)
+        for value in (0.05, 0.1, 0.3, 2.0):
+            histogram.observe(value, "generate")
+        assert histogram.count("generate") == 4
+        assert registry.render().splitlines()[2:] == [
+            'app_latency_seconds_bucket{handler="generate",le="0.1"} 2',
+            'app_latency_seconds_bucket{handler="generate",le="0.5"} 3',
+            'app_latency_seconds_bucket{handler="generate",le="+Inf"} 4',
+            'app_latency_seconds_sum{handler="generate"} 2.45',
+            'app_latency_seconds_count{handler="generate"} 4',
+        ]
+
+    def test_threads(self):
+        """Тест сложения гистограмм из разных потоков."""
+        histogram = Histogram("app_latency_seconds", "Время", buckets=(1.0,), registry=None)
+        threads = [threading.Thread(target=histogram.observe, args=(0.5,)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        histogram.observe(5.0)
+        samples = list(histogram.samples())
+        assert samples[0] == ("_bucket", {"le": "1"}, 4)
+        assert samples[-1] == ("_count", {}, 5)
+
+
+class TestRegistry:
+    """Тесты для реестра, метрик с функцией и сервера метрик."""
+
+    def test_duplicate_name(self):
+        """Тест запрета двух метрик с одним именем."""
+        registry = Registry()
+        Counter("app_requests_total", "Запросы", registry=registry)
+        with pytest.raises(ValueError):
+            Counter("app_requests_total", "Запросы", registry=registry)
+
+    def test_callback_metric(self):
+        """Тест метрики, значения которой берутся из функции."""
+        registry = Registry()
+        state = {"depth": 3}
+        CallbackMetric("app_queue", "Очередь", lambda: [(("depth",), state["depth"])], ("stat",),
+                       registry=registry)
+        state["depth"] = 5
+        assert registry.render().splitlines() == [
+            "# HELP app_queue Очередь",
+            "# TYPE app_queue gauge",
+            'app_queue{stat="depth"} 5',
+        ]
+
+    def test_server(self):
+        """Тест GET /metrics."""
+        registry = Registry()
+        Counter("app_requests_total", "Запросы", registry=registry).inc()
+
+        async def main():
+            server = create_metrics_server(registry, "127.0.0.1", 0)
+            await server.start()
+            try:
+                reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+                responses = [await send_request(reader, writer, "GET", "/metrics"),
+                             await send_request(reader, writer, "POST", "/metrics")]
+                writer.close()
+            finally:
+                await server.stop()
+            return responses
+
+        (status, headers, body), (post_status, _, _) = asyncio.run(main())
+        assert status == 200 and headers["content-type"] == CONTENT_TYPE
+        assert body.decode().endswith("app_requests_total 1\n")
+        assert post_status == 405
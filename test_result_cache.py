@@ -0,0 +1,69 @@
+"""
+Модульные тесты для LRU-кеша результатов.
+"""
+import threading
+
+import pytest
+
+from result_cache import LRUCache
+
+
+class TestLRUCache:
+    """Тесты для класса LRUCache."""
+    
+    def test_hit_and_miss(self):
+        """Тест счетчиков попаданий и промахов."""
+        cache = LRUCache(2)
+        assert cache.get("a") is None
+        cache.put("a", 1)
+        assert cache.get("a") == 1
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+    
+    def test_eviction_order(self):
+        """Тест вытеснения самой давно использованной записи."""
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        assert "a" in cache and "c" in cache and "b" not in cache
+        assert cache.evictions == 1
+        assert len(cache) == 2
+    
+    def test_get_or_compute(self):
+        """Тест того, что значение вычисляется только при промахе."""
+        cache = LRUCache(4)
+        calls = []
+        for _ in range(3):
+            assert cache.get_or_compute("k", lambda: calls.append(1) or "v") == "v"
+        assert len(calls) == 1
+    
+    def test_zero_size_disables_cache(self):
+        """Тест того, что кеш нулевого размера ничего не хранит."""
+        cache = LRUCache(0)
+        cache.put("a", 1)
+        assert len(cache) == 0
+    
+    def test_negative_size(self):
+        """Тест отрицательного размера."""
+        with pytest.raises(ValueError):
+            LRUCache(-1)
+    
+    def test_concurrent_access(self):
+        """Тест того, что размер не превышается при одновременном доступе из потоков."""
+        cache = LRUCache(50)
+        
+        def worker(offset):
+            for i in range(1000):
+                cache.put((offset, i % 80), i)
+                cache.get((offset, (i * 7) % 80))
+        
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = cache.stats()
+        assert stats["size"] == 50
+        assert stats["hits"] + stats["misses"] == 4000
@@ -0,0 +1,209 @@
+"""
+Модульные тесты для исходящей очереди сообщений.
+"""
+import asyncio
+import time
+
+import pytest
+
+from send_queue import SendQueue, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Recorder:
+    """
+    Функция отправки, запоминающая отправленные сообщения.
+    """
+
+    def __init__(self, delay=0.0, failures=()):
+        self.sent = []
+        self.delay = delay
+        self.failures = list(failures)
+
+    async def __call__(self, chat_id, text, **kwargs):
+        if self.failures:
+            raise self.failures.pop(0)
+        await asyncio.sleep(self.delay)
+        self.sent.append((chat_id, text, kwargs))
+        return len(self.sent)
+
+
+class RetryAfter(Exception):
+    def __init__(self, seconds):
+        super().__init__("Flood control exceeded")
+        self.retry_after = seconds
+
+
+def _run(scenario):
+    return asyncio.run(asyncio.wait_for(scenario(), 10))
+
+
+class TestTokenBucket:
+    """Тесты для класса TokenBucket."""
+    
+    def test_rate_and_capacity(self):
+        """Тест накопления токенов со скоростью rate, но не больше capacity."""
+        clock = FakeClock()
+        bucket = TokenBucket(2.0, 3, clock)
+        for _ in range(3):
+            assert bucket.wait_time() == 0
+            bucket.take()
+        assert bucket.wait_time() == pytest.approx(0.5)
+        clock.now = 10.0
+        assert bucket.full
+    
+    def test_invalid(self):
+        """Тест проверки параметров."""
+        with pytest.raises(ValueError):
+            TokenBucket(0, 1)
+
+
+class TestSendQueue:
+    """Тесты для класса SendQueue."""
+    
+    def test_coalescing(self):
+        """Тест того, что стоящие в очереди сообщения в один чат склеиваются."""
+        async def scenario():
+            recorder = Recorder()
+            queue = SendQueue(recorder)
+            futures = [queue.send(1, f"line {index}", parse_mode="Markdown") for index in range(5)]
+            other = queue.send(1, "plain")
+            queue.start()
+            results = await asyncio.gather(*futures, other)
+            await queue.stop()
+            return recorder.sent, results, queue.stats()
+        sent, results, stats = _run(scenario)
+        assert sent == [
+            (1, "line 0\nline 1\nline 2\nline 3\nline 4", {"parse_mode": "Markdown"}),
+            (1, "plain", {}),
+        ]
+        assert results == [1, 1, 1, 1, 1, 2]
+        assert (stats["sent"], stats["coalesced"], stats["depth"], stats["max_depth"]) == (2, 4, 0, 6)
+    
+    def test_groups_and_no_coalesce(self):
+        """Тест того, что склеиваются только сообщения одной группы и без coalesce=False."""
+        async def scenario():
+            recorder = Recorder()
+            queue = SendQueue(recorder, chat_burst=10)
+            queue.send(1, "a0", group="a")
+            queue.send(1, "a1", group="a")
+            queue.send(1, "b0", group="b")
+            queue.send(1, "b1", group="b", coalesce=False)
+            queue.send(1, "b2", group="b", coalesce=False)
+            queue.start()
+            await queue.stop()
+            return [text for _, text, _ in recorder.sent], queue.stats()["coalesced"]
+        assert _run(scenario) == (["a0\na1", "b0", "b1", "b2"], 1)
+    
+    def test_message_limit(self):
+        """Тест того, что склеенное сообщение не превышает лимит длины."""
+        async def scenario():
+            recorder = Recorder()
+            queue = SendQueue(recorder, message_limit=10)
+            for text in ("aaaa", "bbbb", "cccc"):
+                queue.send(1, text)
+            queue.start()
+            await queue.stop()
+            return [text for _, text, _ in recorder.sent]
+        assert _run(scenario) == ["aaaa\nbbbb", "cccc"]
+    
+    def test_round_robin(self):
+        """Тест того, что длинная очередь одного чата не задерживает другой."""
+        async def scenario():
+            recorder = Recorder()
+            queue = SendQueue(recorder, chat_rate=20, chat_burst=1)
+            for index in range(3):
+                queue.send(1, f"a{index}", reply_markup=index)
+            queue.send(2, "b0")
+            queue.start()
+            await queue.stop()
+            return [text for _, text, _ in recorder.sent]
+        assert _run(scenario) == ["a0", "b0", "a1", "a2"]
+    
+    def test_chat_rate(self):
+        """Тест ограничения скорости отправки в один чат."""
+        async def scenario():
+            recorder = Recorder()
+            queue = SendQueue(recorder, chat_rate=20, chat_burst=1)
+            started = time.monotonic()
+            for index in range(5):
+                queue.send(1, str(index), reply_markup=index)
+            queue.start()
+            await queue.stop()
+            return time.monotonic() - started, [text for _, text, _ in recorder.sent]
+        elapsed, texts = _run(scenario)
+        assert texts == ["0", "1", "2", "3", "4"]
+        assert elapsed >= 4 / 20 * 0.9
+    
+    def test_global_rate(self):
+        """Тест общего ограничения скорости по всем чатам."""
+        async def scenario():
+            recorder = Recorder()
+            queue = SendQueue(recorder, global_rate=40)
+            started = time.monotonic()
+            for chat_id in range(60):
+                queue.send(chat_id, "x")
+            queue.start()
+            await queue.stop()
+            return time.monotonic() - started, len(recorder.sent)
+        elapsed, count = _run(scenario)
+        assert count == 60
+        assert elapsed >= 20 / 40 * 0.9
+    
+    def test_order_with_slow_send(self):
+        """Тест того, что при медленной отправке порядок сообщений в чате сохраняется."""
+        async def scenario():
+            recorder = Recorder(delay=0.02)
+            queue = SendQueue(recorder, chat_rate=1000, chat_burst=10)
+            queue.start()
+            for index in range(6):
+                queue.send(1, str(index), reply_markup=index)
+                await asyncio.sleep(0.005)
+            await queue.stop()
+            return [text for _, text, _ in recorder.sent]
+        assert _run(scenario) == ["0", "1", "2", "3", "4", "5"]
+    
+    def test_retry_after(self):
+        """Тест повторной отправки после ответа Telegram с retry_after."""
+        async def scenario():
+            recorder = Recorder(failures=[RetryAfter(0.05)])
+            queue = SendQueue(recorder)
+            future = queue.send(1, "hello")
+            queue.start()
+            result = await future
+            await queue.stop()
+            return result, recorder.sent, queue.stats()["failed"]
+        assert _run(scenario) == (1, [(1, "hello", {})], 0)
+    
+    def test_failure(self):
+        """Тест того, что ошибка отправки передается в future и учитывается в статистике."""
+        async def scenario():
+            queue = SendQueue(Recorder(failures=[RuntimeError("boom")]))
+            future = queue.send(1, "hello")
+            queue.start()
+            with pytest.raises(RuntimeError):
+                await future
+            await queue.stop()
+            return queue.stats()["failed"]
+        assert _run(scenario) == 1
+    
+    def test_wait_chat(self):
+        """Тест ожидания отправки всех сообщений чата."""
+        async def scenario():
+            recorder = Recorder(delay=0.02)
+            queue = SendQueue(recorder)
+            queue.start()
+            queue.send(1, "first")
+            await queue.wait_chat(1)
+            sent_before = list(recorder.sent)
+            await queue.wait_chat(2)
+            await queue.stop()
+            return sent_before
+        assert _run(scenario) == [(1, "first", {})]
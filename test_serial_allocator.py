@@ -0,0 +1,88 @@
+"""
+Модульные тесты для аллокатора уникальных серийных номеров.
+"""
+import random
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from serial_allocator import SerialAllocator, issue_serial_numbers
+from serial_number import generate_serial_number, parse_serial_number
+
+NOW = int(datetime(2026, 5, 15, 12, 30, 45, tzinfo=timezone.utc).timestamp())
+
+
+class TestSerialAllocator:
+    """Тесты для класса SerialAllocator."""
+    
+    def test_unique_within_slot(self):
+        """Тест того, что в одной секунде добавочные числа не повторяются."""
+        allocator = SerialAllocator(rng=random.Random(1))
+        adds = []
+        for _ in range(9):
+            for timestamp, group in allocator.allocate(11, NOW):
+                assert timestamp == NOW
+                adds.extend(group)
+        assert sorted(adds) == list(range(1, 100))
+    
+    def test_spill_over_to_next_second(self):
+        """Тест переноса на следующую секунду при заполнении слота."""
+        allocator = SerialAllocator(rng=random.Random(2))
+        allocator.allocate(90, NOW)
+        groups = allocator.allocate(20, NOW)
+        assert [(t, len(a)) for t, a in groups] == [(NOW, 9), (NOW + 1, 11)]
+        assert allocator.issued_in_slot(NOW + 1) == 11
+    
+    def test_more_than_slot_size(self):
+        """Тест выдачи больше 99 номеров за один запрос."""
+        allocator = SerialAllocator()
+        groups = allocator.allocate(250, NOW)
+        assert [len(a) for _, a in groups] == [99, 99, 52]
+    
+    def test_expired_slots_are_not_reused(self):
+        """Тест того, что после удаления старых слотов выдача в них не возвращается."""
+        allocator = SerialAllocator(retention_seconds=10)
+        allocator.allocate(99, NOW)
+        allocator.allocate(1, NOW + 100)
+        groups = allocator.allocate(1, NOW)
+        assert groups[0][0] > NOW
+    
+    def test_concurrent_threads(self):
+        """Тест уникальности при одновременных запросах из многих потоков."""
+        allocator = SerialAllocator()
+        results = []
+        lock = threading.Lock()
+        
+        def worker():
+            for _ in range(50):
+                pairs = [(t, a) for t, group in allocator.allocate(7, NOW) for a in group]
+                with lock:
+                    results.extend(pairs)
+        
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(results) == 8 * 50 * 7
+        assert len(set(results)) == len(results)
+    
+    def test_negative_count(self):
+        """Тест отрицательного количества."""
+        with pytest.raises(ValueError):
+            SerialAllocator().allocate(-1, NOW)
+
+
+class TestIssueSerialNumbers:
+    """Тесты для функции issue_serial_numbers."""
+    
+    def test_issue(self):
+        """Тест выдачи валидных уникальных номеров."""
+        allocator = SerialAllocator()
+        time = datetime.fromtimestamp(NOW, timezone.utc)
+        serials = issue_serial_numbers(120, time, allocator)
+        assert len({serial for serial, _ in serials}) == 120
+        for serial, formatted in serials[:99]:
+            assert serial == generate_serial_number(time, int(serial[9:11]))
+            assert parse_serial_number(formatted)[0] is True
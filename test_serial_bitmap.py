@@ -0,0 +1,65 @@
+"""
+Модульные тесты для битового индекса выпущенных серийных номеров.
+"""
+import os
+
+import pytest
+
+import serial_bitmap
+from serial_bitmap import SerialBitmap, quarter_bitmap_bits
+from serial_number import SerialNumber
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "python"])
+def bitmap(request, tmp_path, monkeypatch):
+    if request.param:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(serial_bitmap, "np", None)
+    bitmap = SerialBitmap(str(tmp_path))
+    yield bitmap
+    bitmap.close()
+
+
+class TestSerialBitmap:
+    """Тесты для класса SerialBitmap."""
+    
+    def test_quarter_size(self):
+        """Тест размера карты квартала: Q1 2026 - 90 дней."""
+        assert quarter_bitmap_bits(1) == 90 * 86400 * 100
+    
+    def test_add_and_contains(self, bitmap):
+        """Тест отметки и проверки одного номера."""
+        serial = SerialNumber.from_parts(3, 1234567, 42)
+        assert serial not in bitmap
+        bitmap.add(serial)
+        assert serial in bitmap
+        assert bitmap.contains(serial.digits)
+        assert SerialNumber.from_parts(3, 1234567, 43) not in bitmap
+        # Файл создается только для квартала, в который была запись
+        assert os.path.exists(bitmap.path(3))
+        assert not os.path.exists(bitmap.path(4))
+    
+    def test_bulk(self, bitmap):
+        """Тест пакетной отметки и проверки."""
+        issued = [SerialNumber.from_parts(q, s, a) for q in (1, 2) for s in (0, 1, 7_000_000) for a in (0, 5, 99)]
+        others = [SerialNumber.from_parts(q, s, 50) for q in (1, 2, 3) for s in (0, 2)]
+        bitmap.add_many(issued)
+        assert bitmap.contains_many(issued + others) == [True] * len(issued) + [False] * len(others)
+    
+    def test_persistence(self, tmp_path):
+        """Тест того, что отметки сохраняются после переоткрытия."""
+        serial = SerialNumber.from_parts(5, 100, 1)
+        first = SerialBitmap(str(tmp_path))
+        first.add(serial)
+        first.close()
+        second = SerialBitmap(str(tmp_path))
+        assert serial in second
+        second.close()
+    
+    def test_seconds_out_of_quarter(self, bitmap):
+        """Тест номера с секундами за пределами квартала."""
+        serial = SerialNumber.from_parts(1, 9_999_999, 1)
+        assert serial not in bitmap
+        with pytest.raises(ValueError):
+            bitmap.add(serial)
@@ -0,0 +1,131 @@
+"""
+Модульные тесты для фильтра Блума по выпущенным серийным номерам.
+"""
+import os
+
+import pytest
+
+from serial_bloom import BloomFilter, BloomSnapshot, main
+from serial_number import SerialNumber
+
+ISSUED = [SerialNumber.from_parts(4, seconds, adds) for seconds in range(0, 5000, 7) for adds in (1, 50)]
+
+
+class TestBloomFilter:
+    """Тесты для класса BloomFilter."""
+    
+    def test_no_false_negatives(self):
+        """Тест того, что добавленные номера всегда находятся."""
+        bloom = BloomFilter.for_capacity(len(ISSUED), 0.01)
+        bloom.add_many(ISSUED)
+        assert all(serial in bloom for serial in ISSUED)
+        assert all(serial.digits in bloom for serial in ISSUED[:10])
+    
+    def test_fp_rate(self):
+        """Тест того, что измеренная доля ложных срабатываний близка к заданной."""
+        bloom = BloomFilter.for_capacity(len(ISSUED), 0.01)
+        bloom.add_many(ISSUED)
+        assert bloom.expected_fp_rate() == pytest.approx(0.01, rel=0.2)
+        assert bloom.measure_fp_rate(20_000) < 0.02
+    
+    def test_save_and_load(self, tmp_path):
+        """Тест сохранения в файл и загрузки через mmap."""
+        path = str(tmp_path / "issued.bloom")
+        bloom = BloomFilter.for_capacity(len(ISSUED), 0.001)
+        bloom.add_many(ISSUED)
+        bloom.save(path)
+        loaded = BloomFilter.load(path)
+        assert (loaded.bit_count, loaded.hash_count, loaded.count) == (bloom.bit_count, bloom.hash_count, bloom.count)
+        assert all(serial in loaded for serial in ISSUED)
+        with pytest.raises(TypeError):
+            loaded.add(1)
+        loaded.close()
+    
+    def test_load_wrong_file(self, tmp_path):
+        """Тест загрузки файла, который не является фильтром."""
+        path = tmp_path / "wrong.bloom"
+        path.write_bytes(b"x" * 64)
+        with pytest.raises(ValueError):
+            BloomFilter.load(str(path))
+    
+    def test_load_truncated_file(self, tmp_path):
+        """Тест того, что обрезанный файл фильтра не загружается."""
+        path = str(tmp_path / "issued.bloom")
+        bloom = BloomFilter.for_capacity(100, 0.001)
+        bloom.save(path)
+        with open(path, "r+b") as file:
+            file.truncate(os.path.getsize(path) - 1)
+        with pytest.raises(ValueError):
+            BloomFilter.load(path)
+    
+    def test_invalid_fp_rate(self):
+        """Тест недопустимой доли ложных срабатываний."""
+        with pytest.raises(ValueError):
+            BloomFilter.for_capacity(10, 1.5)
+
+
+class TestBloomSnapshot:
+    """Тесты для периодически перечитываемого фильтра."""
+    
+    def test_reload(self, tmp_path):
+        """Тест перечитывания обновленного файла."""
+        path = str(tmp_path / "issued.bloom")
+        snapshot = BloomSnapshot(path, reload_interval=0)
+        # Файла еще нет - номер считается возможно выпущенным
+        assert ISSUED[0] in snapshot
+        first = BloomFilter.for_capacity(100, 0.001)
+        first.add(ISSUED[0])
+        first.save(path)
+        assert ISSUED[0] in snapshot
+        assert ISSUED[1] not in snapshot
+        second = BloomFilter.for_capacity(100, 0.001)
+        second.add(ISSUED[1])
+        second.save(path)
+        assert ISSUED[1] in snapshot
+        snapshot.close()
+    
+    def test_bad_file_keeps_previous(self, tmp_path):
+        """Тест того, что испорченный файл не ломает проверку: используется прежний фильтр."""
+        path = str(tmp_path / "issued.bloom")
+        first = BloomFilter.for_capacity(100, 0.001)
+        first.add(ISSUED[0])
+        first.save(path)
+        snapshot = BloomSnapshot(path, reload_interval=0)
+        # Обрезанный файл подменяет прежний, как при оборвавшемся копировании
+        truncated = str(tmp_path / "truncated.bloom")
+        with open(path, "rb") as source, open(truncated, "wb") as target:
+            target.write(source.read()[:-1])
+        os.replace(truncated, path)
+        assert ISSUED[0] in snapshot
+        assert ISSUED[1] not in snapshot
+        snapshot.close()
+    
+    def test_reload_keeps_previous_readable(self, tmp_path):
+        """Тест того, что фильтр, взятый до перечитывания, остается доступен для чтения."""
+        path = str(tmp_path / "issued.bloom")
+        first = BloomFilter.for_capacity(100, 0.001)
+        first.add(ISSUED[0])
+        first.save(path)
+        snapshot = BloomSnapshot(path, reload_interval=0)
+        previous = snapshot._bloom
+        second = BloomFilter.for_capacity(200, 0.001)
+        second.save(path)
+        assert snapshot.reload()
+        assert ISSUED[0] in previous
+        assert ISSUED[0] not in snapshot
+        snapshot.close()
+
+
+class TestBloomCli:
+    """Тесты для сборки фильтра из командной строки."""
+    
+    def test_build_and_info(self, tmp_path, capsys):
+        """Тест сборки фильтра из файла со списком номеров."""
+        source = tmp_path / "serials.txt"
+        source.write_text("\n".join(serial.formatted for serial in ISSUED) + "\nмусор\n", encoding="utf-8")
+        output = str(tmp_path / "issued.bloom")
+        assert main(["build", "--input", str(source), "--output", output, "--samples", "1000"]) == 0
+        assert os.path.exists(output)
+        assert f"Элементов: {len(ISSUED)}" in capsys.readouterr().out
+        assert main(["info", output, "--samples", "0"]) == 0
+        assert "Размер:" in capsys.readouterr().out
@@ -0,0 +1,106 @@
+"""
+Модульные тесты для командной строки проверки и генерации серийных номеров.
+"""
+import argparse
+import csv
+import io
+import json
+
+import pytest
+
+from serial_cli import main, parse_adds, parse_time
+from serial_number import SerialNumber, generate_serial_number
+
+VALID = generate_serial_number(1780000000, 5)
+
+
+class TestValidate:
+    """Тесты для команды validate."""
+    
+    def test_csv(self, tmp_path, capsys):
+        """Тест проверки номеров из файла с выводом в CSV."""
+        path = tmp_path / "serials.txt"
+        path.write_text(f"{VALID}\n\n0100-1234-5428\n12\n", encoding="utf-8")
+        assert main(["validate", str(path)]) == 0
+        captured = capsys.readouterr()
+        rows = list(csv.DictReader(io.StringIO(captured.out)))
+        assert [row["valid"] for row in rows] == ["true", "false", "false"]
+        assert rows[0]["quarter"] == "2" and rows[0]["adds"] == "5"
+        assert rows[0]["timestamp"] == "1780000000"
+        assert rows[2]["message"] == "Серийный номер должен содержать ровно 12 цифр"
+        assert "Обработано номеров: 3, валидных: 1" in captured.err
+    
+    def test_jsonl_from_stdin(self, monkeypatch, capsys):
+        """Тест чтения из stdin и вывода в JSONL."""
+        monkeypatch.setattr("sys.stdin", io.StringIO(f"{VALID}\n0100-1234-5428\n"))
+        main(["validate", "--format", "jsonl", "--chunk-size", "1"])
+        records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert records[0]["valid"] is True and records[0]["seconds"] == SerialNumber.parse(VALID).seconds
+        assert records[1]["valid"] is False and records[1]["quarter"] is None
+    
+    def test_workers_keep_order(self, tmp_path, capsys):
+        """Тест того, что в режиме пула процессов порядок результатов сохраняется."""
+        serials = [generate_serial_number(1780000000 + i, 1) for i in range(50)]
+        path = tmp_path / "serials.txt"
+        path.write_text("\n".join(serials), encoding="utf-8")
+        main(["validate", str(path), "--workers", "2", "--chunk-size", "7", "--no-header"])
+        rows = list(csv.reader(io.StringIO(capsys.readouterr().out)))
+        assert [row[1] for row in rows] == serials
+    
+    def test_column(self, tmp_path, capsys):
+        """Тест проверки колонки CSV, выведенного командой generate."""
+        main(["generate", "--start", "1780000000", "--adds", "1-3"])
+        path = tmp_path / "generated.csv"
+        path.write_text(capsys.readouterr().out, encoding="utf-8")
+        main(["validate", str(path), "--column", "2"])
+        assert "Обработано номеров: 3, валидных: 3" in capsys.readouterr().err
+    
+    def test_quoted_column(self, tmp_path, capsys):
+        """Тест колонки CSV после ячейки в кавычках с запятой внутри."""
+        path = tmp_path / "labels.csv"
+        path.write_text('"Иванов, склад 3",0100-0010-0429\r\n"без номера",\r\n', encoding="utf-8")
+        main(["validate", str(path), "--column", "2", "--no-header"])
+        rows = list(csv.reader(io.StringIO(capsys.readouterr().out)))
+        assert [(row[0], row[2]) for row in rows] == [("0100-0010-0429", "true")]
+
+
+class TestGenerate:
+    """Тесты для команды generate."""
+    
+    @pytest.mark.parametrize("bounds", [["--start", "1700000000"], ["--start", "2548195199", "--end", "2548195201"]])
+    def test_out_of_range(self, bounds, capsys):
+        """Тест ошибки для интервала вне кварталов 1..99."""
+        with pytest.raises(SystemExit):
+            main(["generate", *bounds])
+        assert "кварталах 1..99" in capsys.readouterr().err
+    
+    def test_range(self, capsys):
+        """Тест генерации номеров для каждой секунды интервала."""
+        main(["generate", "--start", "2026-04-01T00:00:00", "--end", "2026-04-01T00:00:03", "--per-second", "2"])
+        rows = list(csv.DictReader(io.StringIO(capsys.readouterr().out)))
+        assert len(rows) == 6
+        assert rows[0] == {"serial": "020000000016", "formatted": "0200-0000-0016"}
+        assert len({row["serial"] for row in rows}) == 6
+    
+    def test_workers_match_single_process(self, capsys):
+        """Тест того, что пул процессов выдает те же номера."""
+        argv = ["generate", "--start", "1780000000", "--end", "1780000100", "--format", "jsonl", "--chunk-size", "500"]
+        main(argv)
+        single = capsys.readouterr().out
+        main(argv + ["--workers", "3"])
+        assert capsys.readouterr().out == single
+
+
+class TestArguments:
+    """Тесты для разбора аргументов."""
+    
+    def test_parse_time(self):
+        """Тест разбора Unix-времени и ISO 8601."""
+        assert parse_time("1780000000") == 1780000000
+        assert parse_time("2026-04-01T00:00:00") == parse_time("2026-04-01T03:00:00+03:00")
+    
+    def test_parse_adds(self):
+        """Тест разбора списка добавочных чисел."""
+        assert parse_adds("1-3,10") == [1, 2, 3, 10]
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_adds("50-120")
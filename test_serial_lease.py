@@ -0,0 +1,76 @@
+"""
+Модульные тесты для раздачи номеров репликами через аренду блоков.
+"""
+import multiprocessing
+import random
+from datetime import datetime, timezone
+
+import pytest
+
+from serial_allocator import issue_serial_numbers
+from serial_lease import LeasedSerialAllocator, LeaseStore
+
+NOW = int(datetime(2026, 5, 15, 12, 30, 45, tzinfo=timezone.utc).timestamp())
+
+
+def _generate(path, seed, requests, queue):
+    """Процесс-генератор: много мелких запросов в одну и ту же секунду."""
+    allocator = LeasedSerialAllocator(LeaseStore(path))
+    rng = random.Random(seed)
+    serials = []
+    for _ in range(requests):
+        serials.extend(serial for serial, _ in issue_serial_numbers(rng.randint(1, 5), NOW, allocator))
+    queue.put(serials)
+
+
+class TestLeasedSerialAllocator:
+    """Тесты для класса LeasedSerialAllocator."""
+    
+    def test_blocks_do_not_overlap(self, tmp_path):
+        """Тест того, что два аллокатора на одном хранилище не пересекаются."""
+        path = str(tmp_path / "leases.sqlite3")
+        first = LeasedSerialAllocator(LeaseStore(path))
+        second = LeasedSerialAllocator(LeaseStore(path))
+        pairs = []
+        for _ in range(30):
+            for allocator in (first, second):
+                pairs.extend((t, a) for t, group in allocator.allocate(4, NOW) for a in group)
+        assert len(pairs) == len(set(pairs)) == 240
+        assert all(1 <= adds <= 99 for _, adds in pairs)
+    
+    def test_spill_over(self, tmp_path):
+        """Тест перехода на следующую секунду, когда блоки секунды закончились."""
+        allocator = LeasedSerialAllocator(LeaseStore(str(tmp_path / "leases.sqlite3")))
+        groups = allocator.allocate(120, NOW)
+        assert [(t, len(a)) for t, a in groups] == [(NOW, 99), (NOW + 1, 21)]
+    
+    def test_stale_block_is_not_used(self, tmp_path):
+        """Тест того, что остаток блока прошедшей секунды не используется."""
+        allocator = LeasedSerialAllocator(LeaseStore(str(tmp_path / "leases.sqlite3")))
+        allocator.allocate(1, NOW)
+        groups = allocator.allocate(1, NOW + 5)
+        assert groups[0][0] == NOW + 5
+    
+    def test_invalid_block_size(self, tmp_path):
+        """Тест недопустимого размера блока."""
+        with pytest.raises(ValueError):
+            LeasedSerialAllocator(LeaseStore(str(tmp_path / "leases.sqlite3")), block_size=0)
+    
+    def test_multiple_processes(self, tmp_path):
+        """Тест отсутствия дубликатов при одновременной генерации несколькими процессами."""
+        path = str(tmp_path / "leases.sqlite3")
+        LeaseStore(path).close()
+        queue = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=_generate, args=(path, seed, 400, queue))
+            for seed in range(4)
+        ]
+        for process in processes:
+            process.start()
+        results = [queue.get(timeout=60) for _ in processes]
+        for process in processes:
+            process.join(timeout=60)
+            assert process.exitcode == 0
+        serials = [serial for result in results for serial in result]
+        assert len(serials) > 4 * 400
+        assert len(set(serials)) == len(serials)
@@ -3,8 +3,8 @@
 """
 import pytest
 from datetime import datetime, timezone
-from serial_number import get_quarter_number_since_q1_2026, get_quarter_number, get_seconds_since_quarter_start, Q1_2026_START, generate_serial_number, parse_serial_number
-from luhn_algorithm import calculate_luhn_checksum, add_valid_luhn_checksum, validate_luhn_checksum
+from serial_number import get_quarter_number_since_q1_2026, get_quarter_number, get_seconds_since_quarter_start, Q1_2026_START, split_timestamp, split_timestamps, get_quarter_start_timestamp, QUARTER_START_TIMESTAMPS, MAX_QUARTER, generate_serial_number, generate_serial_numbers, format_serial_number, parse_serial_number, SerialNumber, SerialNumberLengthError, SerialNumberChecksumError, extract_digits, decode_timestamps, get_serial_lower_bound, serials_between
+from luhn_algorithm import calculate_luhn_checksum, add_valid_luhn_checksum, validate_luhn_checksum, LuhnAccumulator, check_luhn_batch, calculate_luhn_check_digits_batch, calculate_luhn_check_digit
 
 
 class TestGetQuarter:
@@ -316,6 +316,44 @@ class TestGetSecondsSinceQuarterStart:
         assert seconds_2026 == (14 * 86400 + 12 * 3600)
 
 
+class TestTimestampCalendar:
+    """Тесты для календаря кварталов на Unix-времени."""
+    
+    def test_table_boundaries(self):
+        """Тест таблицы начал кварталов."""
+        assert QUARTER_START_TIMESTAMPS[0] == int(Q1_2026_START.timestamp())
+        assert len(QUARTER_START_TIMESTAMPS) == MAX_QUARTER + 1
+        assert get_quarter_start_timestamp(5) == int(datetime(2027, 1, 1, tzinfo=timezone.utc).timestamp())
+    
+    def test_split_timestamp(self):
+        """Тест разбиения Unix-времени на квартал и секунды."""
+        time = datetime(2028, 2, 29, 12, 0, 0, tzinfo=timezone.utc)
+        assert split_timestamp(int(time.timestamp())) == (9, 59 * 86400 + 12 * 3600)
+        q2_start = get_quarter_start_timestamp(2)
+        assert split_timestamp(q2_start - 1) == (1, 89 * 86400 + 23 * 3600 + 59 * 60 + 59)
+        assert split_timestamp(q2_start) == (2, 0)
+    
+    def test_outside_table(self):
+        """Тест моментов вне таблицы кварталов."""
+        assert split_timestamp(get_quarter_start_timestamp(1) - 1)[0] == 0
+        assert split_timestamp(get_quarter_start_timestamp(MAX_QUARTER + 1)) == (MAX_QUARTER + 1, 0)
+    
+    def test_vectorized(self):
+        """Тест векторизованной версии."""
+        timestamps = [get_quarter_start_timestamp(q) + q * 1000 for q in range(0, MAX_QUARTER + 3)]
+        quarters, seconds = split_timestamps(timestamps)
+        assert list(zip(quarters, seconds)) == [split_timestamp(t) for t in timestamps]
+    
+    def test_datetime_wrappers_accept_timestamps(self):
+        """Тест того, что функции принимают как datetime, так и Unix-время."""
+        time = datetime(2026, 5, 15, 12, 30, 45, tzinfo=timezone.utc)
+        timestamp = int(time.timestamp())
+        assert get_quarter_number(timestamp) == get_quarter_number(time) == 2
+        assert get_quarter_number_since_q1_2026(timestamp) == 2
+        assert get_seconds_since_quarter_start(timestamp) == get_seconds_since_quarter_start(time)
+        assert generate_serial_number(timestamp, 42) == generate_serial_number(time, 42)
+
+
 class TestCalculateLuhnChecksum:
     """Тесты для функции calculate_luhn_checksum."""
     
@@ -328,6 +366,23 @@ class TestCalculateLuhnChecksum:
         """Тест для примера 7992739871 -> 6."""
         number = "7992739871"
         assert calculate_luhn_checksum(number) == 6
+    
+    def test_bytes_and_int_input(self):
+        """Тест того, что bytes и int дают тот же результат, что и str."""
+        assert calculate_luhn_checksum(b"456126121234546") == 8
+        assert calculate_luhn_checksum(7992739871) == 6
+    
+    def test_non_digit_input(self):
+        """Тест того, что нецифровые символы вызывают ValueError."""
+        with pytest.raises(ValueError):
+            calculate_luhn_checksum("12a4")
+    
+    def test_no_output_by_default(self, capsys):
+        """Тест того, что без debug ничего не печатается, а с debug печатаются слагаемые."""
+        calculate_luhn_checksum("7992739871")
+        assert capsys.readouterr().out == ""
+        calculate_luhn_checksum("7992739871", debug=True)
+        assert capsys.readouterr().out.split() == ["1", "5", "8", "9", "3", "5", "2", "9", "9", "5"]
 
 
 class TestAddValidLuhnChecksum:
@@ -451,6 +506,93 @@ class TestAddValidLuhnChecksum:
         # Функция все равно добавит еще одну цифру
         assert len(result) == len(number) + 1
         assert validate_luhn_checksum(result)
+    
+    def test_bytes_and_int_input(self):
+        """Тест того, что результат имеет тот же тип, что и входные данные."""
+        assert add_valid_luhn_checksum("7992739871") == "79927398713"
+        assert add_valid_luhn_checksum(b"7992739871") == b"79927398713"
+        assert add_valid_luhn_checksum(7992739871) == 79927398713
+
+
+class TestLuhnAccumulator:
+    """Тесты для класса LuhnAccumulator."""
+    
+    def test_matches_scalar_functions(self):
+        """Тест того, что аккумулятор дает те же результаты, что и скалярные функции."""
+        for number in ["", "5", "42", "7992739871", "456126121234546", "012345678"]:
+            accumulator = LuhnAccumulator(number)
+            assert accumulator.checksum == calculate_luhn_checksum(number)
+            assert add_valid_luhn_checksum(number) == number + str(accumulator.check_digit)
+    
+    def test_extend_prefix(self):
+        """Тест продолжения общего префикса разными суффиксами."""
+        prefix = LuhnAccumulator("010012345")
+        for adds in range(100):
+            suffix = f"{adds:02d}"
+            expected = add_valid_luhn_checksum("010012345" + suffix)
+            assert "010012345" + suffix + str(prefix.check_digit_for(suffix)) == expected
+        # Исходный аккумулятор не меняется
+        assert prefix.length == 9
+        assert prefix.extend("42").length == 11
+    
+    def test_is_valid(self):
+        """Тест проверки валидности законченного номера."""
+        assert LuhnAccumulator("7992739871").extend("3").is_valid
+        assert not LuhnAccumulator("79927398714").is_valid
+
+
+class TestLuhnBatch:
+    """Тесты эквивалентности пакетных функций скалярным."""
+    
+    SERIALS = [
+        "000000000000", "012345678903", "799273987130", "456126121234",
+        "010012345420", "999999999999", "123456789012", "010000000423",
+    ]
+    
+    @pytest.fixture(params=[False, True], ids=["python", "numpy"])
+    def use_numpy(self, request):
+        if request.param:
+            pytest.importorskip("numpy")
+        return request.param
+    
+    def test_packed_buffer(self, use_numpy):
+        """Тест упакованного буфера номеров, разделенных переводом строки."""
+        buffer = "\n".join(self.SERIALS).encode("ascii")
+        mask, check_digits = check_luhn_batch(buffer, stride=13, use_numpy=use_numpy)
+        assert [bool(v) for v in mask] == [validate_luhn_checksum(s) for s in self.SERIALS]
+        assert [int(d) for d in check_digits] == [calculate_luhn_check_digit(s[:11]) for s in self.SERIALS]
+    
+    def test_digit_matrix(self, use_numpy):
+        """Тест матрицы цифр (N, 12)."""
+        matrix = [[int(c) for c in s] for s in self.SERIALS]
+        mask, _ = check_luhn_batch(matrix, use_numpy=use_numpy)
+        assert [bool(v) for v in mask] == [validate_luhn_checksum(s) for s in self.SERIALS]
+    
+    @pytest.mark.parametrize("value", [10, 48, 57])
+    def test_out_of_range_matrix(self, use_numpy, value):
+        """Тест того, что значения вне 0..9 в матрице отклоняются обеими реализациями (в том числе коды ASCII-цифр)."""
+        matrix = [[0] * 11 + [value]]
+        with pytest.raises(ValueError):
+            check_luhn_batch(matrix, use_numpy=use_numpy)
+        with pytest.raises(ValueError):
+            calculate_luhn_check_digits_batch(matrix, use_numpy=use_numpy)
+    
+    def test_width_mismatch(self, use_numpy):
+        """Тест того, что явная ширина, не совпадающая с матрицей, вызывает ValueError."""
+        matrix = [[int(c) for c in s] for s in self.SERIALS]
+        with pytest.raises(ValueError):
+            check_luhn_batch(matrix, width=11, use_numpy=use_numpy)
+    
+    def test_check_digits_for_prefixes(self, use_numpy):
+        """Тест генерации контрольных цифр для префиксов."""
+        prefixes = [s[:11] for s in self.SERIALS]
+        check_digits = calculate_luhn_check_digits_batch("".join(prefixes).encode("ascii"), width=11, use_numpy=use_numpy)
+        assert [p + str(int(d)) for p, d in zip(prefixes, check_digits)] == [add_valid_luhn_checksum(p) for p in prefixes]
+    
+    def test_non_digit_input(self, use_numpy):
+        """Тест того, что нецифровые символы вызывают ValueError."""
+        with pytest.raises(ValueError):
+            check_luhn_batch(b"01234567890X", use_numpy=use_numpy)
 
 
 class TestGenerateSerialNumber:
@@ -470,6 +612,26 @@ class TestGenerateSerialNumber:
         # Проверяем, что сгенерированный серийный номер проходит валидацию
         assert validate_luhn_checksum(serial_number)
 
+    def test_batch_matches_scalar(self):
+        """Тест того, что пакетная генерация совпадает со скалярной."""
+        for time in [
+            datetime(2026, 1, 1, 0, 0, 0, tzinfo=timezone.utc),
+            datetime(2026, 1, 15, 12, 30, 45, tzinfo=timezone.utc),
+            datetime(2027, 11, 15, 12, 30, 45, tzinfo=timezone.utc),
+        ]:
+            adds_list = list(range(100))
+            expected = [generate_serial_number(time, adds) for adds in adds_list]
+            result = list(generate_serial_numbers(time, adds_list))
+            assert [serial for serial, _ in result] == expected
+            assert [formatted for _, formatted in result] == [format_serial_number(s) for s in expected]
+    
+    def test_batch_is_lazy(self):
+        """Тест того, что пакетная генерация работает с бесконечными итераторами."""
+        import itertools
+        time = datetime(2026, 1, 15, 12, 30, 45, tzinfo=timezone.utc)
+        serials = generate_serial_numbers(time, itertools.count())
+        assert next(serials)[0] == generate_serial_number(time, 0)
+
 
 class TestValidateSerialNumber:
     """Тесты для функции parse_serial_number."""
@@ -744,3 +906,108 @@ class TestValidateSerialNumber:
         is_valid, message = parse_serial_number(serial_number)
         assert is_valid is True
         assert "I квартал 28 года" in message
+
+
+class TestSerialNumber:
+    """Тесты для класса SerialNumber."""
+    
+    def test_parts(self):
+        """Тест извлечения составных частей номера."""
+        time = datetime(2027, 5, 15, 12, 30, 45, tzinfo=timezone.utc)
+        serial = SerialNumber.parse(generate_serial_number(time, 42))
+        assert serial.quarter == 6
+        assert serial.quarter_in_year == 2
+        assert serial.year == 2027
+        assert serial.seconds == get_seconds_since_quarter_start(time)
+        assert serial.adds == 42
+        assert serial.check_digit == serial.value % 10
+        assert serial.date_string == "II квартал 27 года"
+    
+    def test_from_parts_roundtrip(self):
+        """Тест сборки номера из частей."""
+        time = datetime(2026, 1, 1, 0, 0, 1, tzinfo=timezone.utc)
+        serial = SerialNumber.from_parts(1, 1, 7)
+        assert serial.digits == generate_serial_number(time, 7)
+        assert serial.formatted == format_serial_number(generate_serial_number(time, 7))
+        assert format_serial_number(serial) == serial.formatted
+        assert int(serial) == int(serial.digits)
+    
+    def test_leading_zeros(self):
+        """Тест того, что ведущие нули сохраняются в текстовом представлении."""
+        serial = SerialNumber(12345678903)
+        assert serial.digits == "012345678903"
+        assert str(serial) == "012345678903"
+    
+    def test_parse_errors(self):
+        """Тест исключений при разборе невалидного ввода."""
+        with pytest.raises(SerialNumberLengthError) as error:
+            SerialNumber.parse("1234-5678")
+        assert error.value.digits == "12345678"
+        with pytest.raises(SerialNumberChecksumError):
+            SerialNumber.parse("0100-1234-5421")
+    
+    def test_ordering_and_hash(self):
+        """Тест сравнения и хеширования: номера упорядочены по времени генерации."""
+        early = SerialNumber.from_parts(1, 100, 50)
+        late = SerialNumber.from_parts(1, 101, 1)
+        assert early < late
+        assert len({early, SerialNumber(early.value)}) == 1
+    
+    def test_extract_digits(self):
+        """Тест извлечения цифр из строки."""
+        assert extract_digits("ab0123-4567 8912!") == "012345678912"
+        # Десятичные цифры других алфавитов приводятся к ASCII
+        assert extract_digits("\u0661\u0662") == "12"
+    
+    def test_extract_digits_table_bounded(self):
+        """Тест того, что таблица перевода не запоминает символы, не являющиеся цифрами."""
+        from serial_number import _DIGITS_ONLY
+        assert extract_digits("".join(map(chr, range(0x4E00, 0x9FFF))) + "\u0663") == "3"
+        assert len(_DIGITS_ONLY) < 128 + 700
+    
+    def test_parse_serial_number_adapter(self):
+        """Тест того, что parse_serial_number возвращает извлеченные цифры и сообщение."""
+        serial = generate_serial_number(datetime(2026, 8, 15, tzinfo=timezone.utc), 3)
+        assert parse_serial_number(format_serial_number(serial)) == (True, serial, "III квартал 26 года")
+        is_valid, digits, message = parse_serial_number("12-34")
+        assert (is_valid, digits) == (False, "1234")
+        assert "12 цифр" in message
+
+
+class TestTimestampDecoding:
+    """Тесты для восстановления времени генерации и поиска по интервалу."""
+    
+    @pytest.mark.parametrize("time", [
+        datetime(2026, 1, 1, 0, 0, 0, tzinfo=timezone.utc),
+        datetime(2026, 3, 31, 23, 59, 59, tzinfo=timezone.utc),
+        datetime(2027, 5, 15, 12, 30, 45, tzinfo=timezone.utc),
+        datetime(2049, 12, 31, 23, 59, 59, tzinfo=timezone.utc),
+    ])
+    def test_timestamp_roundtrip(self, time):
+        """Тест того, что время генерации восстанавливается точно до секунды."""
+        serial = SerialNumber.parse(generate_serial_number(time, 17))
+        assert serial.timestamp == int(time.timestamp())
+        assert serial.generated_at == time
+    
+    def test_decode_timestamps(self):
+        """Тест векторизованного восстановления времени."""
+        timestamps = [1_767_225_600, 1_780_000_000, 1_900_000_123, 2_524_607_999]
+        serials = [int(generate_serial_number(timestamp, 5)) for timestamp in timestamps]
+        assert list(decode_timestamps(serials)) == timestamps
+        assert list(decode_timestamps([])) == []
+    
+    def test_serials_between(self):
+        """Тест поиска номеров, сгенерированных в интервале, по отсортированному списку."""
+        serials = sorted(SerialNumber.parse(generate_serial_number(1_780_000_000 + offset, adds))
+                         for offset in range(0, 100, 10) for adds in (1, 99))
+        found = serials_between(serials, 1_780_000_020, 1_780_000_040)
+        assert [serial.timestamp for serial in found] == [1_780_000_020] * 2 + [1_780_000_030] * 2
+        values = [serial.value for serial in serials]
+        assert serials_between(values, 1_780_000_020, 1_780_000_040) == [serial.value for serial in found]
+        assert serials_between(values, 1_780_000_100, 1_790_000_000) == []
+    
+    def test_lower_bound_order(self):
+        """Тест того, что граница монотонна по времени, в том числе на стыке кварталов."""
+        boundary = get_quarter_start_timestamp(2)
+        assert get_serial_lower_bound(boundary - 1) < get_serial_lower_bound(boundary)
+        assert get_serial_lower_bound(boundary) == SerialNumber.from_parts(2, 0, 0).value - SerialNumber.from_parts(2, 0, 0).check_digit
@@ -0,0 +1,97 @@
+"""
+Модульные тесты для реестра выпущенных серийных номеров.
+"""
+import asyncio
+import sqlite3
+
+import pytest
+
+from serial_number import SerialNumber, generate_serial_number
+from serial_registry import IssuedSerial, SerialRegistry
+
+
+@pytest.fixture
+def registry(tmp_path):
+    registry = SerialRegistry(str(tmp_path / "issued.sqlite3"), batch_size=10, flush_interval=0.05)
+    yield registry
+    registry.close()
+
+
+class TestSerialRegistry:
+    """Тесты для класса SerialRegistry."""
+    
+    def test_record_and_lookup(self, registry):
+        """Тест записи и поиска номера."""
+        registry.record(["041234567423", 41234567431], issued_at=1_790_000_000, chat_id=10, user_id=20)
+        registry.flush()
+        assert registry.lookup("041234567423") == IssuedSerial(41234567423, 1_790_000_000, 10, 20)
+        assert registry.lookup(SerialNumber(41234567431)).chat_id == 10
+        assert registry.lookup("000000000000") is None
+    
+    def test_many_batches(self, registry):
+        """Тест записи большого количества номеров несколькими пачками."""
+        registry.record(range(1000, 1250), issued_at=1)
+        registry.flush()
+        count = sqlite3.connect(registry.path).execute("SELECT COUNT(*) FROM issued_serials").fetchone()[0]
+        assert count == 250
+    
+    def test_duplicates_are_ignored(self, registry):
+        """Тест того, что повторная запись не меняет исходную."""
+        registry.record([42], issued_at=1, chat_id=1)
+        registry.record([42], issued_at=2, chat_id=2)
+        registry.flush()
+        assert registry.lookup(42) == IssuedSerial(42, 1, 1, None)
+    
+    def test_issued_between(self, registry):
+        """Тест выборки номеров, сгенерированных в интервале времени."""
+        serials = [SerialNumber.parse(generate_serial_number(1_780_000_000 + offset, 3)) for offset in range(100)]
+        registry.record(serials, issued_at=1_780_000_000)
+        registry.flush()
+        found = registry.issued_between(1_780_000_010, 1_780_000_015)
+        assert [issued.serial for issued in found] == [serial.value for serial in serials[10:15]]
+        assert registry.issued_between(1_790_000_000, 1_790_000_100) == []
+    
+    def test_issued_between_uses_primary_key(self, registry):
+        """Тест того, что интервал ищется по первичному ключу, а не просмотром таблицы."""
+        plan = sqlite3.connect(registry.path).execute(
+            "EXPLAIN QUERY PLAN SELECT serial FROM issued_serials WHERE serial >= 1 AND serial < 2 ORDER BY serial"
+        ).fetchall()
+        assert "USING INTEGER PRIMARY KEY" in plan[0][-1]
+    
+    def test_wal_mode(self, registry):
+        """Тест того, что база работает в режиме WAL."""
+        mode = sqlite3.connect(registry.path).execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+    
+    def test_lookup_async(self, registry):
+        """Тест асинхронного поиска."""
+        registry.record([7], issued_at=3)
+        registry.flush()
+        assert asyncio.run(registry.lookup_async(7)).issued_at == 3
+    
+    def test_close_flushes_queue(self, tmp_path):
+        """Тест того, что при закрытии очередь дописывается в базу."""
+        path = str(tmp_path / "issued.sqlite3")
+        registry = SerialRegistry(path, flush_interval=10)
+        registry.record(range(5), issued_at=1)
+        registry.close()
+        reopened = SerialRegistry(path)
+        assert reopened.lookup(4) is not None
+        reopened.close()
+    
+    def test_lookup_before_write(self, tmp_path):
+        """Тест того, что номер находится сразу после записи в очередь, до записи в базу."""
+        registry = SerialRegistry(str(tmp_path / "issued.sqlite3"), flush_interval=10)
+        registry.record([41234567423], issued_at=5, chat_id=1)
+        assert registry.lookup("041234567423") == IssuedSerial(41234567423, 5, 1, None)
+        registry.close()
+        assert registry._pending == {}
+    
+    def test_failed_batch(self, registry):
+        """Тест того, что ошибка записи пачки не останавливает поток записи."""
+        registry.record([2 ** 64], issued_at=1)
+        registry.flush()
+        assert registry._pending == {}
+        registry.record([42], issued_at=2)
+        registry.flush()
+        assert registry.lookup(42).issued_at == 2
@@ -0,0 +1,84 @@
+"""
+Модульные тесты для подсказок при опечатке в серийном номере.
+"""
+import random
+
+import pytest
+
+from luhn_algorithm import validate_luhn_checksum
+from serial_number import SerialNumber, generate_serial_number
+from serial_typos import is_plausible, suggest_corrections, typo_candidates
+
+NOW = 1_790_000_000
+
+
+def _brute_force(digits):
+    """
+    Все исправления перебором с полной проверкой каждого варианта.
+    """
+    found = set()
+    for position in range(len(digits)):
+        for digit in "0123456789":
+            candidate = digits[:position] + digit + digits[position + 1:]
+            if candidate != digits and validate_luhn_checksum(candidate):
+                found.add(candidate)
+    for position in range(len(digits) - 1):
+        candidate = digits[:position] + digits[position + 1] + digits[position] + digits[position + 2:]
+        if candidate != digits and validate_luhn_checksum(candidate):
+            found.add(candidate)
+    return found
+
+
+class TestTypoCandidates:
+    """Тесты для функции typo_candidates."""
+    
+    def test_matches_brute_force(self):
+        """Тест того, что табличный перебор совпадает с полной проверкой вариантов."""
+        rng = random.Random(1)
+        for _ in range(500):
+            digits = "".join(rng.choice("0123456789") for _ in range(12))
+            expected = set() if validate_luhn_checksum(digits) else _brute_force(digits)
+            assert {candidate for candidate, _, _ in typo_candidates(digits)} == expected
+    
+    def test_one_substitution_per_position(self):
+        """Тест того, что в каждой позиции ровно одна цифра исправляет сумму."""
+        substitutions = [position for _, kind, position in typo_candidates("024998400056") if kind == "замена"]
+        assert substitutions == list(range(12))
+    
+    def test_transposition_found(self):
+        """Тест того, что перестановка соседних цифр находится."""
+        serial = generate_serial_number(NOW - 1000, 47)
+        swapped = serial[:9] + serial[10] + serial[9] + serial[11]
+        assert (serial, "перестановка", 9) in typo_candidates(swapped)
+    
+    @pytest.mark.parametrize("digits", ["", "1234", "02499840005x", generate_serial_number(NOW, 5)])
+    def test_no_candidates(self, digits):
+        """Тест того, что для валидного номера и неверной длины кандидатов нет."""
+        assert typo_candidates(digits) == []
+
+
+class TestSuggestCorrections:
+    """Тесты для функции suggest_corrections."""
+    
+    def test_issued_first(self):
+        """Тест того, что выпущенный ботом номер стоит первым."""
+        issued = SerialNumber.parse(generate_serial_number(NOW - 1000, 47))
+        typo = issued.digits[:11] + str((issued.check_digit + 1) % 10)
+        suggestions = suggest_corrections(typo, now=NOW, is_issued=lambda serial: serial == issued)
+        assert suggestions[0].serial == issued
+        assert suggestions[0].issued and suggestions[0].kind == "замена" and suggestions[0].position == 11
+        assert not any(suggestion.issued for suggestion in suggestions[1:])
+    
+    def test_plausible_before_implausible(self):
+        """Тест того, что правдоподобные номера идут раньше неправдоподобных."""
+        suggestions = suggest_corrections("024998400056", now=NOW)
+        flags = [suggestion.plausible for suggestion in suggestions]
+        assert flags == sorted(flags, reverse=True)
+        assert True in flags and False in flags
+    
+    def test_is_plausible(self):
+        """Тест правдоподобия: квартал с Q1 2026, время не в будущем."""
+        assert is_plausible(SerialNumber.parse(generate_serial_number(NOW - 1, 1)), NOW)
+        assert not is_plausible(SerialNumber.parse(generate_serial_number(NOW + 1, 1)), NOW)
+        assert not is_plausible(SerialNumber.from_parts(0, 100, 1), NOW)
+        assert not is_plausible(SerialNumber.from_parts(1, 9_999_999, 1), NOW)
@@ -0,0 +1,86 @@
+"""
+Модуль для работы бота через вебхук вместо long polling.
+
+Обновления от Telegram принимаются встроенным HTTP-сервером (http_server.py)
+и кладутся в очередь обновлений приложения, откуда их разбирают те же
+обработчики, что и при polling. Проверить локально можно, отправив записанный
+JSON обновления POST-запросом:
+
+    curl -X POST -H "Content-Type: application/json" -d @update.json http://localhost:8080/telegram
+"""
+import asyncio
+import hmac
+import signal
+from typing import Optional
+
+from telegram import Update
+from telegram.ext import Application
+
+from http_server import HttpServer, Request, Response
+
+# Заголовок с секретом, который Telegram передает в каждом запросе вебхука
+SECRET_TOKEN_HEADER = "x-telegram-bot-api-secret-token"
+
+
+def create_webhook_server(application: Application, path: str = "/telegram", secret_token: Optional[str] = None,
+                          host: str = "0.0.0.0", port: int = 8080) -> HttpServer:
+    """
+    Создает HTTP-сервер с маршрутом вебхука и проверкой работоспособности GET /healthz.
+    """
+    server = HttpServer(host, port)
+
+    async def receive_update(request: Request) -> Response:
+        if secret_token and not hmac.compare_digest(request.headers.get(SECRET_TOKEN_HEADER, ""), secret_token):
+            return Response.text("Forbidden", 403)
+        try:
+            data = request.json()
+        except ValueError:
+            return Response.text("Неверный JSON", 400)
+        if not isinstance(data, dict):
+            return Response.text("Ожидается объект Update", 400)
+        update = Update.de_json(data, application.bot)
+        await application.update_queue.put(update)
+        return Response.text("ok")
+
+    async def health(request: Request) -> Response:
+        return Response.json({
+            "status": "ok" if application.running else "starting",
+            "update_queue": application.update_queue.qsize(),
+        })
+
+    server.route("POST", path, receive_update)
+    server.route("GET", "/healthz", health)
+    return server
+
+
+async def run_webhook(application: Application, server: HttpServer, url: Optional[str] = None,
+                      secret_token: Optional[str] = None) -> None:
+    """
+    Запускает приложение и HTTP-сервер и работает до SIGINT/SIGTERM.
+    Хуки post_init, post_stop и post_shutdown вызываются в том же порядке, что и в run_polling.
+    Если задан url, регистрирует вебхук в Telegram; без него удобно слать обновления вручную.
+    """
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    await application.initialize()
+    try:
+        if application.post_init:
+            await application.post_init(application)
+        await application.start()
+        try:
+            await server.start()
+            if url:
+                await application.bot.set_webhook(url, secret_token=secret_token, allowed_updates=Update.ALL_TYPES)
+            print(f"Вебхук слушает {server.host}:{server.port}")
+            await stop.wait()
+        finally:
+            await server.stop()
+            await application.stop()
+            if application.post_stop:
+                await application.post_stop(application)
+    finally:
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)